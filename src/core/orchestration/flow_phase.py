@@ -22,6 +22,7 @@ def run_flow_impl(
     """Shared flow execution logic for flow mode and e2e."""
     from py2flow.errors import FlowExecutionError, FlowValidationError
     from py2flow.executor import DAGExecutor, DebugConfig
+    from py2flow.incremental import IncrementalState
     from py2flow.flow_constraints import validate_script_constraints
     from py2flow.ir import DAG
 
@@ -48,6 +49,10 @@ def run_flow_impl(
     }
 
     max_rounds = getattr(cfg, "max_rounds_debug", 3)
+    # Results of the previous round's DAG; only nodes changed by the repair (and their
+    # downstream cone) are recomputed. This is the only cross-round store: a NodeResultCache
+    # on top would hold second copies of the same results.
+    incremental_state = IncrementalState()
     flow_agent = flow_agent or FlowAgent(model_name=cfg.model_name)
 
     feedback = None
@@ -155,6 +160,15 @@ def run_flow_impl(
             json.dumps(flow_dict, ensure_ascii=False, indent=2), encoding="utf-8"
         )
 
+        executor: Optional[DAGExecutor] = None
+        start_time = time.time()
+
+        def _failed_run_stats() -> Dict[str, Any]:
+            # Whatever the executor measured before the failure (it sets run_stats even then).
+            if executor is None:
+                return {}
+            return {"took_sec": time.time() - start_time, **executor.run_stats}
+
         try:
             dag = DAG.from_dict(flow_dict)
 
@@ -189,11 +203,24 @@ def run_flow_impl(
                 except OSError:
                     shutil.copytree(tdir / "inputs", inputs_link)
 
-            executor = DAGExecutor(dag, base_path=solution_dir, debug=debug_cfg)
+            executor = DAGExecutor(
+                dag,
+                base_path=solution_dir,
+                debug=debug_cfg,
+                incremental=incremental_state,
+                # Always on, so frames are sized shallowly; deep sizing walks every object column.
+                profile="shallow",
+            )
             start_time = time.time()
-            executor.run(keep="none")
+            try:
+                executor.run(keep="none")
+            finally:
+                # Full per-node report and Chrome trace; execution.json carries the summary.
+                if executor.profile is not None:
+                    executor.profile.write(round_dir / "profile")
             took_sec = time.time() - start_time
             exec_info = {"ok": True, "rc": 0, "stderr": "", "stdout": "", "took_sec": took_sec}
+            exec_info.update(executor.run_stats)
 
             cand_dir = solution_dir / "flow_cand"
             output_files = sorted(cand_dir.glob("*.csv")) if cand_dir.exists() else []
@@ -231,6 +258,7 @@ def run_flow_impl(
         except FlowValidationError as e:
             stopped_reason = "execerror"
             exec_info = {"ok": False, "rc": 1, "stderr": str(e), "stdout": "", "took_sec": 0}
+            exec_info.update(_failed_run_stats())
             (round_dir / "flow_parse_error.json").write_text(
                 json.dumps(
                     {
@@ -272,6 +300,7 @@ def run_flow_impl(
                 "took_sec": 0,
                 "failed_node": getattr(e, "node_id", None),
             }
+            exec_info.update(_failed_run_stats())
             feedback = {
                 "type": "execution",
                 "message": str(e),
@@ -289,6 +318,7 @@ def run_flow_impl(
         except Exception as e:
             stopped_reason = "execerror"
             exec_info = {"ok": False, "rc": 1, "stderr": str(e), "stdout": "", "took_sec": 0}
+            exec_info.update(_failed_run_stats())
             feedback = {"type": "execution", "message": str(e), "details": {}}
             eval_report = {
                 "passed": False,
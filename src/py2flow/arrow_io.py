@@ -0,0 +1,170 @@
+"""
+Arrow-backed IO adapter: Parquet and Arrow IPC/Feather files, plus a columnar sidecar cache for CSV.
+
+Requires the optional ``pyarrow`` dependency (``pip install prepbench[arrow]``).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .operators.base import FileIO
+
+# Bump when the sidecar layout or the CSV -> frame restoration changes.
+SIDECAR_VERSION = "1"
+
+COLUMNAR_FORMATS = frozenset({"parquet", "feather"})
+
+# read_csv options that do not produce a single complete frame; such reads bypass the sidecar.
+_UNCACHED_CSV_OPTIONS = frozenset({"chunksize", "iterator", "nrows"})
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("ArrowIO requires pyarrow (pip install prepbench[arrow])") from exc
+    return pyarrow
+
+
+def restore_object_nan(df: pd.DataFrame) -> pd.DataFrame:
+    """Arrow yields None for nulls in object columns where read_csv yields NaN."""
+    for i, dtype in enumerate(df.dtypes):
+        if dtype == object:
+            col = df.iloc[:, i]
+            mask = col.isna()
+            if mask.any():
+                df.isetitem(i, col.where(~mask, np.nan))
+    return df
+
+
+class ArrowIO(FileIO):
+    """
+    IOAdapter for ``parquet`` and ``feather`` (Arrow IPC) files; ``csv`` is delegated to FileIO.
+
+    With ``cache_dir`` set, the first complete read of a CSV also writes an uncompressed Arrow IPC
+    copy keyed by real path, mtime, size and read options; later reads with the same key load that
+    copy (memory-mapped when ``memory_map`` is true) instead of re-parsing. Frames that do not
+    round-trip exactly through Arrow (e.g. object columns mixing numbers and strings) are never
+    cached, so results are identical with and without the sidecar.
+    """
+
+    def __init__(self, cache_dir: str | Path | None = None, memory_map: bool = True) -> None:
+        _pyarrow()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.memory_map = bool(memory_map)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def read_df(self, path: Path, fmt: str, options: Mapping[str, Any]) -> pd.DataFrame:
+        if fmt in COLUMNAR_FORMATS:
+            return self._read_columnar(path, fmt, options)
+        if fmt == "csv" and self.cache_dir is not None and not (_UNCACHED_CSV_OPTIONS & set(options)):
+            return self._read_csv_cached(path, options)
+        return super().read_df(path, fmt, options)
+
+    def write_df(self, df: pd.DataFrame, path: Path, fmt: str, options: Mapping[str, Any]) -> None:
+        if fmt not in COLUMNAR_FORMATS:
+            super().write_df(df, path, fmt, options)
+            return
+        pa = _pyarrow()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if fmt == "parquet":
+            pa.parquet.write_table(table, path, **dict(options))
+        else:
+            pa.feather.write_feather(table, path, **dict(options))
+
+    def stats(self) -> Dict[str, int]:
+        return {"sidecar_hits": self.hits, "sidecar_misses": self.misses}
+
+    def _read_columnar(self, path: Path, fmt: str, options: Mapping[str, Any]) -> pd.DataFrame:
+        pa = _pyarrow()
+        columns: Optional[List[str]] = options.get("columns")
+        if fmt == "parquet":
+            if columns is not None:
+                names = set(pa.parquet.read_schema(path, memory_map=self.memory_map).names)
+                columns = [c for c in columns if c in names]
+            table = pa.parquet.read_table(path, columns=columns, memory_map=self.memory_map)
+        else:
+            table = pa.feather.read_table(path, memory_map=self.memory_map)
+            if columns is not None:
+                table = table.select([c for c in columns if c in table.column_names])
+        return table.to_pandas()
+
+    def _sidecar_path(self, path: Path, options: Mapping[str, Any]) -> Optional[Path]:
+        pa = _pyarrow()
+        if self.cache_dir is None:
+            return None
+        try:
+            real = Path(path).resolve()
+            st = real.stat()
+        except OSError:
+            return None
+        h = hashlib.sha256()
+        h.update(f"v{SIDECAR_VERSION}|pandas={pd.__version__}|pyarrow={pa.__version__}|".encode("utf-8"))
+        h.update(f"{real}|{st.st_mtime_ns}|{st.st_size}|".encode("utf-8"))
+        h.update(json.dumps(dict(options), sort_keys=True, default=repr).encode("utf-8"))
+        key = h.hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.arrow"
+
+    def _read_csv_cached(self, path: Path, options: Mapping[str, Any]) -> pd.DataFrame:
+        pa = _pyarrow()
+        sidecar = self._sidecar_path(path, options)
+        if sidecar is not None and sidecar.exists():
+            try:
+                with pa.memory_map(str(sidecar)) if self.memory_map else pa.OSFile(str(sidecar)) as source:
+                    df = pa.ipc.open_file(source).read_pandas()
+                with self._lock:
+                    self.hits += 1
+                return restore_object_nan(df)
+            except Exception:
+                pass
+        df = super().read_df(path, "csv", options)
+        with self._lock:
+            self.misses += 1
+        skip = sidecar.with_suffix(".skip") if sidecar is not None else None
+        if sidecar is not None and skip is not None and not skip.exists():
+            self._write_sidecar(df, sidecar, skip)
+        return df
+
+    def _write_sidecar(self, df: pd.DataFrame, sidecar: Path, skip: Path) -> None:
+        pa = _pyarrow()
+        sidecar.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=None)
+            restored = restore_object_nan(table.to_pandas())
+            exact = (
+                restored.columns.equals(df.columns)
+                and restored.index.equals(df.index)
+                and restored.dtypes.equals(df.dtypes)
+                and restored.equals(df)
+            )
+        except Exception:
+            exact = False
+        if not exact:
+            # Remember that this key does not round-trip so later reads do not retry the conversion.
+            skip.touch()
+            return
+        fd, tmp = tempfile.mkstemp(dir=sidecar.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, sidecar)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
@@ -0,0 +1,315 @@
+"""
+Translation of the expression subset that both alternative backends run natively: polars_expr for
+the polars backend and sql_expr for the DuckDB engine. Each returns None for anything it cannot
+translate with the same per-row result as eval_expr, and the caller falls back to pandas.
+"""
+from __future__ import annotations
+
+import ast
+import re
+from typing import Any, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+from .operators.expr import column_ref, parse_expr
+
+# Comparisons are False on nulls in pandas (True for !=); polars yields null, so fill to match.
+_PL_COMPARE = {
+    ast.Eq: ("eq", False),
+    ast.NotEq: ("ne", True),
+    ast.Lt: ("lt", False),
+    ast.LtE: ("le", False),
+    ast.Gt: ("gt", False),
+    ast.GtE: ("ge", False),
+}
+_PL_ARITH = {ast.Add: "add", ast.Sub: "sub", ast.Mult: "mul", ast.Div: "truediv"}
+_PL_STR_METHODS = {"lower": "to_lowercase", "upper": "to_uppercase", "strip": "strip_chars"}
+_REGEX_META = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+
+def polars_expr(expr: str, columns: Sequence[str]) -> Optional[Any]:
+    """
+    Translate an expression into a polars.Expr with the same per-row result as eval_expr, or None
+    when it uses anything outside the supported subset: columns, literals, + - * /, comparisons,
+    & | ~ over booleans, null checks, isin, fillna, abs and str.lower/upper/strip/startswith/
+    endswith/contains. Callers fall back to eval_expr on None.
+    """
+    import polars as pl
+
+    tree = parse_expr(expr)
+    if tree is None:
+        return None
+    names = set(columns)
+
+    def const_list(node: ast.AST) -> Optional[List[Any]]:
+        if not isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return None
+        vals = [e.value for e in node.elts if isinstance(e, ast.Constant)]
+        if len(vals) != len(node.elts) or any(v is None for v in vals):
+            return None
+        return vals
+
+    # Returns (expr, is_bool) where is_bool marks null-free boolean results usable with & | ~.
+    def tr(node: ast.AST) -> Optional[Tuple[Any, bool]]:
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, (bool, int, float, str)) or node.value is None:
+                return pl.lit(node.value), isinstance(node.value, bool)
+            return None
+        col = column_ref(node, names)
+        if col is not None:
+            return pl.col(col), False
+        if isinstance(node, ast.UnaryOp):
+            inner = tr(node.operand)
+            if inner is None:
+                return None
+            if isinstance(node.op, ast.USub) and not inner[1]:
+                return -inner[0], False
+            if isinstance(node.op, ast.Invert) and inner[1]:
+                return ~inner[0], True
+            return None
+        if isinstance(node, ast.BinOp):
+            left, right = tr(node.left), tr(node.right)
+            if left is None or right is None:
+                return None
+            if isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+                if not (left[1] and right[1]):
+                    return None
+                return (left[0] & right[0] if isinstance(node.op, ast.BitAnd) else left[0] | right[0]), True
+            op = _PL_ARITH.get(type(node.op))
+            if op is None or left[1] or right[1]:
+                return None
+            return getattr(left[0], op)(right[0]), False
+        if isinstance(node, ast.Compare):
+            if len(node.ops) != 1:
+                return None
+            spec = _PL_COMPARE.get(type(node.ops[0]))
+            left, right = tr(node.left), tr(node.comparators[0])
+            if spec is None or left is None or right is None or left[1] or right[1]:
+                return None
+            return getattr(left[0], spec[0])(right[0]).fill_null(spec[1]), True
+        if not isinstance(node, ast.Call):
+            return None
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "pd":
+            if func.attr in {"isna", "notna"} and len(node.args) == 1 and not node.keywords:
+                inner = tr(node.args[0])
+                if inner is None:
+                    return None
+                return (inner[0].is_null() if func.attr == "isna" else inner[0].is_not_null()), True
+            return None
+        if not isinstance(func, ast.Attribute):
+            return None
+        if isinstance(func.value, ast.Attribute) and func.value.attr == "str":
+            return string_method(func.attr, func.value.value, node)
+        if node.keywords:
+            return None
+        target = tr(func.value)
+        if target is None or target[1]:
+            return None
+        base = target[0]
+        if func.attr in {"isna", "isnull"} and not node.args:
+            return base.is_null(), True
+        if func.attr in {"notna", "notnull"} and not node.args:
+            return base.is_not_null(), True
+        if func.attr == "abs" and not node.args:
+            return base.abs(), False
+        if func.attr == "isin" and len(node.args) == 1:
+            vals = const_list(node.args[0])
+            return (base.is_in(vals).fill_null(False), True) if vals is not None else None
+        if func.attr == "fillna" and len(node.args) == 1 and isinstance(node.args[0], ast.Constant):
+            value = node.args[0].value
+            return (base.fill_null(value), False) if isinstance(value, (int, float, str)) and not isinstance(value, bool) else None
+        return None
+
+    def string_method(name: str, owner: ast.AST, call: ast.Call) -> Optional[Tuple[Any, bool]]:
+        target = tr(owner)
+        if target is None or target[1]:
+            return None
+        base = target[0].str
+        if name in _PL_STR_METHODS and not call.args and not call.keywords:
+            return getattr(base, _PL_STR_METHODS[name])(), False
+        if len(call.args) != 1 or not isinstance(call.args[0], ast.Constant) or not isinstance(call.args[0].value, str):
+            return None
+        pat = call.args[0].value
+        if name in {"startswith", "endswith"} and not call.keywords:
+            return (base.starts_with(pat) if name == "startswith" else base.ends_with(pat)), False
+        if name == "contains":
+            kw = {k.arg: k.value for k in call.keywords}
+            regex = kw.pop("regex", None)
+            if kw or (regex is not None and not isinstance(regex, ast.Constant)):
+                return None
+            literal = regex is not None and regex.value is False
+            if not literal and _REGEX_META.search(pat):
+                # Python and polars regex dialects differ; only plain substrings are translated.
+                return None
+            return base.contains(pat, literal=True), False
+        return None
+
+    out = tr(tree)
+    return out[0] if out is not None else None
+
+
+# Kinds tracked by sql_expr. "bool" is a null-free boolean (usable with & | ~); "nbool" may be null
+# (str.startswith on a missing value); "null" is the None literal.
+SQL_NUMERIC_KINDS: FrozenSet[str] = frozenset({"int", "float"})
+_SQL_COMPARE = {ast.Eq: ("=", "FALSE"), ast.NotEq: ("<>", "TRUE"), ast.Lt: ("<", "FALSE"), ast.LtE: ("<=", "FALSE"), ast.Gt: (">", "FALSE"), ast.GtE: (">=", "FALSE")}
+_SQL_ARITH = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*"}
+# Everything str.strip() removes, so trim() strips exactly the same characters.
+_PY_WHITESPACE = "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+
+
+def sql_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_literal(value: Any) -> Optional[Tuple[str, str]]:
+    """(SQL text, kind) for a Python constant, typed the way pandas would broadcast it."""
+    if value is None:
+        return "NULL", "null"
+    if isinstance(value, bool):
+        return ("TRUE" if value else "FALSE"), "bool"
+    if isinstance(value, int):
+        return (f"CAST({value} AS BIGINT)", "int") if -(2**63) <= value < 2**63 else None
+    if isinstance(value, float):
+        if value != value:
+            return None
+        return f"CAST('{value!r}' AS DOUBLE)", "float"
+    if isinstance(value, str) and "\x00" not in value:
+        return "'" + value.replace("'", "''") + "'", "str"
+    return None
+
+
+def sql_expr(expr: str, kinds: Mapping[str, str]) -> Optional[Tuple[str, str]]:
+    """
+    Translate an expression into DuckDB SQL with the same per-row result as eval_expr; returns
+    (sql, kind) or None when it uses anything outside the supported subset: columns, literals,
+    + - * /, comparisons, & | ~ over booleans, null checks, isin, fillna, abs and
+    str.strip/startswith/endswith/contains. kinds maps column names to int|float|str|bool|other.
+
+    Unlike polars_expr, operand kinds are checked: pandas compares 1 == '1' as False while SQL
+    casts, so mixed-kind comparisons and arithmetic are left to eval_expr. Float results map NaN
+    to NULL, the way pandas treats NaN as missing.
+    """
+    tree = parse_expr(expr)
+    if tree is None:
+        return None
+
+    def no_nan(sql: str) -> str:
+        return f"NULLIF({sql}, CAST('NaN' AS DOUBLE))"
+
+    def tr(node: ast.AST) -> Optional[Tuple[str, str]]:
+        if isinstance(node, ast.Constant):
+            return sql_literal(node.value)
+        col = column_ref(node, kinds)
+        if col is not None:
+            return sql_ident(col), kinds[col]
+        if isinstance(node, ast.UnaryOp):
+            inner = tr(node.operand)
+            if inner is None:
+                return None
+            if isinstance(node.op, ast.USub) and inner[1] in SQL_NUMERIC_KINDS:
+                return f"(-{inner[0]})", inner[1]
+            if isinstance(node.op, ast.Invert) and inner[1] == "bool":
+                return f"(NOT {inner[0]})", "bool"
+            return None
+        if isinstance(node, ast.BinOp):
+            left, right = tr(node.left), tr(node.right)
+            if left is None or right is None:
+                return None
+            if isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+                if left[1] != "bool" or right[1] != "bool":
+                    return None
+                return f"({left[0]} {'AND' if isinstance(node.op, ast.BitAnd) else 'OR'} {right[0]})", "bool"
+            if isinstance(node.op, ast.Add) and left[1] == "str" and right[1] == "str":
+                return f"({left[0]} || {right[0]})", "str"
+            if left[1] not in SQL_NUMERIC_KINDS or right[1] not in SQL_NUMERIC_KINDS:
+                return None
+            if isinstance(node.op, ast.Div):
+                return no_nan(f"(CAST({left[0]} AS DOUBLE) / {right[0]})"), "float"
+            op = _SQL_ARITH.get(type(node.op))
+            if op is None:
+                return None
+            if left[1] == "int" and right[1] == "int":
+                return f"({left[0]} {op} {right[0]})", "int"
+            return no_nan(f"({left[0]} {op} {right[0]})"), "float"
+        if isinstance(node, ast.Compare):
+            if len(node.ops) != 1:
+                return None
+            spec = _SQL_COMPARE.get(type(node.ops[0]))
+            left, right = tr(node.left), tr(node.comparators[0])
+            if spec is None or left is None or right is None:
+                return None
+            if "null" in (left[1], right[1]):
+                # x == None is False on every row in pandas, x != None True.
+                return (spec[1], "bool") if left[1] != "other" and right[1] != "other" else None
+            same = left[1] == right[1] and left[1] in {"str", "bool"}
+            if not same and not (left[1] in SQL_NUMERIC_KINDS and right[1] in SQL_NUMERIC_KINDS):
+                return None
+            return f"COALESCE({left[0]} {spec[0]} {right[0]}, {spec[1]})", "bool"
+        if not isinstance(node, ast.Call):
+            return None
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "pd":
+            if func.attr in {"isna", "notna"} and len(node.args) == 1 and not node.keywords:
+                inner = tr(node.args[0])
+                if inner is None:
+                    return None
+                return f"({inner[0]} IS {'' if func.attr == 'isna' else 'NOT '}NULL)", "bool"
+            return None
+        if not isinstance(func, ast.Attribute):
+            return None
+        if isinstance(func.value, ast.Attribute) and func.value.attr == "str":
+            return string_method(func.attr, func.value.value, node)
+        if node.keywords:
+            return None
+        target = tr(func.value)
+        if target is None:
+            return None
+        base, kind = target
+        if func.attr in {"isna", "isnull", "notna", "notnull"} and not node.args:
+            return f"({base} IS {'' if func.attr in {'isna', 'isnull'} else 'NOT '}NULL)", "bool"
+        if func.attr == "abs" and not node.args and kind in SQL_NUMERIC_KINDS:
+            return f"abs({base})", kind
+        if func.attr == "isin" and len(node.args) == 1 and kind in SQL_NUMERIC_KINDS | {"str"}:
+            arg = node.args[0]
+            if not isinstance(arg, (ast.List, ast.Tuple, ast.Set)):
+                return None
+            items = [sql_literal(e.value) if isinstance(e, ast.Constant) else None for e in arg.elts]
+            if any(i is None or (i[1] != kind and not {i[1], kind} <= SQL_NUMERIC_KINDS) for i in items):
+                return None
+            if not items:
+                return "FALSE", "bool"
+            return f"COALESCE({base} IN ({', '.join(i[0] for i in items)}), FALSE)", "bool"  # type: ignore[index]
+        if func.attr == "fillna" and len(node.args) == 1 and isinstance(node.args[0], ast.Constant):
+            value = sql_literal(node.args[0].value)
+            if value is None or value[1] not in SQL_NUMERIC_KINDS | {"str"}:
+                return None
+            if value[1] == kind or (kind == "float" and value[1] == "int"):
+                return f"COALESCE({base}, {value[0]})", kind
+            return None
+        return None
+
+    def string_method(name: str, owner: ast.AST, call: ast.Call) -> Optional[Tuple[str, str]]:
+        target = tr(owner)
+        if target is None or target[1] != "str":
+            return None
+        base = target[0]
+        if name == "strip" and not call.args and not call.keywords:
+            return f"trim({base}, {sql_literal(_PY_WHITESPACE)[0]})", "str"  # type: ignore[index]
+        if len(call.args) != 1 or not isinstance(call.args[0], ast.Constant) or not isinstance(call.args[0].value, str):
+            return None
+        pat = sql_literal(call.args[0].value)
+        if pat is None:
+            return None
+        if name in {"startswith", "endswith"} and not call.keywords:
+            return f"{'starts_with' if name == 'startswith' else 'ends_with'}({base}, {pat[0]})", "nbool"
+        if name == "contains":
+            kw = {k.arg: k.value for k in call.keywords}
+            regex = kw.pop("regex", None)
+            if kw or (regex is not None and not isinstance(regex, ast.Constant)):
+                return None
+            literal = regex is not None and regex.value is False
+            if not literal and _REGEX_META.search(call.args[0].value):
+                return None
+            return f"contains({base}, {pat[0]})", "nbool"
+        return None
+
+    return tr(tree)
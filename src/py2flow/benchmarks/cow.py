@@ -0,0 +1,117 @@
+"""
+Peak RSS and wall time of a copy-heavy flow with and without copy-on-write execution.
+
+Each (input, mode) pair runs in a fresh interpreter so peak RSS is not shared between runs:
+
+    python -m py2flow.benchmarks.cow --data-dir data --top 3
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+MODES = ("copy", "cow")
+
+
+def bench_flow(first_col: str) -> Dict[str, Any]:
+    """Ten nodes touching every operator that used to deep-copy its input or result."""
+    col = first_col.replace("'", "\\'")
+    return {
+        "id": "bench_cow",
+        "name": "bench_cow",
+        "nodes": {
+            "in": {"kind": "input", "params": {"path": "input.csv"}},
+            "p": {
+                "kind": "project",
+                "inputs": {"in": "in"},
+                "params": {"compute": [{"as": "__bench_key", "expr": f"df['{col}'].astype(str)"}]},
+            },
+            "f": {"kind": "filter", "inputs": {"in": "p"}, "params": {"predicate": "__bench_key.notna()"}},
+            "s": {
+                "kind": "sort",
+                "inputs": {"in": "f"},
+                "params": {"order_by": [{"expr": "__bench_key"}]},
+            },
+            "d": {"kind": "dedup", "inputs": {"in": "s"}, "params": {"keys": None}},
+            "u": {"kind": "union", "inputs": {"items": ["d", "f"]}, "params": {"distinct": False}},
+            "k": {"kind": "dedup", "inputs": {"in": "f"}, "params": {"keys": ["__bench_key"], "output": "keys_only"}},
+            "j": {
+                "kind": "join",
+                "inputs": {"left": "u", "right": "k"},
+                "params": {"on": ["__bench_key"], "how": "semi"},
+            },
+            "a": {
+                "kind": "aggregate",
+                "inputs": {"in": "j"},
+                "params": {"group_keys": ["__bench_key"], "aggs": [{"as": "n", "func": "count"}]},
+            },
+            "o": {"kind": "output", "inputs": {"in": "a"}, "params": {"path": "out/result.csv"}},
+        },
+    }
+
+
+def run_child(csv_path: Path, mode: str) -> Dict[str, Any]:
+    import pandas as pd
+
+    from py2flow.executor import DAGExecutor
+    from py2flow.ir import DAG
+
+    first_col = str(pd.read_csv(csv_path, nrows=0).columns[0])
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with tempfile.TemporaryDirectory(prefix="py2flow-bench-") as tmp:
+        os.symlink(csv_path.resolve(), Path(tmp) / "input.csv")
+        dag = DAG.from_dict(bench_flow(first_col))
+        executor = DAGExecutor(dag, base_path=tmp, copy_on_write=(mode == "cow"))
+        t0 = time.perf_counter()
+        executor.run(keep="outputs")
+        seconds = time.perf_counter() - t0
+    # ru_maxrss is KiB on Linux.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"input": str(csv_path), "mode": mode, "seconds": seconds, "peak_rss_mb": peak / 1024, "import_rss_mb": rss_before / 1024}
+
+
+def largest_inputs(data_dir: Path, top: int) -> List[Path]:
+    files = sorted(data_dir.glob("case_*/inputs/*.csv"), key=lambda p: p.stat().st_size, reverse=True)
+    return files[:top]
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data-dir", default="data", help="Directory containing case_*/inputs/*.csv (default: data)")
+    parser.add_argument("--top", type=int, default=3, help="Benchmark the N largest inputs (default: 3)")
+    parser.add_argument("--child", nargs=2, metavar=("CSV", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(Path(args.child[0]), args.child[1])))
+        return 0
+
+    inputs = largest_inputs(Path(args.data_dir), args.top)
+    if not inputs:
+        parser.error(f"no case_*/inputs/*.csv under {args.data_dir}")
+    print(f"{'input':<44} {'mode':<5} {'seconds':>8} {'peak_rss_mb':>12} {'flow_rss_mb':>12}")
+    for path in inputs:
+        for mode in MODES:
+            proc = subprocess.run(
+                [sys.executable, "-m", "py2flow.benchmarks.cow", "--child", str(path), mode],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            row = json.loads(proc.stdout.strip().splitlines()[-1])
+            name = "/".join(path.parts[-3:])
+            flow_rss = row["peak_rss_mb"] - row["import_rss_mb"]
+            print(f"{name:<44} {mode:<5} {row['seconds']:>8.3f} {row['peak_rss_mb']:>12.1f} {flow_rss:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
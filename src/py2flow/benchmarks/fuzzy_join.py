@@ -0,0 +1,147 @@
+"""
+Check the vectorised fuzzy join against the record-by-record build it replaced, and time both.
+
+Random left/right frames mix numpy, object, datetime, categorical and pandas extension columns
+(Int64, Float64, string, boolean), including columns shared by both sides. Every case must give
+the same columns, dtypes and CSV text as the reference:
+
+    python -m py2flow.benchmarks.fuzzy_join --cases 500
+    python -m py2flow.benchmarks.fuzzy_join --rows 2000 --cases 0
+
+Empty left sides are not compared: the reference returned a frame without columns there.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from py2flow.operators.base import ExecutionContext
+from py2flow.operators.join import Join
+
+COLUMN_KINDS = ("Int64", "Float64", "string", "boolean", "int", "float", "object", "bool", "datetime", "category")
+
+
+def reference_fuzzy_join(left: pd.DataFrame, right: pd.DataFrame, left_key: str, right_key: str) -> pd.DataFrame:
+    """The nested iterrows build of Join before vectorisation (for frames with a default index)."""
+    matched: List[Optional[Any]] = []
+    for _, left_row in left.iterrows():
+        left_val = str(left_row[left_key]).strip().lower() if pd.notna(left_row[left_key]) else ""
+        if not left_val:
+            matched.append(None)
+            continue
+        best_match = None
+        best_len = 0
+        for right_idx, right_row in right.iterrows():
+            right_val = str(right_row[right_key]).strip().lower() if pd.notna(right_row[right_key]) else ""
+            if left_val in right_val and len(left_val) > best_len:
+                best_match = right_idx
+                best_len = len(left_val)
+        matched.append(best_match)
+    rows = []
+    for left_idx, right_idx in enumerate(matched):
+        row = left.iloc[left_idx].to_dict()
+        if right_idx is not None:
+            row = {**row, **right.iloc[right_idx].to_dict()}
+        else:
+            for col in right.columns:
+                if col not in row:
+                    row[col] = pd.NA
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def fuzzy_join(left: pd.DataFrame, right: pd.DataFrame, left_key: str, right_key: str) -> pd.DataFrame:
+    """The current Join operator with fuzzy_match."""
+    params = {"how": "left", "left_on": left_key, "right_on": right_key, "fuzzy_match": True}
+    return Join().execute("fuzzy", [left, right], params, ExecutionContext(base_path="."))
+
+
+def random_column(rng: random.Random, kind: str, n: int) -> Any:
+    def pick(values: List[Any]) -> List[Any]:
+        return [rng.choice(values) for _ in range(n)]
+
+    if kind in {"Int64", "Float64", "string", "boolean"}:
+        values = {"Int64": [1, 2, None], "Float64": [1.5, 2.0, None], "string": ["x", "y", None], "boolean": [True, False, None]}[kind]
+        return pd.array(pick(values), dtype=kind)
+    if kind == "int":
+        return pick([1, 2, 3])
+    if kind == "float":
+        return pick([1.0, 2.5, np.nan])
+    if kind == "object":
+        return pick(["p", "q", None])
+    if kind == "bool":
+        return pick([True, False])
+    if kind == "datetime":
+        return pd.to_datetime(pick(["2020-01-01", "2021-02-03"]))
+    return pd.Categorical(pick(["u", "v"]))
+
+
+def random_case(rng: random.Random, left_rows: int, right_rows: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    left = pd.DataFrame({"k": [rng.choice(["ab", "b", " AB ", "zz", None]) for _ in range(left_rows)]})
+    right = pd.DataFrame({"k2": [rng.choice(["xab", "b", "q", None]) for _ in range(right_rows)]})
+    for i in range(rng.randint(0, 3)):
+        left[f"l{i}"] = random_column(rng, rng.choice(COLUMN_KINDS), left_rows)
+    for i in range(rng.randint(0, 3)):
+        # Sometimes shadow a left column, whose values the matched right row then overrides.
+        right[rng.choice([f"r{i}", "l0"])] = random_column(rng, rng.choice(COLUMN_KINDS), right_rows)
+    return left, right
+
+
+def _outcome(fn: Callable[[], pd.DataFrame]) -> Dict[str, Any]:
+    try:
+        out = fn()
+    except Exception as exc:
+        return {"error": type(exc).__name__}
+    return {"columns": list(out.columns), "dtypes": [str(d) for d in out.dtypes], "csv": out.to_csv(index=False)}
+
+
+def check(cases: int, seed: int) -> int:
+    """Number of random cases where the two builds disagree (printed as they are found)."""
+    rng = random.Random(seed)
+    mismatches = 0
+    for case in range(cases):
+        left, right = random_case(rng, rng.choice([1, 2, 5]), rng.choice([0, 1, 3]))
+        expected = _outcome(lambda: reference_fuzzy_join(left, right, "k", "k2"))
+        actual = _outcome(lambda: fuzzy_join(left, right, "k", "k2"))
+        if expected != actual:
+            mismatches += 1
+            print(f"case {case}: left={left.dtypes.astype(str).to_dict()} right={right.dtypes.astype(str).to_dict()}")
+            print(f"  reference: {expected}\n  vectorised: {actual}")
+    return mismatches
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=500, help="Random cases compared with the reference (default: 500)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rows", type=int, default=0, help="Also time both builds on frames of this many rows per side")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    mismatches = check(args.cases, args.seed)
+    print(f"cases={args.cases} mismatches={mismatches}")
+    if args.rows > 0:
+        left, right = random_case(random.Random(args.seed), args.rows, args.rows)
+        ref = best_of(lambda: reference_fuzzy_join(left, right, "k", "k2"), args.repeat)
+        new = best_of(lambda: fuzzy_join(left, right, "k", "k2"), args.repeat)
+        print(f"rows={args.rows} reference={ref:.3f}s vectorised={new:.3f}s speedup={ref / max(new, 1e-9):.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
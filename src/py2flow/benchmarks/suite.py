@@ -0,0 +1,329 @@
+"""
+Operator micro-benchmarks and case flow macro-benchmarks, saved as JSON and compared to a baseline.
+
+Micro-benchmarks time each operator on synthetic frames; macro-benchmarks run case flows on their
+inputs and on replicas with every CSV's data rows repeated:
+
+    python -m py2flow.benchmarks.suite run --rows 1000,100000 --scales 1,10 --output bench.json
+    python -m py2flow.benchmarks.suite run --baseline baseline.json --threshold 0.2
+    python -m py2flow.benchmarks.suite compare bench.json baseline.json
+
+Everything runs offline in-process; a run exits with status 1 when it regresses against --baseline.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import itertools
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Bump when benchmark definitions change so results are not compared across different workloads.
+SUITE_VERSION = "1"
+
+SCRIPT_CODE = "def transform(df, pd, np):\n    return df.assign(num3=df['num'] * 3)\n"
+
+
+def synthetic_frame(rows: int, cardinality: int, null_rate: float, width: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Columns: key (int, `cardinality` distinct values), skey (its string form, `width` characters,
+    nulls at `null_rate`), num (float, nulls at `null_rate`), val (int), text (padded strings) and
+    month (12 distinct strings).
+    """
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, max(cardinality, 1), rows)
+    pool = np.array([format(i, "x").rjust(width, "k") for i in range(max(cardinality, 1))], dtype=object)
+    skey = pool[codes]
+    skey[rng.random(rows) < null_rate] = None
+    num = rng.random(rows)
+    num[rng.random(rows) < null_rate] = np.nan
+    months = np.array([f"m{i:02d}" for i in range(1, 13)], dtype=object)
+    return pd.DataFrame(
+        {
+            "key": codes,
+            "skey": skey,
+            "num": num,
+            "val": rng.integers(0, 1000, rows),
+            "text": np.array(["  " + s + "  " for s in pool], dtype=object)[codes],
+            "month": months[codes % 12],
+        }
+    )
+
+
+def dimension_frame(cardinality: int) -> pd.DataFrame:
+    keys = np.arange(max(cardinality, 1))
+    return pd.DataFrame({"key": keys, "attr": keys * 10})
+
+
+# Operator -> (params, number of copies of the synthetic frame as inputs, or "dim" for fact + dimension).
+MICRO_CASES: Dict[str, Tuple[Dict[str, Any], Any]] = {
+    "input": ({"path": "micro.csv"}, 0),
+    "output": ({"path": "out/micro.csv"}, 1),
+    "project": (
+        {"compute": [{"as": "num2", "expr": "df['num'] * 2 + df['val']"}], "map": [{"col": "text", "op": "trim"}]},
+        1,
+    ),
+    "filter": ({"predicate": "(df['num'] > 0.5) & df['skey'].notna()"}, 1),
+    "join": ({"how": "left", "on": ["key"]}, "dim"),
+    "union": ({"distinct": False}, 2),
+    "aggregate": (
+        {
+            "group_keys": ["skey"],
+            "aggs": [
+                {"as": "total", "func": "sum", "expr": "df['num']"},
+                {"as": "n", "func": "count"},
+                {"as": "vals", "func": "count_distinct", "expr": "df['val']"},
+            ],
+        },
+        1,
+    ),
+    "dedup": ({"keys": ["key"], "keep": "first", "order_by": [{"expr": "df['num']"}]}, 1),
+    "sort": ({"order_by": [{"expr": "df['skey']"}, {"expr": "df['num']", "asc": False}]}, 1),
+    "pivot": ({"mode": "pivot_wider", "index": ["key"], "columns": ["month"], "values": ["num"], "agg": "sum"}, 1),
+    "script": ({"inline_code": SCRIPT_CODE, "deterministic": True, "side_effects": False}, 1),
+}
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Best and median wall time of repeat calls (after a collection each)."""
+    runs: List[float] = []
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t0)
+    return {"seconds": min(runs), "median": statistics.median(runs), "runs": runs}
+
+
+def run_micro(
+    ops: Sequence[str],
+    rows: Sequence[int],
+    cardinalities: Sequence[int],
+    null_rates: Sequence[float],
+    widths: Sequence[int],
+    repeat: int,
+) -> Dict[str, Dict[str, Any]]:
+    from py2flow.ir import StepKind
+    from py2flow.operators import get_global_operator_registry
+    from py2flow.operators.base import ExecutionContext
+
+    registry = get_global_operator_registry()
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="py2flow-micro-") as tmp:
+        ctx = ExecutionContext(Path(tmp))
+        for n, card, null_rate, width in itertools.product(rows, cardinalities, null_rates, widths):
+            df = synthetic_frame(n, card, null_rate, width)
+            if "input" in ops:
+                df.to_csv(Path(tmp) / "micro.csv", index=False)
+            for op_name in ops:
+                params, arity = MICRO_CASES[op_name]
+                op = registry.get(StepKind(op_name))
+                if op is None:
+                    continue
+                inputs = [df, dimension_frame(card)] if arity == "dim" else [df] * arity
+                key = f"micro/{op_name}/rows={n}/card={card}/null={null_rate}/width={width}"
+                try:
+                    results[key] = time_call(lambda: op.execute(op_name, inputs, params, ctx), repeat)
+                except Exception as exc:
+                    results[key] = {"error": f"{type(exc).__name__}: {exc}"}
+                print(_format_result(key, results[key]), flush=True)
+    return results
+
+
+def case_flow(case_dir: Path) -> Optional[Path]:
+    for candidate in (case_dir / "flow.json", case_dir / "flow_compressed.json"):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def replicate_inputs(case_dir: Path, dest: Path, scale: int) -> None:
+    """Copy case_dir/inputs to dest/inputs, repeating the data lines of each CSV scale times."""
+    src = case_dir / "inputs"
+    for path in src.rglob("*"):
+        if not path.is_file():
+            continue
+        target = dest / "inputs" / path.relative_to(src)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if scale <= 1 or path.suffix.lower() != ".csv":
+            shutil.copyfile(path, target)
+            continue
+        header, sep, body = path.read_bytes().partition(b"\n")
+        if body and not body.endswith(b"\n"):
+            body += b"\n"
+        target.write_bytes(header + sep + body * scale)
+
+
+def run_macro(data_dir: Path, cases: Sequence[str], scales: Sequence[int], repeat: int) -> Dict[str, Dict[str, Any]]:
+    from py2flow.executor import DAGExecutor
+    from py2flow.ir import DAG
+
+    results: Dict[str, Dict[str, Any]] = {}
+    case_dirs = [data_dir / name for name in cases] if cases else sorted(data_dir.glob("case_*"))
+    for case_dir in case_dirs:
+        flow_path = case_flow(case_dir)
+        if flow_path is None:
+            continue
+        flow = json.loads(flow_path.read_text(encoding="utf-8"))
+        for scale in scales:
+            key = f"macro/{case_dir.name}/x{scale}"
+            with tempfile.TemporaryDirectory(prefix="py2flow-macro-") as tmp:
+                replicate_inputs(case_dir, Path(tmp), scale)
+                profiles: List[Any] = []
+
+                def run_once() -> None:
+                    executor = DAGExecutor(DAG.from_dict(flow), base_path=tmp, profile=True)
+                    executor.run(keep="none")
+                    profiles.append(executor.profile)
+
+                try:
+                    results[key] = time_call(run_once, repeat)
+                except Exception as exc:
+                    results[key] = {"error": f"{type(exc).__name__}: {exc}"}
+                else:
+                    best = profiles[results[key]["runs"].index(results[key]["seconds"])]
+                    results[key]["slowest"] = best.summary()["slowest"]
+            print(_format_result(key, results[key]), flush=True)
+    return results
+
+
+def compare(
+    current: Mapping[str, Any], baseline: Mapping[str, Any], threshold: float, min_seconds: float = 0.005
+) -> List[Dict[str, Any]]:
+    """
+    One row per benchmark in either result file. A benchmark regresses when its best time grew by
+    more than threshold (0.2 = 20%) and by more than min_seconds; it improved when it shrank as much.
+    """
+    cur = current.get("results", {})
+    base = baseline.get("results", {})
+    rows: List[Dict[str, Any]] = []
+    for key in sorted(set(cur) | set(base)):
+        new, old = cur.get(key, {}), base.get(key, {})
+        row: Dict[str, Any] = {"benchmark": key, "baseline": old.get("seconds"), "current": new.get("seconds")}
+        if "error" in new:
+            row["status"] = "error" if "error" in old else "broken"
+        elif key not in base or row["baseline"] is None:
+            row["status"] = "new"
+        elif key not in cur:
+            row["status"] = "missing"
+        else:
+            row["ratio"] = row["current"] / row["baseline"] if row["baseline"] > 0 else float("inf")
+            delta = row["current"] - row["baseline"]
+            if row["ratio"] > 1 + threshold and delta > min_seconds:
+                row["status"] = "regression"
+            elif row["ratio"] < 1 - threshold and -delta > min_seconds:
+                row["status"] = "improved"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def print_comparison(rows: Iterable[Mapping[str, Any]], *, only_changes: bool = False) -> None:
+    print(f"{'benchmark':<64} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+    for row in rows:
+        if only_changes and row["status"] == "ok":
+            continue
+        base = f"{row['baseline']:.4f}" if row.get("baseline") is not None else "-"
+        cur = f"{row['current']:.4f}" if row.get("current") is not None else "-"
+        ratio = f"{row['ratio']:.2f}" if "ratio" in row else "-"
+        print(f"{row['benchmark']:<64} {base:>10} {cur:>10} {ratio:>7}  {row['status']}")
+
+
+def metadata(repeat: int) -> Dict[str, Any]:
+    return {
+        "suite_version": SUITE_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+    }
+
+
+def _format_result(key: str, result: Mapping[str, Any]) -> str:
+    if "error" in result:
+        return f"{key:<64} error: {result['error']}"
+    return f"{key:<64} {result['seconds']:>10.4f}s  (median {result['median']:.4f}s)"
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(float(x)) for x in text.split(",") if x.strip()]
+
+
+def _float_list(text: str) -> List[float]:
+    return [float(x) for x in text.split(",") if x.strip()]
+
+
+def _str_list(text: str) -> List[str]:
+    return [x.strip() for x in text.split(",") if x.strip()]
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmarks and save the results")
+    run.add_argument("--micro", action="store_true", help="Run operator micro-benchmarks (default: both suites)")
+    run.add_argument("--macro", action="store_true", help="Run case flow macro-benchmarks (default: both suites)")
+    run.add_argument("--ops", type=_str_list, default=list(MICRO_CASES), help="Comma-separated operators (default: all)")
+    run.add_argument("--rows", type=_int_list, default=[1000, 100000], help="Comma-separated row counts, e.g. 1e3,1e5,1e7 (default: 1e3,1e5)")
+    run.add_argument("--cardinality", type=_int_list, default=[1000], help="Comma-separated distinct key counts (default: 1000)")
+    run.add_argument("--null-rate", type=_float_list, default=[0.1], help="Comma-separated null fractions (default: 0.1)")
+    run.add_argument("--str-width", type=_int_list, default=[12], help="Comma-separated string widths (default: 12)")
+    run.add_argument("--data-dir", default="data", help="Directory containing case_*/ with flow.json or flow_compressed.json (default: data)")
+    run.add_argument("--cases", type=_str_list, default=[], help="Comma-separated case names (default: every case with a flow)")
+    run.add_argument("--scales", type=_int_list, default=[1], help="Comma-separated input replication factors (default: 1)")
+    run.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the best one is kept (default: 3)")
+    run.add_argument("--output", default="bench-results.json", help="Result file (default: bench-results.json)")
+    run.add_argument("--baseline", default="", help="Compare against this result file and exit 1 on regressions")
+    run.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown flagged as regression (default: 0.2)")
+
+    cmp_parser = sub.add_parser("compare", help="Compare two saved result files")
+    cmp_parser.add_argument("current")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown flagged as regression (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        unknown = set(args.ops) - set(MICRO_CASES)
+        if unknown:
+            parser.error(f"--ops has unknown operator(s): {sorted(unknown)}")
+        both = not args.micro and not args.macro
+        results: Dict[str, Dict[str, Any]] = {}
+        if args.micro or both:
+            results.update(run_micro(args.ops, args.rows, args.cardinality, args.null_rate, args.str_width, args.repeat))
+        if args.macro or both:
+            results.update(run_macro(Path(args.data_dir), args.cases, args.scales, args.repeat))
+        current = {"meta": metadata(args.repeat), "results": results}
+        Path(args.output).write_text(json.dumps(current, indent=2), encoding="utf-8")
+        print(f"wrote {args.output}")
+        if not args.baseline:
+            return 0
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    else:
+        current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+
+    if current.get("meta", {}).get("suite_version") != baseline.get("meta", {}).get("suite_version"):
+        print("warning: result files come from different suite versions", file=sys.stderr)
+    rows = compare(current, baseline, args.threshold)
+    print_comparison(rows)
+    return 1 if any(row["status"] in {"regression", "broken"} for row in rows) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
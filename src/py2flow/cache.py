@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import pandas as pd
+
+from .ir import Node, StepKind
+from .operators.base import copy_on_write_enabled
+
+# Bump when operator semantics change so stale on-disk entries are never served.
+CACHE_VERSION = "1"
+
+
+def canonical_params(params: Mapping[str, Any] | None) -> str:
+    """
+    Stable JSON form of node params used for fingerprinting.
+
+    Top-level keys starting with "_" are metadata (see ir.validate) and do not affect results.
+    """
+    body = {k: v for k, v in dict(params or {}).items() if not str(k).startswith("_")}
+    return json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=repr)
+
+
+def is_cacheable(node: Node) -> bool:
+    """Output nodes write files and scripts may be impure; neither is served from cache."""
+    if node.kind is StepKind.OUTPUT:
+        return False
+    if node.kind is StepKind.SCRIPT:
+        params = node.params or {}
+        return params.get("deterministic") is True and params.get("side_effects") is False
+    return True
+
+
+def input_identity(node: Node, ctx: Any) -> Optional[str]:
+    """
+    File identity (real path, mtime, size) of an input node, "inline" for inline data,
+    or None when the result cannot be addressed by content (injected tables, missing files).
+    """
+    if ctx.input_tables is not None and ctx.input_tables.get(node.id) is not None:
+        return None
+    params = node.params or {}
+    if params.get("data") is not None or params.get("source_type") == "inline":
+        return "inline"
+    path = params.get("path")
+    if not isinstance(path, str) or not path:
+        return None
+    try:
+        resolved = ctx.resolve_path(path).resolve()
+        st = resolved.stat()
+    except Exception:
+        return None
+    return f"{resolved}|{st.st_mtime_ns}|{st.st_size}"
+
+
+def node_fingerprint(
+    node: Node,
+    upstream: Sequence[Optional[str]],
+    operator: Any,
+    ctx: Any,
+) -> Optional[str]:
+    """
+    Content address of a node result: kind, canonical params, operator implementation,
+    upstream fingerprints and (for inputs) file identity. None means "do not cache".
+    """
+    if not is_cacheable(node) or any(fp is None for fp in upstream):
+        return None
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}|pandas={pd.__version__}|".encode("utf-8"))
+    h.update(f"{node.kind.value}|{type(operator).__module__}.{type(operator).__qualname__}|".encode("utf-8"))
+    h.update(canonical_params(node.params).encode("utf-8"))
+    for fp in upstream:
+        h.update(b"|" + str(fp).encode("utf-8"))
+    if node.kind is StepKind.INPUT:
+        ident = input_identity(node, ctx)
+        if ident is None:
+            return None
+        h.update(b"|file=" + ident.encode("utf-8"))
+    return h.hexdigest()
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class ResultCache(ABC):
+    """Pluggable node-result store. Implementations must be thread-safe."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+
+class MemoryTier:
+    """LRU over DataFrames bounded by entry count and total deep memory usage."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 1 << 30) -> None:
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self._items: "OrderedDict[str, tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key: str, df: pd.DataFrame, nbytes: int) -> None:
+        if nbytes > self.max_bytes or self.max_entries <= 0:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        self._items[key] = (df, nbytes)
+        self._bytes += nbytes
+        while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+            _, (_, size) = self._items.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+class DiskTier:
+    """Pickled DataFrames under a directory, evicted least-recently-used first by total size."""
+
+    def __init__(self, directory: str | Path, max_bytes: int = 4 << 30) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = int(max_bytes)
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        try:
+            with path.open("rb") as f:
+                df = pickle.load(f)
+            os.utime(path)
+        except Exception:
+            return None
+        return df if isinstance(df, pd.DataFrame) else None
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for p in self.directory.glob("*/*.pkl"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, p))
+            total += st.st_size
+        entries.sort()
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+
+
+class NodeResultCache(ResultCache):
+    """
+    Two-tier cache: in-memory LRU in front of an optional on-disk store.
+
+    Entries are deep copies so later in-place edits by a caller can never leak into the cache.
+    Hits are deep copies too, or lazy shallow ones under pandas copy-on-write, so a consumer
+    editing a hit in place cannot corrupt the entry either.
+    """
+
+    def __init__(
+        self,
+        *,
+        memory_entries: int = 256,
+        memory_bytes: int = 1 << 30,
+        disk_dir: str | Path | None = None,
+        disk_bytes: int = 4 << 30,
+    ) -> None:
+        self.memory = MemoryTier(memory_entries, memory_bytes)
+        self.disk = DiskTier(disk_dir, disk_bytes) if disk_dir is not None else None
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "stores": 0}
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            df = self.memory.get(key)
+            if df is not None:
+                self._counters["hits"] += 1
+                self._counters["memory_hits"] += 1
+                return df.copy(deep=not copy_on_write_enabled())
+        if self.disk is not None:
+            df = self.disk.get(key)
+            if df is not None:
+                with self._lock:
+                    self.memory.put(key, df, frame_nbytes(df))
+                    self._counters["hits"] += 1
+                    self._counters["disk_hits"] += 1
+                return df.copy(deep=not copy_on_write_enabled())
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        stored = df.copy(deep=True)
+        nbytes = frame_nbytes(stored)
+        with self._lock:
+            self.memory.put(key, stored, nbytes)
+            self._counters["stores"] += 1
+        if self.disk is not None:
+            self.disk.put(key, stored)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._counters)
+            out["memory_entries"] = len(self.memory)
+            out["memory_bytes"] = self.memory.nbytes
+            out["evictions"] = self.memory.evictions + (self.disk.evictions if self.disk is not None else 0)
+        return out
@@ -0,0 +1,677 @@
+"""
+DuckDB execution backend: an OperatorRegistry whose operators compile relational nodes to SQL.
+
+Project, filter, join, union, aggregate, dedup and sort return a lazy SqlFrame instead of a
+DataFrame: a chain of CTEs, one per node, ending in that node's query. A chain grows as long as
+consecutive nodes translate, so a flow made only of relational kinds becomes a single query per
+output, run in-process by DuckDB with its own join ordering, parallel scans and late
+materialisation. The query runs only when a pandas operator (output, pivot, script, or a node that
+does not translate) needs the frame.
+
+pandas row order is kept by carrying a hidden ordinal column through every CTE and ordering by it
+once at the end. Nodes whose params, expressions or column types fall outside the translated subset
+run their pandas operator on materialised inputs; a query that fails at run time is recomputed
+the same way, node by node.
+
+Requires the optional ``duckdb`` dependency (``pip install prepbench[duckdb]``).
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .arrow_io import restore_object_nan
+from .backend_expr import SQL_NUMERIC_KINDS, sql_expr, sql_ident
+from .ir import StepKind
+from .operators import OperatorRegistry
+from .operators.aggregate import Aggregate
+from .operators.base import ExecutionContext, Operator
+from .operators.dedup import Dedup
+from .operators.expr import referenced_columns
+from .operators.filter import Filter
+from .operators.input import Input
+from .operators.join import Join
+from .operators.output import Output
+from .operators.pivot import Pivot
+from .operators.project import Project
+from .operators.script import Script
+from .operators.sort import Sort
+from .operators.union import Union
+
+# Hidden ordinal carried by every CTE; the final query orders by it and drops it.
+ROW_ORDER = "__py2flow_rn__"
+_RN = sql_ident(ROW_ORDER)
+
+_INT_TYPES = frozenset({"TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT", "UINTEGER"})
+_FLOAT_TYPES = frozenset({"FLOAT", "DOUBLE"})
+
+
+def _duckdb() -> Any:
+    try:
+        import duckdb
+    except ImportError as exc:
+        raise ImportError("the duckdb engine requires duckdb (pip install prepbench[duckdb])") from exc
+    return duckdb
+
+
+def _kind(sql_type: str) -> str:
+    if sql_type in _INT_TYPES:
+        return "int"
+    if sql_type in _FLOAT_TYPES:
+        return "float"
+    if sql_type == "VARCHAR":
+        return "str"
+    if sql_type == "BOOLEAN":
+        return "bool"
+    return "other"
+
+
+def _registrable(df: pd.DataFrame) -> bool:
+    """True when DuckDB reads df back unchanged: unique str labels; int, float, bool or all-str object columns."""
+    if not all(isinstance(c, str) for c in df.columns) or not df.columns.is_unique or ROW_ORDER in df.columns:
+        return False
+    for i, dtype in enumerate(df.dtypes):
+        if dtype == object:
+            if pd.api.types.infer_dtype(df.iloc[:, i], skipna=True) != "string":
+                return False
+        elif not isinstance(dtype, np.dtype) or not (dtype == bool or dtype.kind == "f" or dtype.kind == "i" or (dtype.kind == "u" and dtype.itemsize < 8)):
+            return False
+    return True
+
+
+def _from_duckdb(df: pd.DataFrame) -> pd.DataFrame:
+    """Map DuckDB's nullable result dtypes to what pandas operators produce for the same values."""
+    for i, dtype in enumerate(df.dtypes):
+        if isinstance(dtype, pd.core.arrays.integer.IntegerDtype):
+            col = df.iloc[:, i]
+            df.isetitem(i, col.astype("float64") if col.isna().any() else col.astype(dtype.numpy_dtype))
+        elif isinstance(dtype, pd.BooleanDtype):
+            col = df.iloc[:, i]
+            df.isetitem(i, col.astype(object).where(col.notna(), np.nan) if col.isna().any() else col.astype(bool))
+    return restore_object_nan(df)
+
+
+class _Table:
+    """Handle on a pandas frame registered with the engine; unregistered once no SqlFrame holds it."""
+
+    def __init__(self, engine: "DuckDBEngine", name: str, df: pd.DataFrame) -> None:
+        self.name = name
+        engine.register(name, df)
+        weakref.finalize(self, engine.unregister, name)
+
+
+class SqlFrame:
+    """
+    A node result not yet computed: CTEs ending in ``name``, the registered frames they scan, and
+    the column kinds seen by sql_expr. to_pandas() runs the query once; if DuckDB raises, it
+    computes the same frame with ``fallback`` (the node's pandas operator) instead.
+    """
+
+    def __init__(
+        self,
+        engine: "DuckDBEngine",
+        name: str,
+        ctes: Tuple[Tuple[str, str], ...],
+        tables: Sequence[_Table],
+        fallback: Callable[[], pd.DataFrame],
+    ) -> None:
+        self.engine = engine
+        self.name = name
+        self.ctes = ctes
+        self.tables = tuple(tables)
+        self.fallback = fallback
+        self.columns, types = engine.describe(self)
+        self.kinds: Dict[str, str] = {c: _kind(t) for c, t in zip(self.columns, types)}
+        self._result: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    def query(self, order: bool = True) -> str:
+        body = ",\n".join(f"{name} AS ({sql})" for name, sql in self.ctes)
+        return f"WITH {body}\nSELECT * EXCLUDE ({_RN}) FROM {self.name}" + (f" ORDER BY {_RN}" if order else "")
+
+    def to_pandas(self) -> pd.DataFrame:
+        with self._lock:
+            if self._result is None:
+                try:
+                    self._result = self.engine.fetch(self)
+                except Exception:
+                    self.engine.count("query_errors")
+                    self._result = self.fallback()
+            # Several consumers may materialise the same frame; each gets its own column container.
+            return self._result.copy(deep=False)
+
+
+def to_pandas(df: Any) -> Any:
+    return df.to_pandas() if isinstance(df, SqlFrame) else df
+
+
+class DuckDBEngine:
+    """
+    One in-memory DuckDB connection per run. Calls into it are serialised; DuckDB parallelises
+    each query itself (``threads`` caps the worker count).
+    """
+
+    def __init__(self, threads: int | None = None) -> None:
+        duckdb = _duckdb()
+        config = {"threads": threads} if threads else {}
+        self._con = duckdb.connect(":memory:", config=config)
+        # Re-entrant: a table finalizer can run during garbage collection inside a locked call.
+        self._lock = threading.RLock()
+        self._names = itertools.count()
+        self.stats: Dict[str, int] = {"queries": 0, "probes": 0, "query_errors": 0, "sql_nodes": 0, "pandas_nodes": 0}
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def fresh(self, prefix: str) -> str:
+        with self._lock:
+            return f"{prefix}{next(self._names)}"
+
+    def register(self, name: str, df: pd.DataFrame) -> None:
+        with self._lock:
+            self._con.register(name, df)
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            try:
+                self._con.unregister(name)
+            except Exception:
+                pass
+
+    def describe(self, frame: SqlFrame) -> Tuple[List[str], List[str]]:
+        with self._lock:
+            rel = self._con.sql(frame.query(order=False))
+            return list(rel.columns), [str(t) for t in rel.types]
+
+    def fetch(self, frame: SqlFrame) -> pd.DataFrame:
+        with self._lock:
+            self.stats["queries"] += 1
+            df = self._con.sql(frame.query()).df()
+        return _from_duckdb(df)
+
+    def any_null(self, frame: SqlFrame, columns: Sequence[str]) -> bool:
+        """Whether any of the columns holds a null; runs the frame's query without materialising it."""
+        cond = " OR ".join(f"{sql_ident(c)} IS NULL" for c in columns)
+        with self._lock:
+            self.stats["probes"] += 1
+            row = self._con.sql(f"SELECT EXISTS (SELECT 1 FROM ({frame.query(order=False)}) WHERE {cond})").fetchone()
+        return bool(row[0])
+
+    def scan(self, df: pd.DataFrame, fallback: Callable[[], pd.DataFrame]) -> Optional[SqlFrame]:
+        """A SqlFrame over a pandas frame, or None when its dtypes would not survive the round trip."""
+        if not _registrable(df):
+            return None
+        table = _Table(self, self.fresh("t"), df)
+        name = self.fresh("q")
+        sql = f"SELECT s.*, o.range AS {_RN} FROM {table.name} AS s POSITIONAL JOIN range({len(df)}) AS o"
+        return SqlFrame(self, name, ((name, sql),), [table], fallback)
+
+    def derive(self, parents: Sequence[SqlFrame], sql: str, fallback: Callable[[], pd.DataFrame]) -> SqlFrame:
+        """A SqlFrame whose query is sql over the parents' CTEs (referenced by their .name)."""
+        ctes: Dict[str, str] = {}
+        tables: Dict[str, _Table] = {}
+        for parent in parents:
+            ctes.update(parent.ctes)
+            tables.update((t.name, t) for t in parent.tables)
+        name = self.fresh("q")
+        ctes[name] = sql
+        return SqlFrame(self, name, tuple(ctes.items()), list(tables.values()), fallback)
+
+
+def _only_keys(params: Mapping[str, Any], allowed: set) -> bool:
+    return all(k in allowed or str(k).startswith("_") for k in params)
+
+
+def _cols(names: Sequence[str]) -> str:
+    return ", ".join(sql_ident(c) for c in names)
+
+
+class _Step:
+    """Builds one node's CTEs on top of its inputs; each step() call adds a CTE and re-binds for column kinds."""
+
+    def __init__(self, engine: DuckDBEngine, inputs: Sequence[SqlFrame], fallback: Callable[[], pd.DataFrame]) -> None:
+        self.engine = engine
+        self.frame = inputs[0]
+        self.inputs = list(inputs)
+        self.fallback = fallback
+
+    def step(self, sql: Callable[[str], str], parents: Optional[Sequence[SqlFrame]] = None) -> SqlFrame:
+        self.frame = self.engine.derive(parents or [self.frame], sql(self.frame.name), self.fallback)
+        return self.frame
+
+
+class SqlOperator(Operator):
+    """Runs plan() to extend its inputs' query; when plan returns None or fails to bind, runs the pandas operator."""
+
+    def __init__(self, engine: DuckDBEngine, fallback: Operator) -> None:
+        self.engine = engine
+        self.fallback = fallback
+
+    def plan(self, node_id: str, step: _Step, params: Mapping[str, Any]) -> Optional[SqlFrame]:
+        return None
+
+    def execute(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        def run_pandas() -> pd.DataFrame:
+            return self.fallback.execute(node_id, [to_pandas(df) for df in inputs], params, ctx)
+
+        frames = [df if isinstance(df, SqlFrame) else self.engine.scan(df, lambda df=df: df) for df in inputs]
+        if frames and all(f is not None for f in frames):
+            try:
+                out = self.plan(node_id, _Step(self.engine, frames, run_pandas), params)  # type: ignore[arg-type]
+                if out is not None:
+                    self.engine.count("sql_nodes")
+                    return out
+            except Exception as exc:
+                ctx.logger.debug("duckdb fallback node=%s error=%s", node_id, exc)
+        ctx.logger.debug("duckdb fallback node=%s kind=%s", node_id, type(self.fallback).__name__)
+        self.engine.count("pandas_nodes")
+        return run_pandas()
+
+
+class PandasOnly(Operator):
+    """Wraps a pandas operator so it accepts SqlFrame inputs (input, output, pivot, script)."""
+
+    def __init__(self, operator: Operator) -> None:
+        self.operator = operator
+
+    def execute(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        return self.operator.execute(node_id, [to_pandas(df) for df in inputs], params, ctx)
+
+
+def _translate(expr: Any, kinds: Mapping[str, str], allowed: frozenset) -> Optional[str]:
+    if not isinstance(expr, str) or not expr:
+        return None
+    out = sql_expr(expr, kinds)
+    return out[0] if out is not None and out[1] in allowed else None
+
+
+_VALUE_KINDS = SQL_NUMERIC_KINDS | {"str", "bool"}
+_PREDICATE_KINDS = frozenset({"bool", "nbool"})
+
+
+def _where(pred: str) -> str:
+    return f"COALESCE({pred}, FALSE)"
+
+
+class SqlProject(SqlOperator):
+    def plan(self, node_id: str, step: _Step, params: Mapping[str, Any]) -> Optional[SqlFrame]:
+        if not _only_keys(params, {"select", "rename", "compute", "cast", "map", "on_error"}):
+            return None
+        if params.get("cast") or params.get("map") or params.get("on_error", "error") != "error":
+            return None
+        columns = step.frame.columns
+        select = params.get("select")
+        if select is not None:
+            if not isinstance(select, list):
+                return None
+            cols: List[str] = []
+            for item in select:
+                cols.extend(columns if item == "*" else [str(item)])
+            if len(set(cols)) != len(cols) or any(c not in columns for c in cols):
+                return None
+            step.step(lambda src: f"SELECT {_cols(cols)}, {_RN} FROM {src}")
+        rename = params.get("rename")
+        if rename is not None:
+            if not isinstance(rename, Mapping) or not all(isinstance(v, str) and v for v in rename.values()):
+                return None
+            names = [rename.get(c, c) for c in step.frame.columns]
+            if len(set(names)) != len(names) or ROW_ORDER in names:
+                return None
+            renamed = ", ".join(f"{sql_ident(c)} AS {sql_ident(n)}" for c, n in zip(step.frame.columns, names))
+            step.step(lambda src: f"SELECT {renamed}, {_RN} FROM {src}")
+        compute = params.get("compute") or []
+        if not isinstance(compute, list):
+            return None
+        for item in compute:
+            if not isinstance(item, Mapping):
+                return None
+            as_col = item.get("as")
+            if not isinstance(as_col, str) or not as_col or as_col == ROW_ORDER:
+                return None
+            value = _translate(item.get("expr"), step.frame.kinds, _VALUE_KINDS)
+            if value is None:
+                return None
+            # df[as] = ... replaces an existing column in place, otherwise appends one.
+            if as_col in step.frame.columns:
+                step.step(lambda src: f"SELECT * REPLACE ({value} AS {sql_ident(as_col)}) FROM {src}")
+            else:
+                step.step(lambda src: f"SELECT *, {value} AS {sql_ident(as_col)} FROM {src}")
+        return step.frame
+
+
+class SqlFilter(SqlOperator):
+    def plan(self, node_id: str, step: _Step, params: Mapping[str, Any]) -> Optional[SqlFrame]:
+        # null_as_false=false keeps null rows via astype(bool); leave that to pandas.
+        if not _only_keys(params, {"predicate", "null_as_false"}) or params.get("null_as_false", True) is not True:
+            return None
+        pred = _translate(params.get("predicate"), step.frame.kinds, _PREDICATE_KINDS)
+        if pred is None:
+            return None
+        return step.step(lambda src: f"SELECT * FROM {src} WHERE {_where(pred)}")
+
+
+def _order_terms(kinds: Mapping[str, str], order_by: Any) -> Optional[List[str]]:
+    """ORDER BY terms matching _build_order_by: a null flag before each key, then the input order."""
+    if not isinstance(order_by, list) or not order_by:
+        return None
+    terms: List[str] = []
+    for item in order_by:
+        if not isinstance(item, Mapping):
+            return None
+        asc = item.get("asc", True)
+        nulls = item.get("nulls", "last")
+        key = _translate(item.get("expr"), kinds, _VALUE_KINDS)
+        if key is None or not isinstance(asc, bool) or nulls not in {"first", "last"}:
+            return None
+        terms.append(f"({key}) IS NULL {'ASC' if nulls == 'last' else 'DESC'}")
+        terms.append(f"{key} {'ASC' if asc else 'DESC'}")
+    terms.append(_RN)
+    return terms
+
+
+def _sorted(step: _Step, terms: List[str]) -> SqlFrame:
+    return step.step(lambda src: f"SELECT * EXCLUDE ({_RN}), row_number() OVER (ORDER BY {', '.join(terms)}) AS {_RN} FROM {src}")
+
+
+class SqlSort(SqlOperator):
+    def plan(self, node_id: str, step: _Step, params: Mapping[str, Any]) -> Optional[SqlFrame]:
+        if not _only_keys(params, {"order_by", "stable", "limit", "partition_by", "limit_per_group"}):
+            return None
+        terms = _order_terms(step.frame.kinds, params.get("order_by"))
+        limit = params.get("limit")
+        partition_by = params.get("partition_by")
+        limit_per_group = params.get("limit_per_group")
+        # Sort always passes a null flag plus the key to sort_values, so the order is stable either way.
+        if terms is None or not isinstance(params.get("stable", True), bool):
+            return None
+        if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 0):
+            return None
+        if partition_by is not None and (not isinstance(partition_by, list) or not partition_by or not all(isinstance(x, str) and x in step.frame.columns for x in partition_by)):
+            return None
+        if limit_per_group is not None and (not isinstance(limit_per_group, int) or isinstance(limit_per_group, bool) or limit_per_group < 0):
+            return None
+        _sorted(step, terms)
+        if partition_by is not None and limit_per_group is not None:
+            # groupby(...).cumcount() leaves rows with a null partition key unranked, so they drop out.
+            present = " AND ".join(f"{sql_ident(c)} IS NOT NULL" for c in partition_by)
+            step.step(
+                lambda src: f"SELECT * FROM {src} WHERE {present} "
+                f"QUALIFY row_number() OVER (PARTITION BY {_cols(partition_by)} ORDER BY {_RN}) <= {limit_per_group}"
+            )
+        if limit is not None:
+            step.step(lambda src: f"SELECT * FROM {src} ORDER BY {_RN} LIMIT {limit}")
+        return step.frame
+
+
+def _first_per(step: _Step, keys: Sequence[str], last: bool = False) -> SqlFrame:
+    order = f"{_RN} DESC" if last else _RN
+    return step.step(lambda src: f"SELECT * FROM {src} QUALIFY row_number() OVER (PARTITION BY {_cols(keys)} ORDER BY {order}) = 1")
+
+
+class SqlDedup(SqlOperator):
+    def plan(self, node_id: str, step: _Step, params: Mapping[str, Any]) -> Optional[SqlFrame]:
+        if not _only_keys(params, {"keys", "output", "keep", "order_by", "output_order"}):
+            return None
+        keys = params.get("keys")
+        output = params.get("output", "all_cols")
+        keep = params.get("keep", "first")
+        output_order = params.get("output_order", "sorted")
+        columns = step.frame.columns
+        if keys is None:
+            return _first_per(step, columns)
+        if not isinstance(keys, list) or not keys or not all(isinstance(k, str) and k in columns for k in keys):
+            return None
+        if output == "keys_only":
+            step.step(lambda src: f"SELECT {_cols(keys)}, {_RN} FROM {src}")
+            return _first_per(step, keys)
+        if output != "all_cols":
+            return None
+        if keep == "none":
+            return step.step(lambda src: f"SELECT * FROM {src} QUALIFY count(*) OVER (PARTITION BY {_cols(keys)}) = 1")
+        if keep not in {"first", "last"}:
+            return None
+        terms = _order_terms(step.frame.kinds, params.get("order_by"))
+        if terms is None or output_order not in {"sorted", "input"}:
+            return None
+        if output_order == "input":
+            # Rank within each key and keep the input ordinal instead of renumbering by the sort.
+            window = f"OVER (PARTITION BY {_cols(keys)} ORDER BY {', '.join(terms)})"
+            bound = f"count(*) OVER (PARTITION BY {_cols(keys)})" if keep == "last" else "1"
+            return step.step(lambda src: f"SELECT * FROM {src} QUALIFY row_number() {window} = {bound}")
+        _sorted(step, terms)
+        return _first_per(step, keys, last=keep == "last")
+
+
+def _agg_sql(func: str, value: str, kind: str, distinct: bool) -> Optional[str]:
+    d = "DISTINCT " if distinct else ""
+    if func == "count":
+        return f"count({d}{value})"
+    if func == "count_distinct":
+        return f"count(DISTINCT {value})"
+    if func in {"min", "max"}:
+        if kind == "str":
+            # pandas compares str with NaN and raises; fail the query so the pandas operator raises too.
+            return f"CASE WHEN count({value}) = count(*) THEN {func}({d}{value}) ELSE error('{func} over str with nulls') END"
+        return f"{func}({d}{value})" if kind in SQL_NUMERIC_KINDS else None
+    if kind not in SQL_NUMERIC_KINDS:
+        return None
+    if func == "sum":
+        # pandas sums an all-null group to 0; groupby sums floats with compensated summation.
+        return f"COALESCE(CAST(sum({d}{value}) AS BIGINT), 0)" if kind == "int" else f"COALESCE(fsum({d}{value}), 0.0)"
+    if func == "avg":
+        return f"(fsum({d}{value}) / NULLIF(count({d}{value}), 0))"
+    return None
+
+
+class SqlAggregate(SqlOperator):
+    def plan(self, node_id: str, step: _Step, params: Mapping[str, Any]) -> Optional[SqlFrame]:
+        if not _only_keys(params, {"group_keys", "aggs", "having", "null_group"}):
+            return None
+        kinds = step.frame.kinds
+        group_keys = params.get("group_keys", [])
+        aggs = params.get("aggs")
+        having = params.get("having")
+        null_group = bool(params.get("null_group", True))
+        if not isinstance(group_keys, list) or not all(isinstance(k, str) and k in kinds for k in group_keys):
+            return None
+        if not isinstance(aggs, list) or not aggs:
+            return None
+        if group_keys and null_group and step.engine.any_null(step.frame, group_keys):
+            # pandas restores null keys as object <NA>; DuckDB would keep the key type (3 comes back as 3.0).
+            return None
+        select = [sql_ident(k) for k in group_keys]
+        names = list(group_keys)
+        for agg in aggs:
+            if not isinstance(agg, Mapping):
+                return None
+            out_name, func, text = agg.get("as"), agg.get("func"), agg.get("expr")
+            if not isinstance(out_name, str) or not out_name or out_name in names or out_name == ROW_ORDER:
+                return None
+            if text is None and func == "count":
+                select.append(f"count(*) AS {sql_ident(out_name)}")
+                names.append(out_name)
+                continue
+            if group_keys and null_group:
+                # Aggregate swaps null keys for a sentinel string before evaluating expressions.
+                refs = referenced_columns(text) if isinstance(text, str) else None
+                if refs is None or refs & set(group_keys):
+                    return None
+            translated = sql_expr(text, kinds) if isinstance(text, str) and text else None
+            if translated is None:
+                return None
+            sql = _agg_sql(str(func), translated[0], translated[1], bool(agg.get("distinct", False)))
+            if sql is None:
+                return None
+            select.append(f"{sql} AS {sql_ident(out_name)}")
+            names.append(out_name)
+        if group_keys:
+            # sort=False in pandas: groups in order of first appearance.
+            where = "" if null_group else " WHERE " + " AND ".join(f"{sql_ident(k)} IS NOT NULL" for k in group_keys)
+            step.step(lambda src: f"SELECT {', '.join(select)}, min({_RN}) AS {_RN} FROM {src}{where} GROUP BY {_cols(group_keys)}")
+        else:
+            step.step(lambda src: f"SELECT {', '.join(select)}, 0 AS {_RN} FROM {src}")
+        if having is not None:
+            pred = _translate(having, step.frame.kinds, _PREDICATE_KINDS)
+            if pred is None:
+                return None
+            step.step(lambda src: f"SELECT * FROM {src} WHERE {_where(pred)}")
+        return step.frame
+
+
+def _span(frame: SqlFrame) -> str:
+    """Bound above every ordinal in frame plus one, so r.rn + 1 and branch offsets never collide (ordinals are >= 0)."""
+    return f"(SELECT COALESCE(max({_RN}), 0) + 2 FROM {frame.name})"
+
+
+def _compatible(a: str, b: str) -> bool:
+    return (a == b and a in {"str", "bool"}) or (a in SQL_NUMERIC_KINDS and b in SQL_NUMERIC_KINDS)
+
+
+class SqlUnion(SqlOperator):
+    def plan(self, node_id: str, step: _Step, params: Mapping[str, Any]) -> Optional[SqlFrame]:
+        if not _only_keys(params, {"distinct", "align", "fill_missing", "type_coerce"}):
+            return None
+        distinct = params.get("distinct")
+        fill_missing = params.get("fill_missing", "null")
+        frames = step.inputs
+        if len(frames) < 2 or not isinstance(distinct, bool) or fill_missing not in {"null", "error"}:
+            return None
+        if params.get("align", "by_name") != "by_name" or params.get("type_coerce", "error") != "error":
+            return None
+        all_cols: List[str] = []
+        kinds: Dict[str, str] = {}
+        for frame in frames:
+            for name, kind in frame.kinds.items():
+                if name not in kinds:
+                    all_cols.append(name)
+                    kinds[name] = kind
+                elif not _compatible(kinds[name], kind):
+                    # pandas would upcast to object (e.g. bool with int); SQL would pick a supertype.
+                    return None
+        partial = {c for c in all_cols if any(c not in f.kinds for f in frames)}
+        if fill_missing == "error" and partial:
+            return None
+        # pandas fills missing columns with float NaN before concat; only float/str come out the same.
+        if any(kinds[c] not in {"float", "str"} for c in partial):
+            return None
+        branches = []
+        for i, frame in enumerate(frames):
+            cols = ", ".join(sql_ident(c) if c in frame.kinds else f"NULL AS {sql_ident(c)}" for c in all_cols)
+            # Each branch's ordinals start past the largest one of the branches before it.
+            offset = " + ".join(["0"] + [_span(f) for f in frames[:i]])
+            branches.append(f"SELECT {cols}, {_RN} + ({offset}) AS {_RN} FROM {frame.name}")
+        body = " UNION ALL ".join(branches)
+        step.step(lambda src: body, parents=frames)
+        return _first_per(step, all_cols) if distinct else step.frame
+
+
+def _key_list(value: Any) -> Optional[List[str]]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and value and all(isinstance(x, str) and x for x in value):
+        return list(value)
+    return None
+
+
+def _expand(select: Any, names: List[str]) -> Optional[List[str]]:
+    if select is None:
+        return list(names)
+    if not isinstance(select, list) or not all(isinstance(x, str) and x for x in select):
+        return None
+    out: List[str] = []
+    for item in select:
+        out.extend(names if item == "*" else [item])
+    return out
+
+
+class SqlJoin(SqlOperator):
+    def plan(self, node_id: str, step: _Step, params: Mapping[str, Any]) -> Optional[SqlFrame]:
+        if not _only_keys(params, {"how", "on", "left_on", "right_on", "null_equal", "suffixes", "select_left", "select_right", "fuzzy_match"}):
+            return None
+        if params.get("fuzzy_match", False) is not False:
+            return None
+        how = params.get("how", "inner")
+        if how not in {"inner", "left", "semi", "anti"}:
+            return None
+        left, right = step.inputs
+        lkinds, rkinds = left.kinds, right.kinds
+        on, left_on, right_on = (_key_list(params.get(k)) for k in ("on", "left_on", "right_on"))
+        if on is not None:
+            if left_on is not None or right_on is not None:
+                return None
+            left_keys = right_keys = on
+        elif left_on is not None and right_on is not None and len(left_on) == len(right_on):
+            left_keys, right_keys = left_on, right_on
+        else:
+            return None
+        if not all(k in lkinds for k in left_keys) or not all(k in rkinds for k in right_keys):
+            return None
+        pairs = list(zip(left_keys, right_keys))
+        if not all(_compatible(lkinds[lk], rkinds[rk]) and lkinds[lk] != "bool" for lk, rk in pairs):
+            return None
+        null_equal = bool(params.get("null_equal", False))
+        eq = "IS NOT DISTINCT FROM" if null_equal else "="
+        cond = " AND ".join(f"l.{sql_ident(lk)} {eq} r.{sql_ident(rk)}" for lk, rk in pairs)
+        if how in {"semi", "anti"}:
+            exists = "EXISTS" if how == "semi" else "NOT EXISTS"
+            return step.step(lambda src: f"SELECT l.* FROM {left.name} AS l WHERE {exists} (SELECT 1 FROM {right.name} AS r WHERE {cond})", parents=[left, right])
+
+        suffixes = params.get("suffixes", ["_x", "_y"])
+        if not isinstance(suffixes, list) or len(suffixes) != 2:
+            return None
+        sx, sy = str(suffixes[0]), str(suffixes[1])
+        lcols, rcols = left.columns, right.columns
+        shared = set(on) if on is not None else {lk for lk, rk in zip(left_keys, right_keys) if lk == rk}
+        overlap = (set(lcols) & set(rcols)) - shared
+        select: List[str] = []
+        names: List[str] = []
+        for side, alias, wanted_param, cols, suffix in (("left", "l", "select_left", lcols, sx), ("right", "r", "select_right", rcols, sy)):
+            wanted = _expand(params.get(wanted_param), cols)
+            if wanted is None or any(c not in cols for c in wanted):
+                return None
+            for c in wanted:
+                name = c if c in shared or c not in overlap else c + suffix
+                if name in names:
+                    continue
+                if side == "right" and how == "left" and rkinds[c] not in {"float", "str"}:
+                    # Unmatched rows turn int/bool columns into float/object in pandas.
+                    return None
+                # A shared key comes from the left frame, as pandas does for on= keys.
+                src = "l" if c in shared else alias
+                select.append(f"{src}.{sql_ident(c)} AS {sql_ident(name)}")
+                names.append(name)
+        if len(set(names)) != len(names) or ROW_ORDER in names:
+            return None
+        join = "JOIN" if how == "inner" else "LEFT JOIN"
+        return step.step(
+            # Ordered by left row, then right row (unmatched first); HUGEINT leaves room for chained joins.
+            lambda src: f"SELECT {', '.join(select)}, CAST(l.{_RN} AS HUGEINT) * ({_span(right)}) + COALESCE(r.{_RN} + 1, 0) AS {_RN} "
+            f"FROM {left.name} AS l {join} {right.name} AS r ON {cond}",
+            parents=[left, right],
+        )
+
+
+def duckdb_operator_registry(engine: DuckDBEngine | None = None) -> OperatorRegistry:
+    """Operator registry for DAGExecutor(operator_registry=...) that runs relational nodes as DuckDB queries."""
+    engine = engine if engine is not None else DuckDBEngine()
+    return OperatorRegistry(
+        {
+            StepKind.INPUT: PandasOnly(Input()),
+            StepKind.OUTPUT: PandasOnly(Output()),
+            StepKind.PROJECT: SqlProject(engine, Project()),
+            StepKind.FILTER: SqlFilter(engine, Filter()),
+            StepKind.DEDUP: SqlDedup(engine, Dedup()),
+            StepKind.JOIN: SqlJoin(engine, Join()),
+            StepKind.UNION: SqlUnion(engine, Union()),
+            StepKind.AGGREGATE: SqlAggregate(engine, Aggregate()),
+            StepKind.PIVOT: PandasOnly(Pivot()),
+            StepKind.SCRIPT: PandasOnly(Script()),
+            StepKind.SORT: SqlSort(engine, Sort()),
+        }
+    )
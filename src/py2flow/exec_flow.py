@@ -5,10 +5,13 @@ import json
 import logging
 from pathlib import Path
 
+from py2flow.cache import NodeResultCache
 from py2flow.errors import FlowError
 from py2flow.executor import DAGExecutor
 from py2flow.executor import DebugConfig
+from py2flow.explain import explain_analyze as run_explain_analyze, explain_dag
 from py2flow.ir import DAG
+from py2flow.optimizer import OptimizerConfig, optimize_dag
 
 
 def exec_flow(
@@ -19,15 +22,53 @@ def exec_flow(
     on_fail_dump: bool = False,
     validate_only: bool = False,
     explain: bool = False,
+    explain_analyze: bool = False,
     debug_sample: int = 3,
+    max_workers: int | None = None,
+    cache_dir: str | Path | None = None,
+    optimize: bool | OptimizerConfig = False,
+    copy_on_write: bool = False,
+    stream_chunksize: int | None = None,
+    arrow_io: bool = False,
+    arrow_cache_dir: str | Path | None = None,
+    backend: str = "pandas",
+    engine: str = "pandas",
+    memory_budget: int | None = None,
+    spill_dir: str | Path | None = None,
+    profile: bool = False,
+    profile_dir: str | Path | None = None,
 ) -> dict[str, object]:
     """
     Load flow.json under data_path, validate as a py2flow DAG, and execute with pandas.
     Paths inside the DAG are resolved relative to data_path (base_path).
+    max_workers > 1 runs independent branches concurrently on a thread pool.
+    cache_dir enables the on-disk node result cache, shared across invocations.
+    optimize rewrites the DAG before execution (identical nodes merged, filters moved below
+    projects/unions/joins, CSV inputs reading only the columns that reach an output); pass an OptimizerConfig to turn single passes off.
+    copy_on_write runs operators under pandas copy-on-write instead of deep-copying every result.
+    stream_chunksize streams input -> project/filter -> output chains in chunks of that many rows.
+    parquet and feather inputs/outputs always go through pyarrow; arrow_io also routes CSV reads through
+    ArrowIO, and arrow_cache_dir (implies arrow_io) keeps typed Arrow copies of parsed CSVs there and
+    loads them instead of re-parsing.
+    backend="polars" runs nodes on polars where their params translate, pandas elsewhere.
+    engine="duckdb" compiles chains of relational nodes into one DuckDB query each, pandas elsewhere.
+    memory_budget caps the bytes of intermediate results held in memory; beyond it, results still
+    needed later are spilled to spill_dir (default: the system temp dir) and reloaded on use.
+    profile writes per-node timings and sizes to profile_dir (default: data_path/flow_cand/@profile)
+    as profile.json and a Chrome trace, trace.json, also when the run fails.
+    explain prints the plan with row, memory and cost estimates from sampled inputs, and flags
+    hotspots, without executing; explain_analyze executes the flow (without the result cache or
+    streaming) and prints the actual values next to the estimates.
 
     Note: flow.json only supports 11 kinds (input/project/filter/join/union/aggregate/dedup/sort/pivot/output/script)
-    and CSV-only I/O.
+    and CSV, parquet and feather I/O (the latter two need pyarrow).
     """
+    if backend not in {"pandas", "polars"}:
+        raise ValueError(f"Error: backend must be pandas|polars, got {backend!r}")
+    if engine not in {"pandas", "duckdb"}:
+        raise ValueError(f"Error: engine must be pandas|duckdb, got {engine!r}")
+    if engine != "pandas" and backend != "pandas":
+        raise ValueError("Error: engine=duckdb cannot be combined with backend=polars")
     data_path = Path(data_path)
     if not data_path.exists() or not data_path.is_dir():
         raise ValueError(f"Error: --data-path is invalid or does not exist: {data_path}")
@@ -49,24 +90,87 @@ def exec_flow(
         return {}
     if trace:
         logging.basicConfig(level=logging.INFO)
+    optimizer = optimize if isinstance(optimize, OptimizerConfig) else (OptimizerConfig() if optimize else None)
+    io = None
+    if arrow_io or arrow_cache_dir is not None:
+        from py2flow.arrow_io import ArrowIO
+
+        io = ArrowIO(cache_dir=arrow_cache_dir)
     if explain:
         dag.validate()
-        order = DAGExecutor._topological_order(dag.nodes)
-        for nid in order:
-            node = dag.nodes[nid]
-            print(f"node={nid} kind={node.kind.value} inputs={node.inputs} params={sorted((node.params or {}).keys())}")
+        report = None
+        if optimizer is not None:
+            dag, report = optimize_dag(dag, optimizer)
+        for line in explain_dag(dag, data_path, io=io).lines():
+            print(line)
+        if report is not None:
+            for line in report.lines():
+                print(line)
         return {}
+    registry = None
+    if backend == "polars":
+        from py2flow.polars_backend import polars_operator_registry
+
+        registry = polars_operator_registry()
+    elif engine == "duckdb":
+        from py2flow.duckdb_backend import DuckDBEngine, duckdb_operator_registry
+
+        registry = duckdb_operator_registry(DuckDBEngine(threads=max_workers))
+    if explain_analyze:
+        plan, results = run_explain_analyze(
+            dag,
+            data_path,
+            io=io,
+            debug=DebugConfig(dump_nodes=dump_nodes, trace=trace, on_fail_dump=on_fail_dump, sample_rows=debug_sample),
+            max_workers=max_workers,
+            optimizer=optimizer,
+            copy_on_write=copy_on_write,
+            operator_registry=registry,
+            memory_budget=memory_budget,
+            spill_dir=spill_dir,
+        )
+        for line in plan.lines():
+            print(line)
+        return results
     executor = DAGExecutor(
         dag,
         base_path=data_path,
         debug=DebugConfig(dump_nodes=dump_nodes, trace=trace, on_fail_dump=on_fail_dump, sample_rows=debug_sample),
+        max_workers=max_workers,
+        cache=NodeResultCache(disk_dir=cache_dir) if cache_dir is not None else None,
+        optimizer=optimizer,
+        copy_on_write=copy_on_write,
+        stream_chunksize=stream_chunksize,
+        io=io,
+        operator_registry=registry,
+        memory_budget=memory_budget,
+        spill_dir=spill_dir,
+        profile=profile or profile_dir is not None,
     )
-    return executor.run()
+    try:
+        return executor.run()
+    finally:
+        if executor.profile is not None:
+            executor.profile.write(profile_dir if profile_dir is not None else data_path / "flow_cand" / "@profile")
+
+
+def parse_bytes(text: str) -> int:
+    """Byte count with an optional K/M/G suffix (powers of 1024), e.g. "512M"."""
+    text = text.strip().upper().removesuffix("B")
+    scale = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}.get(text[-1:], 1)
+    number = text[:-1] if scale > 1 else text
+    try:
+        value = int(float(number) * scale)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid byte count: {text!r}") from None
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"byte count must be non-negative: {text!r}")
+    return value
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="Execute py2flow flow.json under --data-path (11 kinds, CSV-only I/O)."
+        description="Execute py2flow flow.json under --data-path (11 kinds; CSV, parquet and feather I/O)."
     )
     parser.add_argument(
         "--data-path",
@@ -96,7 +200,12 @@ if __name__ == "__main__":
     parser.add_argument(
         "--explain",
         action="store_true",
-        help="Print node summary (kind/inputs/params keys) after validation; do not execute",
+        help="Print the plan with estimated rows, memory and cost (from sampled inputs) and hotspots; do not execute",
+    )
+    parser.add_argument(
+        "--explain-analyze",
+        action="store_true",
+        help="Execute the flow and print the --explain plan with actual rows, memory and time per node",
     )
     parser.add_argument(
         "--debug-sample",
@@ -104,9 +213,91 @@ if __name__ == "__main__":
         default=3,
         help="When --trace is set, number of rows to include in the sample (default: 3)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Run independent branches on this many threads (default: 0, serial execution)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="",
+        help="Reuse node results across runs via an on-disk cache in this directory (output nodes always run)",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Rewrite the flow before execution (common subexpressions, predicate and projection pushdown); with --explain, print the rewritten plan",
+    )
+    parser.add_argument(
+        "--copy-on-write",
+        action="store_true",
+        help="Run under pandas copy-on-write so operators share column data instead of deep-copying it",
+    )
+    parser.add_argument(
+        "--stream-chunksize",
+        type=int,
+        default=0,
+        help="Stream input -> project/filter -> output chains in chunks of this many rows (default: 0, off)",
+    )
+    parser.add_argument(
+        "--arrow",
+        action="store_true",
+        help="Use the pyarrow IO adapter for CSV reads too (parquet/feather always use it); requires pyarrow",
+    )
+    parser.add_argument(
+        "--arrow-cache",
+        default="",
+        help="Keep typed Arrow copies of parsed CSV inputs in this directory and load them on later runs (implies --arrow)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("pandas", "polars"),
+        default="pandas",
+        help="Operator implementations to run (default: pandas); polars falls back to pandas per node",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("pandas", "duckdb"),
+        default="pandas",
+        help="Run chains of relational nodes as single DuckDB queries (default: pandas); untranslated nodes run on pandas",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=parse_bytes,
+        default=0,
+        help="Hold at most this many bytes of node results in memory (e.g. 2G), spilling the rest to disk (default: 0, unlimited)",
+    )
+    parser.add_argument(
+        "--spill-dir",
+        default="",
+        help="Directory for results spilled under --memory-budget (default: the system temp dir)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write per-node timings and sizes to data_path/flow_cand/@profile/ (profile.json, Chrome trace trace.json)",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default="",
+        help="Write the --profile report and trace to this directory instead (implies --profile)",
+    )
+    parser.add_argument(
+        "--optimize-skip",
+        default="",
+        help="Comma-separated optimizer passes to turn off with --optimize (common_subexpressions,predicate_pushdown,projection_pushdown)",
+    )
 
     args = parser.parse_args()
     dump_nodes = {x.strip() for x in str(args.dump_nodes).split(",") if x.strip()} or None
+    skip = {x.strip() for x in str(args.optimize_skip).split(",") if x.strip()}
+    optimize: bool | OptimizerConfig = bool(args.optimize)
+    unknown = skip - set(OptimizerConfig.__dataclass_fields__)
+    if unknown:
+        parser.error(f"--optimize-skip has unknown pass(es): {sorted(unknown)}")
+    if args.optimize and skip:
+        optimize = OptimizerConfig(**{name: False for name in skip})
     try:
         exec_flow(
             Path(args.data_path),
@@ -115,7 +306,21 @@ if __name__ == "__main__":
             on_fail_dump=bool(args.on_fail_dump),
             validate_only=bool(args.validate_only),
             explain=bool(args.explain),
+            explain_analyze=bool(args.explain_analyze),
             debug_sample=int(args.debug_sample),
+            max_workers=int(args.workers) or None,
+            cache_dir=Path(args.cache_dir) if args.cache_dir else None,
+            optimize=optimize,
+            copy_on_write=bool(args.copy_on_write),
+            stream_chunksize=int(args.stream_chunksize) or None,
+            arrow_io=bool(args.arrow),
+            arrow_cache_dir=Path(args.arrow_cache) if args.arrow_cache else None,
+            backend=str(args.backend),
+            engine=str(args.engine),
+            memory_budget=int(args.memory_budget) or None,
+            spill_dir=Path(args.spill_dir) if args.spill_dir else None,
+            profile=bool(args.profile),
+            profile_dir=Path(args.profile_dir) if args.profile_dir else None,
         )
     except FlowError as exc:
         print(str(exc))
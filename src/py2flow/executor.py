@@ -1,20 +1,28 @@
 from __future__ import annotations
 
 from collections import defaultdict
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from graphlib import CycleError, TopologicalSorter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, DefaultDict, Literal
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, DefaultDict, Literal, Tuple
 
 import logging
 import time
 
 import pandas as pd
 
+from .cache import ResultCache, node_fingerprint
 from .errors import FlowExecutionError, FlowValidationError
+from .incremental import IncrementalState
 from .ir import DAG, Node, StepKind
+from .optimizer import OptimizerConfig, OptimizerReport, optimize_dag
+from .profiling import RunProfile
+from .spill import SPILLED, SpillStore
+from .streaming import StreamStats, find_segments, run_segment
 from .operators import OperatorRegistry, get_global_operator_registry
-from .operators.base import ExecutionContext, Operator
+from .operators.base import ExecutionContext, IOAdapter, Operator, defensive_copy
 
 
 @dataclass(frozen=True)
@@ -35,8 +43,31 @@ class DAGExecutor:
         operator_registry: OperatorRegistry | Mapping[StepKind, Operator] | None = None,
         debug: DebugConfig | None = None,
         input_tables: Mapping[str, pd.DataFrame] | None = None,
+        max_workers: int | None = None,
+        cache: ResultCache | None = None,
+        incremental: IncrementalState | None = None,
+        optimizer: OptimizerConfig | None = None,
+        copy_on_write: bool = False,
+        stream_chunksize: int | None = None,
+        io: IOAdapter | None = None,
+        memory_budget: int | None = None,
+        spill_dir: str | Path | None = None,
+        profile: bool | Literal["shallow"] = False,
     ) -> None:
         self.dag = dag
+        # With an optimizer each run executes a rewritten copy of source_dag; results of
+        # non-target intermediate nodes may then carry fewer columns.
+        self.source_dag = dag
+        self.optimizer = optimizer
+        self.optimizer_report: OptimizerReport | None = None
+        # Run under pandas copy-on-write: operators skip deep copies and each one receives lazy
+        # shallow copies of its inputs, so in-place edits never reach a stored result.
+        self.copy_on_write = bool(copy_on_write)
+        # Rows per chunk for streaming isolated input -> project/filter -> output chains (None = off).
+        # Streamed nodes are not materialised, so they are absent from run() results.
+        self.stream_chunksize = int(stream_chunksize) if stream_chunksize else None
+        # None/0/1 keeps the serial scheduler; >1 runs independent ready nodes on a thread pool.
+        self.max_workers = int(max_workers) if max_workers else None
         self.base_path = Path(base_path) if base_path is not None else None
         self._script_cache: Dict[str, Any] = {}
         if operator_registry is None:
@@ -45,56 +76,109 @@ class DAGExecutor:
             self._ops = dict(operator_registry.as_mapping())
         else:
             self._ops = dict(operator_registry)
-        self._ctx = ExecutionContext(self.base_path, logger=logger, input_tables=input_tables)
+        # io=ArrowIO(...) adds parquet/feather inputs and outputs and the CSV sidecar cache.
+        self._ctx = ExecutionContext(self.base_path, io=io, logger=logger, input_tables=input_tables)
         self._debug = debug or DebugConfig()
         self._ctx.executor = self
 
         self._deps: Dict[str, List[str]] = {nid: list(n.inputs) for nid, n in self.dag.nodes.items()}
 
         self._results: Dict[str, Any] = {}
+        # Node fingerprints of the current run (None = not cacheable) and per-run counters.
+        self.cache = cache
+        self._fingerprints: Dict[str, Optional[str]] = {}
+        self.run_stats: Dict[str, Any] = {}
+        self.incremental = incremental
+        self._reuse: Dict[str, pd.DataFrame] = {}
+        # Bytes of DataFrame results to hold in memory; beyond it, results are spilled under spill_dir
+        # (default: the system temp dir) and reloaded when a consumer runs.
+        self._spill = SpillStore(memory_budget, spill_dir) if memory_budget else None
+        # With profile=True each run records per-node timings and sizes in self.profile;
+        # profile="shallow" sizes frames without walking object columns.
+        self.profiling = bool(profile)
+        self._profile_deep = profile != "shallow"
+        self.profile: RunProfile | None = None
 
     def run(
         self,
         targets: Optional[List[str]] = None,
         keep: Literal["outputs", "targets", "all", "none"] = "all",
     ) -> Dict[str, Any]:
-        self.dag.validate()
-
-        order = self._topological_order(self.dag.nodes)
+        self.run_stats = {}
+        self.source_dag.validate()
+        self.dag = self.source_dag
         targets = targets or self._default_targets()
         target_set = set(targets)
+        if self.optimizer is not None:
+            self.dag, self.optimizer_report = optimize_dag(
+                self.source_dag, self.optimizer, targets=target_set, input_tables=self._ctx.input_tables
+            )
+            self._deps = {nid: list(n.inputs) for nid, n in self.dag.nodes.items()}
+
+        order = self._topological_order(self.dag.nodes)
 
         needed = self._backward_closure(target_set)
+        n_needed = len(needed)
+        streamed: Dict[str, StreamStats] = {}
+        if self.stream_chunksize is not None:
+            with self._cow_context():
+                streamed = self._run_streaming(needed, target_set)
         refcnt = self._ref_counts(needed)
         self._results.clear()
+        self._fingerprints.clear()
+        cache_before = self.cache.stats() if self.cache is not None else {}
+        io_stats = getattr(self._ctx.io, "stats", None)
+        io_before = io_stats() if callable(io_stats) else {}
 
-        for node_id in order:
-            if node_id not in needed:
-                continue
-            node = self.dag.nodes[node_id]
-            upstream = [self._results[i] for i in node.inputs]
-            t0 = time.time()
-            try:
-                res = self._execute_node(node, upstream)
-            except BaseException as exc:
-                if self._debug.on_fail_dump:
-                    self._dump_failure(node, upstream, exc)
-                if isinstance(exc, FlowValidationError):
-                    raise
-                if isinstance(exc, FlowExecutionError):
-                    raise
-                self._ctx.logger.error(f"node_failed id={node.id} kind={node.kind.value}: {exc}")
-                raise FlowExecutionError(node.id, node.kind, node.params or {}, exc, error_code="operator_error") from exc
-            self._ctx.logger.debug(
-                f"node={node.id} kind={node.kind.value} took={time.time()-t0:.3f}s"
-            )
-            self._results[node_id] = res
-            self._after_node(node, res)
-            for i in node.inputs:
-                if i in refcnt:
-                    refcnt[i] -= 1
-                    if refcnt[i] <= 0 and keep not in ("all",) and not (keep in ("outputs", "targets") and i in target_set):
-                        self._results.pop(i, None)
+        self._reuse = self.incremental.plan(self.dag, order, needed, self._ctx) if self.incremental is not None else {}
+        if self._spill is not None:
+            self._spill.begin(order, needed, self._deps)
+        self.profile = RunProfile(deep_sizes=self._profile_deep) if self.profiling else None
+
+        try:
+            with self._cow_context():
+                if self.max_workers is not None and self.max_workers > 1:
+                    self._run_parallel(order, needed, refcnt, keep, target_set)
+                else:
+                    for node_id in order:
+                        if node_id not in needed:
+                            continue
+                        node = self.dag.nodes[node_id]
+                        upstream = self._upstream(node, set(node.inputs))
+                        try:
+                            res = self._run_node(node, upstream, self._fingerprint(node))
+                        except BaseException as exc:
+                            raise self._node_failure(node, upstream, exc)
+                        self._store_result(node, res, refcnt, keep, target_set)
+            if self._spill is not None:
+                self._reload_returned(keep, targets)
+        finally:
+            if self.incremental is not None:
+                self.incremental.commit()
+            if self._spill is not None:
+                self._spill.close()
+            if self.profile is not None:
+                self.profile.finish()
+            # Also set when the run fails, so callers can report how far it got.
+            self.run_stats = {"nodes": n_needed}
+            if self.stream_chunksize is not None:
+                self.run_stats["streamed"] = {nid: {"chunks": st.chunks, "rows": st.rows} for nid, st in streamed.items()}
+            if self.incremental is not None:
+                self.run_stats["reused"] = len(self._reuse)
+                self.run_stats["recomputed"] = len(needed) - len(self._reuse)
+            if self.cache is not None:
+                cache_after = self.cache.stats()
+                self.run_stats["cache"] = {
+                    k: cache_after.get(k, 0) - cache_before.get(k, 0)
+                    for k in ("hits", "misses", "memory_hits", "disk_hits", "stores")
+                }
+            if callable(io_stats):
+                io_after = io_stats()
+                self.run_stats["io"] = {k: v - io_before.get(k, 0) for k, v in io_after.items()}
+            if self._spill is not None:
+                self.run_stats["spill"] = self._spill.stats()
+            if self.profile is not None:
+                self.run_stats["profile"] = self.profile.summary()
 
         if keep == "outputs":
             outs = [nid for nid, n in self.dag.nodes.items() if n.kind is StepKind.OUTPUT]
@@ -105,10 +189,197 @@ class DAGExecutor:
             return {}
         return dict(self._results)
 
+    def _cow_context(self) -> Any:
+        return pd.option_context("mode.copy_on_write", True) if self.copy_on_write else nullcontext()
+
+    def _run_streaming(self, needed: Set[str], target_set: Set[str]) -> Dict[str, StreamStats]:
+        """Stream eligible segments and drop their nodes from needed; others fall back to normal runs."""
+        streamed: Dict[str, StreamStats] = {}
+        for chain in find_segments(self.dag, needed, target_set, self._ctx.input_tables):
+            t0 = time.time()
+            stats = run_segment(self.dag, chain, self._ops, self._ctx, self.stream_chunksize or 0)
+            if stats is None:
+                continue
+            needed.difference_update(chain)
+            streamed[chain[-1]] = stats
+            self._ctx.logger.debug(
+                f"segment={'->'.join(chain)} streamed chunks={stats.chunks} rows={stats.rows} took={time.time()-t0:.3f}s"
+            )
+        return streamed
+
+    def _run_parallel(
+        self,
+        order: List[str],
+        needed: Set[str],
+        refcnt: Dict[str, int],
+        keep: str,
+        target_set: Set[str],
+    ) -> None:
+        """
+        Run needed nodes on a thread pool as soon as their inputs are available.
+
+        Results are stored and released on the calling thread only. When nodes fail, nodes that
+        come later in the static order than the earliest failure are not started, so the error
+        raised is the same one the serial scheduler would raise.
+        """
+        rank = {nid: pos for pos, nid in enumerate(order)}
+        sorter: TopologicalSorter[str] = TopologicalSorter(
+            {nid: [i for i in self._deps.get(nid, []) if i in needed] for nid in needed}
+        )
+        sorter.prepare()
+        pending: Dict[Future[Any], Tuple[Node, List[Any]]] = {}
+        failures: Dict[str, Tuple[Node, List[Any], BaseException]] = {}
+
+        def first_failure() -> int:
+            return min((rank[nid] for nid in failures), default=len(order))
+
+        def running_inputs() -> Set[str]:
+            return {i for node, _ in pending.values() for i in node.inputs}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="py2flow") as pool:
+
+            def submit_ready() -> None:
+                limit = first_failure()
+                for nid in sorted(sorter.get_ready(), key=rank.__getitem__):
+                    if rank[nid] > limit:
+                        continue
+                    node = self.dag.nodes[nid]
+                    upstream = self._upstream(node, running_inputs() | set(node.inputs))
+                    fut = pool.submit(self._run_node, node, upstream, self._fingerprint(node))
+                    pending[fut] = (node, upstream)
+
+            submit_ready()
+            while pending:
+                done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                for fut in sorted(done, key=lambda f: rank[pending[f][0].id]):
+                    node, upstream = pending.pop(fut)
+                    exc = fut.exception()
+                    if exc is not None:
+                        failures[node.id] = (node, upstream, exc)
+                        continue
+                    if rank[node.id] > first_failure():
+                        continue
+                    self._store_result(node, fut.result(), refcnt, keep, target_set, running_inputs())
+                    sorter.done(node.id)
+                submit_ready()
+
+        if failures:
+            node, upstream, exc = failures[min(failures, key=rank.__getitem__)]
+            raise self._node_failure(node, upstream, exc)
+
+    def _fingerprint(self, node: Node) -> Optional[str]:
+        if self.cache is None:
+            return None
+        fp = node_fingerprint(
+            node,
+            [self._fingerprints.get(i) for i in node.inputs],
+            self._ops.get(node.kind),
+            self._ctx,
+        )
+        self._fingerprints[node.id] = fp
+        return fp
+
+    def _run_node(self, node: Node, upstream: List[Any], fingerprint: Optional[str] = None) -> Any:
+        if self.profile is None:
+            return self._compute_node(node, upstream, fingerprint)
+        with self.profile.measure(node, upstream) as prof:
+            res = self._compute_node(node, upstream, fingerprint)
+        # Sized outside the timed block: deep memory usage of object columns is not free.
+        prof.record_output(res)
+        return res
+
+    def _compute_node(self, node: Node, upstream: List[Any], fingerprint: Optional[str]) -> Any:
+        t0 = time.time()
+        reused = self._reuse.get(node.id)
+        if reused is not None:
+            self._ctx.logger.debug(f"node={node.id} kind={node.kind.value} reused")
+            return defensive_copy(reused) if isinstance(reused, pd.DataFrame) else reused
+        if fingerprint is not None and self.cache is not None:
+            cached = self.cache.get(fingerprint)
+            if cached is not None:
+                self._ctx.logger.debug(f"node={node.id} kind={node.kind.value} cache=hit")
+                return cached
+        res = self._execute_node(node, upstream)
+        if fingerprint is not None and self.cache is not None and isinstance(res, pd.DataFrame):
+            self.cache.put(fingerprint, res)
+        self._ctx.logger.debug(
+            f"node={node.id} kind={node.kind.value} took={time.time()-t0:.3f}s"
+        )
+        return res
+
+    def _node_failure(self, node: Node, upstream: List[Any], exc: BaseException) -> BaseException:
+        if self._debug.on_fail_dump:
+            self._dump_failure(node, upstream, exc)
+        if isinstance(exc, FlowValidationError):
+            return exc
+        if isinstance(exc, FlowExecutionError):
+            return exc
+        self._ctx.logger.error(f"node_failed id={node.id} kind={node.kind.value}: {exc}")
+        err = FlowExecutionError(node.id, node.kind, node.params or {}, exc, error_code="operator_error")
+        err.__cause__ = exc
+        return err
+
+    def _store_result(
+        self,
+        node: Node,
+        res: Any,
+        refcnt: Dict[str, int],
+        keep: str,
+        target_set: Set[str],
+        pinned: Set[str] | None = None,
+    ) -> None:
+        self._results[node.id] = res
+        if self.incremental is not None:
+            self.incremental.record(node.id, res)
+        if self._spill is not None:
+            self._spill.add(node.id, node.inputs, res)
+        self._after_node(node, res)
+        for i in node.inputs:
+            if i in refcnt:
+                refcnt[i] -= 1
+                if refcnt[i] <= 0 and keep not in ("all",) and not (keep in ("outputs", "targets") and i in target_set):
+                    self._results.pop(i, None)
+                    if self._spill is not None:
+                        self._spill.discard(i)
+        if self._spill is not None:
+            self._spill.enforce(self._results, pinned or set())
+
+    def _upstream(self, node: Node, pinned: Set[str]) -> List[Any]:
+        """Input results of node, reloading spilled ones; pinned results are not spilled to make room."""
+        if self._spill is not None:
+            for i in node.inputs:
+                if self._results[i] is SPILLED:
+                    self._results[i] = self._spill.reload(i)
+            self._spill.enforce(self._results, pinned)
+        return [self._results[i] for i in node.inputs]
+
+    def _reload_returned(self, keep: str, targets: List[str]) -> None:
+        """Load back spilled results that run() returns and drop the other placeholders."""
+        if keep == "all":
+            returned = set(self._results)
+        elif keep == "outputs":
+            returned = {nid for nid, n in self.dag.nodes.items() if n.kind is StepKind.OUTPUT}
+        elif keep == "targets":
+            returned = set(targets)
+        else:
+            returned = set()
+        for nid, res in list(self._results.items()):
+            if res is not SPILLED:
+                continue
+            if nid in returned and self._spill is not None:
+                self._results[nid] = self._spill.reload(nid)
+            else:
+                del self._results[nid]
+
     def _execute_node(self, node: Node, upstream: List[Any]) -> Any:
         op: Optional[Operator] = self._ops.get(node.kind)
         if op is None:
             raise ValueError(f"Unsupported StepKind: {node.kind}")
+        if self.copy_on_write:
+            upstream = [up.copy(deep=False) if isinstance(up, pd.DataFrame) else up for up in upstream]
+        elif node.kind is StepKind.SCRIPT and self.incremental is not None:
+            # User code may edit its inputs in place; those are kept by reference for the next run.
+            upstream = [defensive_copy(up) if isinstance(up, pd.DataFrame) else up for up in upstream]
         res = op.execute(node.id, upstream, node.params or {}, self._ctx)
         if isinstance(res, pd.DataFrame) and node.kind is not StepKind.SORT:
             for up in upstream:
@@ -159,6 +430,8 @@ class DAGExecutor:
         return
 
     def _after_node(self, node: Node, res: Any) -> None:
+        if self._debug.trace or (self._debug.dump_nodes and node.id in self._debug.dump_nodes):
+            res = _debug_frame(res)
         if self._debug.trace and isinstance(res, pd.DataFrame):
             cols = list(res.columns)
             n = max(0, int(self._debug.sample_rows))
@@ -188,5 +461,13 @@ class DAGExecutor:
 
         (debug_dir / "params.json").write_text(json.dumps(dict(node.params or {}), ensure_ascii=False, indent=2), encoding="utf-8")
         for idx, up in enumerate(upstream):
+            up = _debug_frame(up)
             if isinstance(up, pd.DataFrame):
                 self._ctx.io.write_df(up, debug_dir / f"upstream_{idx}.csv", "csv", {"index": False})
+
+
+def _debug_frame(res: Any) -> Any:
+    """pandas view of a result for traces and dumps; alternative backends (polars) expose to_pandas()."""
+    if not isinstance(res, pd.DataFrame) and callable(getattr(res, "to_pandas", None)):
+        return res.to_pandas()
+    return res
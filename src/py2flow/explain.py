@@ -0,0 +1,637 @@
+"""
+Cost-based EXPLAIN: sampled input statistics propagated through the plan, with hotspot flags.
+
+Estimates are textbook heuristics (independent predicates, uniform key distributions, containment
+of join keys) over statistics sampled from the inputs; they are meant for spotting expensive nodes,
+not for exact row counts. EXPLAIN ANALYZE runs the flow with profiling and prints actual values next
+to the estimates.
+"""
+from __future__ import annotations
+
+import ast
+import math
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .executor import DAGExecutor
+from .ir import DAG, Node, StepKind
+from .operators.base import ExecutionContext, IOAdapter
+from .operators.expr import referenced_columns
+from .operators.input import Input, csv_read_options
+from .profiling import RunProfile
+
+# Rows read from each CSV input to estimate its column statistics.
+DEFAULT_SAMPLE_ROWS = 10_000
+# Row multipliers assumed for operations whose fan-out cannot be estimated from column statistics.
+EXPLODE_FACTOR = 3.0
+EXPAND_FACTOR = 10.0
+# Default selectivities (as in most SQL planners) for predicates without usable statistics.
+EQ_SELECTIVITY = 0.1
+RANGE_SELECTIVITY = 1 / 3
+DEFAULT_SELECTIVITY = 0.5
+# A join side with more rows per key than this is "many" in many-to-many.
+MANY_ROWS_PER_KEY = 1.5
+WIDE_PIVOT_COLUMNS = 1000
+# KMV sketch size: distinct counts above this are estimated from the k-th smallest hash.
+SKETCH_SIZE = 4096
+
+_HASH_SPACE = float(2**64)
+
+
+@dataclass(frozen=True)
+class ColumnEstimate:
+    """Distinct values, null fraction and bytes per value of one column. guessed: ndv is only an upper bound."""
+
+    ndv: float
+    null_frac: float = 0.0
+    width: float = 8.0
+    guessed: bool = False
+
+
+@dataclass
+class NodeEstimate:
+    node_id: str
+    kind: str
+    rows: float
+    columns: Dict[str, ColumnEstimate]
+    cost: float = 0.0
+    detail: str = ""
+    hotspots: List[str] = field(default_factory=list)
+
+    @property
+    def width(self) -> float:
+        """Estimated bytes per row."""
+        return sum(c.width for c in self.columns.values())
+
+    @property
+    def memory(self) -> float:
+        return self.rows * self.width
+
+
+def distinct_count(hashes: np.ndarray, k: int = SKETCH_SIZE) -> float:
+    """
+    Distinct values among 64-bit hashes: exact for up to k distinct values, otherwise the KMV
+    (k minimum values) estimate (k - 1) / (k-th smallest hash / 2**64).
+    """
+    if len(hashes) <= k:
+        return float(len(np.unique(hashes)))
+    # Roughly 4k hashes fall below this bound; the k smallest distinct ones are among them.
+    bound = np.uint64(min(int(_HASH_SPACE * 4 * k / len(hashes)), 2**64 - 1))
+    smallest = np.unique(hashes[hashes <= bound])
+    if len(smallest) < k:
+        return float(len(np.unique(hashes)))
+    return (k - 1) * _HASH_SPACE / float(smallest[k - 1])
+
+
+def column_estimates(frame: pd.DataFrame, total_rows: float) -> Dict[str, ColumnEstimate]:
+    """
+    Statistics of each column of frame, scaled to total_rows when frame is a sample. Distinct
+    counts of sampled columns use the Haas-Stokes estimator (as PostgreSQL's ANALYZE does); full
+    columns use the KMV sketch.
+    """
+    n = len(frame)
+    sampled = n < total_rows
+    out: Dict[str, ColumnEstimate] = {}
+    for i, name in enumerate(frame.columns):
+        series = frame.iloc[:, i]
+        nonnull = series.dropna()
+        null_frac = 1 - len(nonnull) / n if n else 0.0
+        width = float(series.memory_usage(index=False, deep=True)) / n if n else 8.0
+        total_nonnull = total_rows * (1 - null_frac)
+        try:
+            hashes = pd.util.hash_pandas_object(nonnull, index=False).to_numpy()
+        except TypeError:
+            # Unhashable values (lists, dicts): assume every value is distinct.
+            out[str(name)] = ColumnEstimate(total_nonnull, null_frac, width)
+            continue
+        if not sampled:
+            ndv = distinct_count(hashes)
+        elif not len(hashes):
+            ndv = 0.0
+        else:
+            _, counts = np.unique(hashes, return_counts=True)
+            d, f1, m = len(counts), int((counts == 1).sum()), len(hashes)
+            ndv = total_nonnull if f1 == m else m * d / (m - f1 + f1 * m / max(total_nonnull, m))
+            ndv = min(max(ndv, d), total_nonnull)
+        out[str(name)] = ColumnEstimate(ndv, null_frac, width)
+    return out
+
+
+def sample_input(node: Node, ctx: ExecutionContext, sample_rows: int = DEFAULT_SAMPLE_ROWS) -> Tuple[pd.DataFrame, float]:
+    """
+    The first sample_rows rows of a CSV input and its estimated row count (newlines in the file
+    minus header and skipped lines). Other inputs (injected tables, inline data, line mode,
+    columnar files) are read in full through the input operator.
+    """
+    params = node.params or {}
+    injected = ctx.input_tables is not None and ctx.input_tables.get(node.id) is not None
+    mode = params.get("mode", "csv")
+    if injected or params.get("data") is not None or mode != "csv":
+        frame = Input().execute(node.id, [], params, ctx)
+        return frame, float(len(frame))
+    resolved = ctx.resolve_path(str(params.get("path")))
+    encoding = params.get("encoding", "utf-8")
+    last_exc: Optional[BaseException] = None
+    for enc in [encoding] if isinstance(encoding, str) else list(encoding):
+        try:
+            options = csv_read_options(params, resolved, enc, ctx)
+            frame = ctx.io.read_df(resolved, "csv", {**options, "nrows": sample_rows + 1})
+            break
+        except Exception as exc:
+            last_exc = exc
+    else:
+        raise ValueError(f"input csv sample failed: {last_exc}")
+    if len(frame) <= sample_rows:
+        return frame, float(len(frame))
+    with resolved.open("rb") as f:
+        lines = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+    skiprows = params.get("skiprows", 0)
+    skipped = (skiprows if isinstance(skiprows, int) else 0) + (0 if params.get("header", 0) is None else 1)
+    return frame.head(sample_rows), float(max(lines - skipped, sample_rows))
+
+
+class ExplainPlan:
+    """Estimates for every needed node, optionally with the actual values of a profiled run."""
+
+    def __init__(
+        self,
+        dag: DAG,
+        estimates: Mapping[str, NodeEstimate],
+        targets: Sequence[str],
+        profile: Optional[RunProfile] = None,
+    ) -> None:
+        self.dag = dag
+        self.estimates = dict(estimates)
+        self.targets = list(targets)
+        self.profile = profile
+        self.actual = {p.node_id: p for p in profile.nodes} if profile is not None else None
+
+    @property
+    def total_cost(self) -> float:
+        return sum(e.cost for e in self.estimates.values())
+
+    def hotspots(self) -> List[Tuple[str, str]]:
+        return [(nid, msg) for nid, est in self.estimates.items() for msg in est.hotspots]
+
+    def lines(self) -> List[str]:
+        total = self.total_cost
+        out = [f"plan: {len(self.estimates)} nodes, estimated cost {_human(total)} row-ops"]
+        seen: set = set()
+
+        def walk(nid: str, prefix: str, child_prefix: str) -> None:
+            est = self.estimates[nid]
+            head = f"{prefix}{nid} [{est.kind}{' ' + est.detail if est.detail else ''}]"
+            if nid in seen:
+                out.append(f"{head} (see above)")
+                return
+            seen.add(nid)
+            share = f" ({100 * est.cost / total:.0f}%)" if total > 0 else ""
+            line = f"{head}  est rows={_human(est.rows)} width={_human(est.width)}B mem={_human(est.memory)}B cost={_human(est.cost)}{share}"
+            if self.actual is not None:
+                prof = self.actual.get(nid)
+                if prof is None:
+                    line += "  actual: not run"
+                else:
+                    rows = _human(prof.rows_out) if prof.rows_out is not None else "?"
+                    mem = _human(prof.bytes_out) + "B" if prof.bytes_out is not None else "?"
+                    line += f"  actual rows={rows} mem={mem} time={prof.wall_sec:.3f}s"
+            out.append(line)
+            for msg in est.hotspots:
+                out.append(f"{child_prefix}  ! {msg}")
+            inputs = [i for i in self.dag.nodes[nid].inputs if i in self.estimates]
+            for pos, child in enumerate(inputs):
+                last = pos == len(inputs) - 1
+                walk(child, child_prefix + ("`- " if last else "|- "), child_prefix + ("   " if last else "|  "))
+
+        for target in self.targets:
+            walk(target, "", "")
+        hot = self.hotspots()
+        if hot:
+            out.append("hotspots:")
+            out.extend(f"  {nid}: {msg}" for nid, msg in hot)
+        return out
+
+
+def estimate_dag(
+    dag: DAG,
+    ctx: ExecutionContext,
+    targets: Optional[Iterable[str]] = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+) -> Tuple[Dict[str, NodeEstimate], List[str]]:
+    """Estimates of every node the targets (default: outputs, else sinks) need, and the targets."""
+    if targets is None:
+        outputs = [nid for nid, n in dag.nodes.items() if n.kind is StepKind.OUTPUT]
+        consumed = {i for n in dag.nodes.values() for i in n.inputs}
+        targets = outputs or [nid for nid in dag.nodes if nid not in consumed]
+    targets = list(targets)
+    needed: set = set()
+    stack = list(targets)
+    while stack:
+        nid = stack.pop()
+        if nid not in needed:
+            needed.add(nid)
+            stack.extend(dag.nodes[nid].inputs)
+    estimates: Dict[str, NodeEstimate] = {}
+    for nid in DAGExecutor._topological_order(dag.nodes):
+        if nid not in needed:
+            continue
+        node = dag.nodes[nid]
+        if node.kind is StepKind.INPUT:
+            est = _estimate_input(node, ctx, sample_rows)
+        else:
+            est = _estimate_node(node, [estimates[i] for i in node.inputs])
+        est.columns = {name: replace(c, ndv=min(c.ndv, est.rows)) for name, c in est.columns.items()}
+        estimates[nid] = est
+    _flag_plan(dag, estimates)
+    return estimates, targets
+
+
+def explain_dag(
+    dag: DAG,
+    base_path: str | Path | None = None,
+    *,
+    input_tables: Mapping[str, pd.DataFrame] | None = None,
+    io: IOAdapter | None = None,
+    targets: Optional[Iterable[str]] = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+) -> ExplainPlan:
+    """EXPLAIN: estimate the plan from input samples without running it."""
+    ctx = ExecutionContext(Path(base_path) if base_path is not None else None, io=io, input_tables=input_tables)
+    estimates, targets = estimate_dag(dag, ctx, targets, sample_rows)
+    return ExplainPlan(dag, estimates, targets)
+
+
+def explain_analyze(
+    dag: DAG,
+    base_path: str | Path | None = None,
+    *,
+    input_tables: Mapping[str, pd.DataFrame] | None = None,
+    io: IOAdapter | None = None,
+    targets: Optional[List[str]] = None,
+    sample_rows: int = DEFAULT_SAMPLE_ROWS,
+    **executor_kwargs: Any,
+) -> Tuple[ExplainPlan, Dict[str, Any]]:
+    """
+    EXPLAIN ANALYZE: run the flow with profiling (outputs are written) and return the plan of the
+    DAG that ran (rewritten when an optimizer is passed) with actual values, and the run's results.
+    """
+    executor = DAGExecutor(dag, base_path=base_path, input_tables=input_tables, io=io, profile=True, **executor_kwargs)
+    results = executor.run(targets=targets)
+    ctx = ExecutionContext(executor.base_path, io=io, input_tables=input_tables)
+    estimates, plan_targets = estimate_dag(executor.dag, ctx, targets, sample_rows)
+    return ExplainPlan(executor.dag, estimates, plan_targets, executor.profile), results
+
+
+def _estimate_input(node: Node, ctx: ExecutionContext, sample_rows: int) -> NodeEstimate:
+    try:
+        frame, rows = sample_input(node, ctx, sample_rows)
+    except Exception as exc:
+        return NodeEstimate(node.id, node.kind.value, 0.0, {}, detail="unsampled", hotspots=[f"could not sample input: {exc}"])
+    detail = f"sampled {len(frame)} rows" if len(frame) < rows else ""
+    return NodeEstimate(node.id, node.kind.value, rows, column_estimates(frame, rows), cost=rows, detail=detail)
+
+
+def _estimate_node(node: Node, ins: List[NodeEstimate]) -> NodeEstimate:
+    params = node.params or {}
+    kind = node.kind
+    est = NodeEstimate(node.id, kind.value, ins[0].rows if ins else 0.0, dict(ins[0].columns) if ins else {})
+    rows_in = sum(i.rows for i in ins)
+    if kind is StepKind.PROJECT:
+        _estimate_project(est, params)
+    elif kind is StepKind.FILTER:
+        predicate = params.get("predicate")
+        selectivity = _selectivity(predicate, est.columns) if isinstance(predicate, str) else DEFAULT_SELECTIVITY
+        est.rows *= selectivity
+        est.cost = rows_in
+        est.detail = f"selectivity {selectivity:.3g}"
+    elif kind is StepKind.JOIN:
+        _estimate_join(est, params, ins[0], ins[1])
+    elif kind is StepKind.UNION:
+        columns: Dict[str, ColumnEstimate] = {}
+        for part in ins:
+            for name, c in part.columns.items():
+                old = columns.get(name)
+                columns[name] = c if old is None else ColumnEstimate(old.ndv + c.ndv, max(old.null_frac, c.null_frac), max(old.width, c.width), old.guessed or c.guessed)
+        est.columns = columns
+        est.rows = rows_in
+        if params.get("distinct"):
+            est.rows = min(rows_in, _keys_ndv(est, list(columns), rows_in))
+        est.cost = rows_in
+    elif kind is StepKind.AGGREGATE:
+        keys = [str(k) for k in params.get("group_keys") or []]
+        aggs = [a for a in params.get("aggs") or [] if isinstance(a, Mapping)]
+        est.rows = _keys_ndv(ins[0], keys, rows_in) if keys else 1.0
+        if params.get("having"):
+            est.rows *= RANGE_SELECTIVITY
+        est.columns = {k: ins[0].columns.get(k, ColumnEstimate(est.rows, guessed=True)) for k in keys}
+        est.columns.update({str(a.get("as")): ColumnEstimate(est.rows, guessed=True) for a in aggs})
+        est.cost = rows_in * (1 + len(aggs))
+        est.detail = f"by {keys}" if keys else "global"
+    elif kind is StepKind.DEDUP:
+        keys = params.get("keys")
+        key_list = [str(k) for k in keys] if isinstance(keys, list) else list(est.columns)
+        est.rows = min(rows_in, _keys_ndv(ins[0], key_list, rows_in))
+        if params.get("output") == "keys_only":
+            est.columns = {k: c for k, c in est.columns.items() if k in key_list}
+        est.cost = rows_in
+        est.detail = f"on {key_list}" if isinstance(keys, list) else "all columns"
+    elif kind is StepKind.SORT:
+        limit, per_group = params.get("limit"), params.get("limit_per_group")
+        partition = [str(c) for c in params.get("partition_by") or []]
+        if isinstance(limit, int):
+            est.rows = min(rows_in, limit)
+        if isinstance(per_group, int) and partition:
+            est.rows = min(est.rows, _keys_ndv(ins[0], partition, rows_in) * per_group)
+        limited = isinstance(limit, int) or (isinstance(per_group, int) and partition)
+        # Limited sorts select their candidates first (linear), full sorts are n log n.
+        est.cost = rows_in if limited else rows_in * max(math.log2(max(rows_in, 2)), 1)
+        est.detail = "top-k" if limited else "full"
+    elif kind is StepKind.PIVOT:
+        _estimate_pivot(est, params, ins[0])
+    elif kind is StepKind.SCRIPT:
+        est.cost = rows_in
+        est.detail = "opaque"
+    else:
+        est.cost = rows_in
+    return est
+
+
+def _estimate_project(est: NodeEstimate, params: Mapping[str, Any]) -> None:
+    rows_in = est.rows
+    cols = est.columns
+    if params.get("promote_row_to_header") is not None:
+        est.rows = max(est.rows - 1, 0.0)
+    select = params.get("select")
+    if isinstance(select, list):
+        names: List[str] = []
+        for item in select:
+            names.extend(cols if item == "*" else [str(item)])
+        cols = {name: cols.get(name, ColumnEstimate(est.rows, guessed=True)) for name in names}
+    rename = params.get("rename")
+    if isinstance(rename, Mapping):
+        cols = {str(rename.get(name, name)): c for name, c in cols.items()}
+    steps = 0
+    for item in params.get("compute") or []:
+        if isinstance(item, Mapping) and isinstance(item.get("as"), str):
+            refs = referenced_columns(item["expr"]) if isinstance(item.get("expr"), str) else None
+            sources = [cols[r] for r in refs or () if r in cols]
+            tree = _parse(item["expr"]) if isinstance(item.get("expr"), str) else None
+            if isinstance(tree, ast.Constant):
+                cols[item["as"]] = ColumnEstimate(1.0, 1.0 if tree.value is None else 0.0)
+            elif len(sources) == 1 and _is_column_ref(tree):
+                cols[item["as"]] = sources[0]
+            elif len(sources) == 1:
+                cols[item["as"]] = replace(sources[0], guessed=True)
+            else:
+                cols[item["as"]] = ColumnEstimate(est.rows, guessed=True)
+            steps += 1
+    steps += len(params.get("cast") or [])
+    for op in params.get("map") or []:
+        if not isinstance(op, Mapping):
+            continue
+        col, args = str(op.get("col")), op.get("args") or {}
+        target = str(args.get("as") or col) if isinstance(args, Mapping) else col
+        cols[target] = cols.get(col, ColumnEstimate(est.rows, guessed=True))
+        if op.get("op") == "explode":
+            est.rows *= EXPLODE_FACTOR
+            est.hotspots.append(f"explode of {col!r} multiplies rows (assumed x{EXPLODE_FACTOR:g})")
+        steps += 1
+    expand = params.get("expand")
+    if isinstance(expand, Mapping):
+        keep = [str(k) for k in expand.get("keys") or []]
+        if expand.get("keep_from_col", True) and isinstance(expand.get("from_col"), str):
+            keep.append(expand["from_col"])
+        new_cols = {k: cols.get(k, ColumnEstimate(est.rows, guessed=True)) for k in keep}
+        new_cols[str(expand.get("expand_col"))] = ColumnEstimate(est.rows * EXPAND_FACTOR)
+        cols = new_cols
+        est.rows *= EXPAND_FACTOR
+        est.hotspots.append(f"expand generates one row per value of each range (assumed x{EXPAND_FACTOR:g})")
+        steps += 1
+    if params.get("on_error") == "tag":
+        error_cols = params.get("error_cols") or ["error"]
+        cols[str(error_cols[0])] = ColumnEstimate(1.0, 0.9, 16.0)
+    est.columns = cols
+    est.cost = rows_in * (1 + steps)
+
+
+def _estimate_join(est: NodeEstimate, params: Mapping[str, Any], left: NodeEstimate, right: NodeEstimate) -> None:
+    how = params.get("how", "inner")
+    on = params.get("on")
+    on_keys = [on] if isinstance(on, str) else on
+    left_keys = [str(k) for k in (on_keys if on_keys is not None else _as_list(params.get("left_on")))]
+    right_keys = [str(k) for k in (on_keys if on_keys is not None else _as_list(params.get("right_on")))]
+    ndv_left = _keys_ndv(left, left_keys, left.rows)
+    ndv_right = _keys_ndv(right, right_keys, right.rows)
+    inner = left.rows * right.rows / max(ndv_left, ndv_right, 1.0)
+    if how == "semi":
+        est.rows = left.rows * min(1.0, ndv_right / max(ndv_left, 1.0))
+    elif how == "anti":
+        est.rows = left.rows * max(0.0, 1 - ndv_right / max(ndv_left, 1.0))
+    elif how == "left":
+        est.rows = max(inner, left.rows)
+    elif how == "right":
+        est.rows = max(inner, right.rows)
+    elif how == "full":
+        est.rows = max(inner, left.rows, right.rows)
+    else:
+        est.rows = inner
+    if how in {"semi", "anti"}:
+        est.columns = dict(left.columns)
+    else:
+        suffixes = params.get("suffixes") or ["_x", "_y"]
+        left_cols = _selected(left.columns, params.get("select_left"))
+        right_cols = {k: c for k, c in _selected(right.columns, params.get("select_right")).items() if not (on_keys is not None and k in left_keys)}
+        cols: Dict[str, ColumnEstimate] = {}
+        for name, c in left_cols.items():
+            cols[name + str(suffixes[0]) if name in right_cols else name] = c
+        for name, c in right_cols.items():
+            cols[name + str(suffixes[1]) if name in left_cols else name] = c
+        est.columns = cols
+        per_left, per_right = left.rows / max(ndv_left, 1.0), right.rows / max(ndv_right, 1.0)
+        if per_left > MANY_ROWS_PER_KEY and per_right > MANY_ROWS_PER_KEY:
+            est.hotspots.append(
+                f"many-to-many join on {left_keys}: ~{per_left:.1f} left and ~{per_right:.1f} right rows per key"
+            )
+        if est.rows > 2 * max(left.rows, right.rows, 1.0):
+            est.hotspots.append(f"join output (~{_human(est.rows)} rows) is far larger than its inputs")
+    est.cost = left.rows + right.rows + est.rows
+    est.detail = f"{how} on {left_keys}" + (f"={right_keys}" if right_keys != left_keys else "")
+
+
+def _estimate_pivot(est: NodeEstimate, params: Mapping[str, Any], src: NodeEstimate) -> None:
+    mode = params.get("mode")
+    rows_in = src.rows
+    est.detail = str(mode)
+    est.cost = rows_in
+    if mode == "pivot_wider":
+        index = [str(c) for c in _as_list(params.get("index"))]
+        columns = [str(c) for c in _as_list(params.get("columns"))]
+        values = _as_list(params.get("values"))
+        est.rows = _keys_ndv(src, index, rows_in)
+        n_new = _keys_ndv(src, columns, rows_in) * max(len(values), 1)
+        est.columns = {k: src.columns.get(k, ColumnEstimate(est.rows, guessed=True)) for k in index}
+        est.columns.update({f"__pivot_{i}": ColumnEstimate(est.rows, guessed=True) for i in range(int(min(n_new, WIDE_PIVOT_COLUMNS + 1)))})
+        if n_new > WIDE_PIVOT_COLUMNS:
+            est.hotspots.append(f"pivot_wider creates ~{_human(n_new)} columns")
+        est.cost = rows_in + est.rows * n_new
+    elif mode == "pivot_longer":
+        id_cols = [str(c) for c in _as_list(params.get("id_cols"))]
+        value_vars = [str(c) for c in _as_list(params.get("value_vars"))]
+        est.rows = rows_in * len(value_vars)
+        width = max((src.columns[c].width for c in value_vars if c in src.columns), default=8.0)
+        est.columns = {k: src.columns.get(k, ColumnEstimate(rows_in, guessed=True)) for k in id_cols}
+        est.columns[str(params.get("names_to"))] = ColumnEstimate(float(len(value_vars)))
+        est.columns[str(params.get("values_to"))] = ColumnEstimate(est.rows, 0.0, width, guessed=True)
+        est.cost = est.rows
+    elif mode == "pivot_longer_from_rows":
+        names = [str(params.get("names_to", "key")), *(str(c) for c in _as_list(params.get("column_pattern")))]
+        est.columns = {name: ColumnEstimate(rows_in, guessed=True) for name in names}
+    elif mode == "pivot_longer_paired":
+        names = [*(str(c) for c in _as_list(params.get("id_cols"))), str(params.get("key_col", "key")), *(str(c) for c in _as_list(params.get("value_cols")))]
+        est.columns = {name: ColumnEstimate(rows_in, guessed=True) for name in names}
+
+
+def _flag_plan(dag: DAG, estimates: Dict[str, NodeEstimate]) -> None:
+    """Hotspots that depend on a node's consumers or on the whole plan."""
+    consumers: Dict[str, List[Node]] = {}
+    for node in dag.nodes.values():
+        if node.id in estimates:
+            for i in node.inputs:
+                consumers.setdefault(i, []).append(node)
+    for nid, est in estimates.items():
+        node = dag.nodes[nid]
+        if node.kind is StepKind.SORT and est.detail == "full":
+            limiting = [c.id for c in consumers.get(nid, []) if _limits_rows(c)]
+            if limiting and len(limiting) == len(consumers.get(nid, [])):
+                est.hotspots.append(
+                    f"full sort of ~{_human(est.rows)} rows before a limit in {limiting}; set limit/limit_per_group on this sort"
+                )
+    total = sum(e.cost for e in estimates.values())
+    if len(estimates) > 2 and total > 0:
+        for est in estimates.values():
+            if est.cost > total / 2:
+                est.hotspots.append(f"{100 * est.cost / total:.0f}% of the plan's estimated cost")
+
+
+def _limits_rows(node: Node) -> bool:
+    """Whether node only keeps leading rows of its input order (a sort limit or a __row_pos filter)."""
+    params = node.params or {}
+    if node.kind is StepKind.SORT:
+        return isinstance(params.get("limit"), int)
+    if node.kind is StepKind.FILTER:
+        predicate = params.get("predicate")
+        return isinstance(predicate, str) and "__row_pos" in predicate
+    return False
+
+
+def _selectivity(predicate: str, columns: Mapping[str, ColumnEstimate]) -> float:
+    tree = _parse(predicate)
+    if tree is None:
+        return DEFAULT_SELECTIVITY
+    return min(max(_node_selectivity(tree, columns), 0.0), 1.0)
+
+
+def _parse(expr: str) -> Optional[ast.AST]:
+    try:
+        return ast.parse(expr, mode="eval").body
+    except SyntaxError:
+        return None
+
+
+def _node_selectivity(node: ast.AST, columns: Mapping[str, ColumnEstimate]) -> float:
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitAnd):
+        return _node_selectivity(node.left, columns) * _node_selectivity(node.right, columns)
+    if isinstance(node, ast.BoolOp) and isinstance(node.op, ast.And):
+        return math.prod(_node_selectivity(v, columns) for v in node.values)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitOr):
+        a, b = _node_selectivity(node.left, columns), _node_selectivity(node.right, columns)
+        return a + b - a * b
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Invert, ast.Not)):
+        return 1 - _node_selectivity(node.operand, columns)
+    if isinstance(node, ast.Compare) and len(node.ops) == 1:
+        col = _column_of(node.left, columns) or _column_of(node.comparators[0], columns)
+        stats = columns.get(col) if col is not None else None
+        op = node.ops[0]
+        if isinstance(op, (ast.Eq, ast.NotEq)):
+            if stats is None or stats.guessed:
+                eq = EQ_SELECTIVITY
+            else:
+                eq = (1 - stats.null_frac) / max(stats.ndv, 1.0)
+            return eq if isinstance(op, ast.Eq) else 1 - eq
+        if isinstance(op, (ast.Lt, ast.LtE, ast.Gt, ast.GtE)):
+            return RANGE_SELECTIVITY
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        method = node.func.attr
+        col = _column_of(node.func.value, columns)
+        stats = columns.get(col) if col is not None else None
+        if method in {"notna", "notnull"}:
+            return 1 - stats.null_frac if stats is not None else 0.9
+        if method in {"isna", "isnull"}:
+            return stats.null_frac if stats is not None else 0.1
+        if method == "isin" and node.args and isinstance(node.args[0], (ast.List, ast.Tuple, ast.Set)):
+            n = len(node.args[0].elts)
+            if stats is None or stats.guessed:
+                return min(1.0, EQ_SELECTIVITY * n)
+            return min(1.0, n * (1 - stats.null_frac) / max(stats.ndv, 1.0))
+        if method == "between":
+            return RANGE_SELECTIVITY / 2
+    return DEFAULT_SELECTIVITY
+
+
+def _column_of(node: ast.AST, columns: Mapping[str, ColumnEstimate]) -> Optional[str]:
+    """Column a (possibly method-chained) expression reads: df['x'], df.x or a bare column name."""
+    while True:
+        if isinstance(node, ast.Name):
+            return node.id if node.id in columns else None
+        if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id == "df":
+            key = node.slice
+            return key.value if isinstance(key, ast.Constant) and isinstance(key.value, str) else None
+        if isinstance(node, ast.Attribute):
+            if isinstance(node.value, ast.Name) and node.value.id == "df":
+                return node.attr if node.attr in columns else None
+            node = node.value
+        elif isinstance(node, ast.Call):
+            node = node.func
+        else:
+            return None
+
+
+def _is_column_ref(node: Optional[ast.AST]) -> bool:
+    """Whether an expression is a plain column read (a copy of the column, same statistics)."""
+    if isinstance(node, ast.Name):
+        return True
+    if isinstance(node, ast.Subscript):
+        return isinstance(node.value, ast.Name) and node.value.id == "df"
+    return isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "df"
+
+
+def _keys_ndv(est: NodeEstimate, keys: Sequence[str], rows: float) -> float:
+    """Distinct key combinations (independent columns), at most rows."""
+    ndv = 1.0
+    for key in keys:
+        stats = est.columns.get(key)
+        ndv *= max(stats.ndv + (1 if stats.null_frac > 0 else 0), 1.0) if stats is not None else max(rows, 1.0)
+    return min(ndv, max(rows, 1.0))
+
+
+def _selected(columns: Mapping[str, ColumnEstimate], select: Any) -> Dict[str, ColumnEstimate]:
+    if not isinstance(select, list) or "*" in select:
+        return dict(columns)
+    return {str(c): columns.get(str(c), ColumnEstimate(1.0, guessed=True)) for c in select}
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _human(value: float) -> str:
+    for unit, scale in (("G", 1e9), ("M", 1e6), ("K", 1e3)):
+        if abs(value) >= scale:
+            return f"{value / scale:.1f}{unit}"
+    return f"{value:.0f}" if value == int(value) or abs(value) >= 10 else f"{value:.1f}"
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, List, Optional, Set
+
+import pandas as pd
+
+from .cache import canonical_params, input_identity, is_cacheable
+from .ir import DAG, Node, StepKind
+
+
+def node_signature(node: Node, ctx: Any) -> Optional[str]:
+    """
+    Identity of a node for diffing against a previous run: id, kind, canonical params and the
+    ordered input ids (plus file identity for inputs). None means the node must always re-run.
+    """
+    if not is_cacheable(node):
+        return None
+    h = hashlib.sha256()
+    h.update(f"{node.id}|{node.kind.value}|".encode("utf-8"))
+    h.update(canonical_params(node.params).encode("utf-8"))
+    h.update(("|" + "\x1f".join(node.inputs)).encode("utf-8"))
+    if node.kind is StepKind.INPUT:
+        ident = input_identity(node, ctx)
+        if ident is None:
+            return None
+        h.update(b"|file=" + ident.encode("utf-8"))
+    return h.hexdigest()
+
+
+class IncrementalState:
+    """
+    Materialised results of the previous run, keyed by node id.
+
+    Pass the same instance to successive DAGExecutor runs (e.g. flow repair rounds). Each run
+    diffs its DAG against the previous one; a node is reused when its signature is unchanged and
+    all of its inputs are reused, so only the invalidated downstream cone is recomputed.
+    Results of nodes that completed are kept even if the run later fails; a node the failed run
+    never reached is kept only if its inputs were reused or kept the same way. Results are stored
+    by reference; the executor hands out a copy whenever it reuses one.
+    """
+
+    def __init__(self) -> None:
+        self.signatures: Dict[str, str] = {}
+        self.results: Dict[str, pd.DataFrame] = {}
+        self._next_signatures: Dict[str, str] = {}
+        self._next_results: Dict[str, pd.DataFrame] = {}
+        self._reused: Set[str] = set()
+        self._inputs: Dict[str, List[str]] = {}
+
+    def plan(self, dag: DAG, order: List[str], needed: Set[str], ctx: Any) -> Dict[str, pd.DataFrame]:
+        """Return reusable results for needed nodes and start recording the new run."""
+        reuse: Dict[str, pd.DataFrame] = {}
+        self._next_signatures = {}
+        self._next_results = {}
+        self._reused = set()
+        self._inputs = {}
+        for nid in order:
+            if nid not in needed:
+                continue
+            node = dag.nodes[nid]
+            sig = node_signature(node, ctx)
+            if sig is None:
+                continue
+            self._next_signatures[nid] = sig
+            self._inputs[nid] = list(node.inputs)
+            if (
+                self.signatures.get(nid) == sig
+                and nid in self.results
+                and all(i in reuse for i in node.inputs)
+            ):
+                reuse[nid] = self.results[nid]
+        self._reused = set(reuse)
+        return reuse
+
+    def record(self, node_id: str, result: Any) -> None:
+        if node_id in self._next_signatures and isinstance(result, pd.DataFrame):
+            self._next_results[node_id] = result
+
+    def commit(self) -> None:
+        # Signatures were collected in topological order, so inputs are decided before consumers.
+        unchanged = set(self._reused)
+        for nid, sig in self._next_signatures.items():
+            if nid in self._next_results:
+                continue
+            # Not reached this run (an earlier node failed) but still valid for the next one, as long
+            # as nothing upstream was recomputed or changed.
+            if (
+                self.signatures.get(nid) == sig
+                and nid in self.results
+                and all(i in unchanged for i in self._inputs[nid])
+            ):
+                self._next_results[nid] = self.results[nid]
+                unchanged.add(nid)
+        self.results = self._next_results
+        self.signatures = {nid: self._next_signatures[nid] for nid in self._next_results}
+        self._next_signatures = {}
+        self._next_results = {}
+        self._reused = set()
+        self._inputs = {}
@@ -369,6 +369,7 @@ def _validate_input(node: Node) -> None:
             "on_bad_lines",
             "quotechar",
             "escapechar",
+            "usecols",
             "data",
             "source_type",
         },
@@ -402,9 +403,9 @@ def _validate_input(node: Node) -> None:
     _require_str(node, "path")
     if "mode" in node.params and node.params["mode"] is not None:
         mode = node.params["mode"]
-        if not isinstance(mode, str) or mode not in {"csv", "line"}:
+        if not isinstance(mode, str) or mode not in {"csv", "line", "parquet", "feather"}:
             raise FlowValidationError(
-                f"Node {node.id} params.mode must be csv|line when provided",
+                f"Node {node.id} params.mode must be csv|line|parquet|feather when provided",
                 node_id=node.id,
                 step_kind=node.kind,
                 error_code="node_validation",
@@ -448,6 +449,15 @@ def _validate_input(node: Node) -> None:
                 step_kind=node.kind,
                 error_code="node_validation",
             )
+    if "usecols" in node.params:
+        uc = node.params["usecols"]
+        if not isinstance(uc, list) or not all(isinstance(x, str) and x for x in uc):
+            raise FlowValidationError(
+                f"Node {node.id} params.usecols must be a list of strings",
+                node_id=node.id,
+                step_kind=node.kind,
+                error_code="node_validation",
+            )
     if "dtype" in node.params:
         dt = node.params["dtype"]
         if not isinstance(dt, Mapping) or not all(isinstance(k, str) and isinstance(v, str) for k, v in dt.items()):
@@ -1048,7 +1058,7 @@ def _validate_aggregate(node: Node) -> None:
 
 def _validate_dedup(node: Node) -> None:
     _reject_unknown_params(
-        node, {"keys", "output", "keep", "order_by", "on_missing_tiebreaker"})
+        node, {"keys", "output", "keep", "order_by", "on_missing_tiebreaker", "output_order"})
     keys = node.params.get("keys", None)
     if "on_missing_tiebreaker" in node.params:
         omt = node.params.get("on_missing_tiebreaker")
@@ -1083,6 +1093,13 @@ def _validate_dedup(node: Node) -> None:
             step_kind=node.kind,
             error_code="node_validation",
         )
+    if node.params.get("output_order", "sorted") not in {"sorted", "input"}:
+        raise FlowValidationError(
+            f"Node {node.id} dedup.output_order must be sorted|input",
+            node_id=node.id,
+            step_kind=node.kind,
+            error_code="node_validation",
+        )
 
     order_by = node.params.get("order_by")
     if order_by is not None:
@@ -1365,7 +1382,7 @@ def _validate_pivot(node: Node) -> None:
 
 def _validate_output(node: Node) -> None:
     _reject_unknown_params(node, {"path", "schema_enforce", "schema",
-                           "write_order", "datetime_format", "encoding", "lineterminator"})
+                           "write_order", "datetime_format", "encoding", "lineterminator", "format"})
     _require_str(node, "path")
     schema_enforce = _optional_bool(node, "schema_enforce", False)
     if schema_enforce and node.params.get("schema") is None:
@@ -1404,6 +1421,14 @@ def _validate_output(node: Node) -> None:
                 step_kind=node.kind,
                 error_code="node_validation",
             )
+    fmt = node.params.get("format")
+    if fmt is not None and fmt not in {"csv", "parquet", "feather"}:
+        raise FlowValidationError(
+            f"Node {node.id} output.format must be csv|parquet|feather when provided",
+            node_id=node.id,
+            step_kind=node.kind,
+            error_code="node_validation",
+        )
     for key in ("encoding", "lineterminator"):
         if key in node.params and node.params[key] is not None:
             v = node.params[key]
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from typing import Any, Mapping, List, Dict, Callable
+from typing import Any, Mapping, List, Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from py2flow.errors import FlowExecutionError
 from py2flow.ir import StepKind
-from .base import Operator, ExecutionContext
+from .base import Operator, ExecutionContext, defensive_copy
 from .expr import eval_expr
 
 
@@ -30,18 +31,19 @@ class Aggregate(Operator):
 
         null_group = bool(params.get("null_group", True))
 
-        work = df.copy()
+        work = df
         sentinels: Dict[str, str] = {}
         if group_keys and null_group:
+            # Shallow: only the key columns are replaced, the rest stay shared with the input.
+            work = df.copy(deep=False)
             for col in group_keys:
                 sentinel = f"__PY2FLOW_NULL_GROUP__{col}__"
                 sentinels[col] = sentinel
                 work[col] = work[col].where(work[col].notna(), sentinel)
 
-        grouped = _groupby(work, group_keys, null_group) if group_keys else None
-
-        out_series: Dict[str, Any] = {}
-        for idx, agg in enumerate(aggs):
+        # Evaluate every expression first, then reduce all of them over one grouping.
+        plan: List[Tuple[str, str, bool, Optional[pd.Series]]] = []
+        for agg in aggs:
             if not isinstance(agg, Mapping):
                 raise ValueError("aggregate aggs item must be an object")
             out_name = agg.get("as")
@@ -56,10 +58,7 @@ class Aggregate(Operator):
                 raise ValueError("aggregate aggs item expr must be a non-empty string when provided")
 
             if expr is None and func == "count":
-                if group_keys:
-                    out_series[out_name] = grouped.size()  # type: ignore[union-attr]
-                else:
-                    out_series[out_name] = pd.Series([len(work)], index=[0])
+                plan.append((out_name, func, distinct, None))
                 continue
 
             if expr is None:
@@ -78,26 +77,39 @@ class Aggregate(Operator):
                 ) from exc
 
             if isinstance(value, pd.Series):
-                series = value
+                series = value if value.index.equals(work.index) else value.reindex(work.index)
             else:
                 series = pd.Series([value] * len(work), index=work.index)
+            plan.append((out_name, func, distinct, series))
 
-            col = f"__py2flow_agg_{idx}__"
-            work[col] = series
-            if group_keys:
-                g = _groupby(work, group_keys, null_group)[col]
-                out_series[out_name] = _apply_group_agg(g, func, distinct)
-            else:
-                out_series[out_name] = _apply_scalar_agg(work[col], func, distinct)
-
+        out_series: Dict[str, Any] = {}
         if group_keys:
+            frame = work[group_keys].copy(deep=False)
+            named: Dict[str, Tuple[str, str]] = {}
+            for idx, (out_name, func, distinct, series) in enumerate(plan):
+                col = f"__py2flow_agg_{idx}__"
+                if series is None:
+                    named[col] = (group_keys[0], "size")
+                    continue
+                frame[col] = series
+                if not distinct or func == "count_distinct":
+                    named[col] = (col, _GROUP_FUNCS[func])
+            grouped = _groupby(frame, group_keys, null_group)
+            reduced = grouped.agg(**named) if named else grouped.size().to_frame()
+            for idx, (out_name, func, distinct, series) in enumerate(plan):
+                col = f"__py2flow_agg_{idx}__"
+                if col in named:
+                    out_series[out_name] = reduced[col]
+                else:
+                    out_series[out_name] = _distinct_group_agg(grouped, col, func, reduced.index)
             result = pd.concat(out_series, axis=1).reset_index()
             for col, sentinel in sentinels.items():
                 if col in result.columns:
                     result[col] = result[col].replace({sentinel: pd.NA})
         else:
-            row: Dict[str, Any] = {k: (v.iloc[0] if isinstance(v, pd.Series) else v) for k, v in out_series.items()}
-            result = pd.DataFrame([row])
+            for out_name, func, distinct, series in plan:
+                out_series[out_name] = len(work) if series is None else _apply_scalar_agg(series, func, distinct)
+            result = pd.DataFrame([out_series])
 
         if having is not None:
             try:
@@ -124,11 +136,15 @@ class Aggregate(Operator):
                     message="aggregate having must return bool or boolean Series",
                     error_code="aggregate_having_eval",
                 )
-            result = result[mask.fillna(False).astype(bool)].copy()
+            result = defensive_copy(result[mask.fillna(False).astype(bool)])
 
         return result
 
 
+# Aggregate func -> pandas groupby reduction name.
+_GROUP_FUNCS = {"sum": "sum", "count": "count", "min": "min", "max": "max", "avg": "mean", "prod": "prod", "count_distinct": "nunique"}
+
+
 def _groupby(df: pd.DataFrame, keys: List[str], null_group: bool) -> pd.core.groupby.generic.DataFrameGroupBy:
     if not keys:
         raise ValueError("groupby keys must be non-empty")
@@ -138,42 +154,32 @@ def _groupby(df: pd.DataFrame, keys: List[str], null_group: bool) -> pd.core.gro
         return df.groupby(keys, sort=False)
 
 
-def _apply_group_agg(g: pd.core.groupby.generic.SeriesGroupBy, func: str, distinct: bool) -> pd.Series:
+def _apply_group_agg(g: pd.core.groupby.generic.SeriesGroupBy, func: str) -> pd.Series:
     if func == "count_distinct":
         return g.nunique(dropna=True)
-
-    if not distinct:
-        if func == "sum":
-            return g.sum()
-        if func == "count":
-            return g.count()
-        if func == "min":
-            return g.min()
-        if func == "max":
-            return g.max()
-        if func == "avg":
-            return g.mean()
-        if func == "prod":
-            return g.prod()
+    if func not in _GROUP_FUNCS:
         raise ValueError(f"unsupported func: {func}")
-
+    return getattr(g, _GROUP_FUNCS[func])()
+
+
+def _distinct_group_agg(grouped: pd.core.groupby.generic.DataFrameGroupBy, col: str, func: str, index: pd.Index) -> pd.Series:
+    """func over each group's distinct values of col, in the group order of index."""
+    values = grouped.obj[col]
+    if len(index) and values.dtype.kind in "biuf" and isinstance(values.dtype, np.dtype):
+        # One drop_duplicates on (group, value), then one grouped reduction; every group keeps a row.
+        pairs = pd.DataFrame({"group": grouped.ngroup().reset_index(drop=True), "value": values.reset_index(drop=True)})
+        # Rows of dropped null groups have no group number.
+        pairs = pairs[pairs["group"].notna() & (pairs["group"] >= 0)].drop_duplicates()
+        out = _apply_group_agg(pairs.groupby("group", sort=True)["value"], func)
+        out.index = index
+        return out
+
+    # Object and extension values keep per-group Series reductions, which treat nulls differently
+    # (and an empty input keeps apply's float result).
     def reduce_fn(series: pd.Series) -> Any:
-        series = series.drop_duplicates()
-        if func == "sum":
-            return series.sum()
-        if func == "count":
-            return series.count()
-        if func == "min":
-            return series.min()
-        if func == "max":
-            return series.max()
-        if func == "avg":
-            return series.mean()
-        if func == "prod":
-            return series.prod()
-        raise ValueError(f"unsupported func: {func}")
+        return _apply_scalar_agg(series, func, True)
 
-    return g.apply(reduce_fn)
+    return grouped[col].apply(reduce_fn)
 
 
 def _apply_scalar_agg(series: pd.Series, func: str, distinct: bool) -> Any:
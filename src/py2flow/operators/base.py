@@ -35,6 +35,15 @@ class FileIO(IOAdapter):
             raise ValueError(f"Unsupported format: {fmt}")
 
 
+def columnar_io(io: IOAdapter) -> IOAdapter:
+    """The adapter for parquet/feather files: io itself, or ArrowIO in place of the CSV-only FileIO."""
+    if type(io) is FileIO:
+        from py2flow.arrow_io import ArrowIO
+
+        return ArrowIO()
+    return io
+
+
 class ExecutionContext:
 
     def __init__(
@@ -70,6 +79,15 @@ class ExecutionContext:
         return p
 
 
+def copy_on_write_enabled() -> bool:
+    return pd.options.mode.copy_on_write is True
+
+
+def defensive_copy(df: pd.DataFrame) -> pd.DataFrame:
+    """Isolate a result from its inputs: a deep copy, or a lazy shallow one under pandas copy-on-write."""
+    return df.copy(deep=not copy_on_write_enabled())
+
+
 class Operator(ABC):
 
     @abstractmethod
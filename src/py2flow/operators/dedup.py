@@ -1,13 +1,19 @@
 from __future__ import annotations
 
-from typing import Any, Mapping, List, Tuple
+from typing import Any, Mapping, List, Tuple, Dict
 
+import numpy as np
 import pandas as pd
 
 from py2flow.errors import FlowExecutionError
 from py2flow.ir import StepKind
-from .base import Operator, ExecutionContext
+from .base import Operator, ExecutionContext, defensive_copy
 from .expr import eval_expr
+from .sort import sort_labels
+
+
+# Stands for every float NaN key, which drop_duplicates treats as equal.
+_NAN = object()
 
 
 class Dedup(Operator):
@@ -21,28 +27,30 @@ class Dedup(Operator):
         keep = params.get("keep", "first")
 
         if keys is None:
-            return df.drop_duplicates().copy()
+            return defensive_copy(df.drop_duplicates())
         if not isinstance(keys, list) or not all(isinstance(x, str) and x for x in keys):
             raise ValueError("dedup keys must be null or list[str]")
 
         if output == "keys_only":
-            return df[keys].drop_duplicates().copy()
+            return defensive_copy(df[keys].drop_duplicates())
         if output != "all_cols":
             raise ValueError("dedup output must be all_cols|keys_only")
 
         if keep == "none":
-            return df.drop_duplicates(subset=keys, keep=False).copy()
+            return defensive_copy(df.drop_duplicates(subset=keys, keep=False))
         if keep not in {"first", "last"}:
             raise ValueError("dedup keep must be first|last|none")
 
         order_by = params.get("order_by")
         if not isinstance(order_by, list) or not order_by:
             raise ValueError("dedup keep=first/last requires order_by")
+        output_order = params.get("output_order", "sorted")
+        if output_order not in {"sorted", "input"}:
+            raise ValueError("dedup output_order must be sorted|input")
 
-        stable = True
-        work, sort_cols, ascending, temp_cols = _build_order_by(df, order_by, stable=stable)
+        keys_frame, sort_cols, ascending = _build_order_by(df, order_by)
         try:
-            work = work.sort_values(by=sort_cols, ascending=ascending, kind="mergesort")
+            labels = sort_labels(keys_frame, sort_cols, ascending)
         except Exception as exc:
             raise FlowExecutionError(
                 node_id,
@@ -52,16 +60,67 @@ class Dedup(Operator):
                 message=f"dedup sort failed: {exc}",
                 error_code="dedup_sort",
             ) from exc
-        if temp_cols:
-            work = work.drop(columns=temp_cols)
-        return work.drop_duplicates(subset=keys, keep=keep).copy()
+        groups = _group_ids(df, keys)
+        winners = _winners(labels, groups, last=keep == "last")
+        if output_order == "sorted":
+            # Rows in the order a stable sort of the whole frame would leave them.
+            winners = winners[np.lexsort([label[winners] for label in labels][::-1])]
+        return defensive_copy(df.take(winners))
+
+
+def _group_ids(df: pd.DataFrame, keys: List[str]) -> np.ndarray:
+    """Group numbers under which DataFrame.drop_duplicates(subset=keys) treats rows as duplicates."""
+    if len(keys) == 1:
+        # A single key compares raw values: in object columns None, NaN and pd.NA stay distinct.
+        values = df[keys[0]]
+        codes, uniques = pd.factorize(values)
+        codes = codes.astype(np.int64)
+        nulls = np.flatnonzero(codes == -1)
+        if len(nulls):
+            if values.dtype == object:
+                kinds: Dict[Any, int] = {}
+                raw = values.to_numpy()
+                for pos in nulls:
+                    v = raw[pos]
+                    key = _NAN if isinstance(v, (float, complex)) and v != v else v
+                    codes[pos] = len(uniques) + kinds.setdefault(key, len(kinds))
+            else:
+                codes[nulls] = len(uniques)
+        return codes
+    # Several keys factorize each column (all nulls alike) and combine the codes.
+    codes = pd.DataFrame({i: pd.factorize(df[k])[0] for i, k in enumerate(keys)})
+    return codes.groupby(list(codes.columns), sort=False).ngroup().to_numpy(dtype=np.int64)
+
+
+def _winners(labels: List[np.ndarray], groups: np.ndarray, last: bool) -> np.ndarray:
+    """
+    Position of each group's first (or last) row in stable sort order, ascending by position.
+    Each label narrows the candidates to the rows at their group's extreme; position breaks ties.
+    """
+    if not len(groups):
+        return np.empty(0, dtype=np.intp)
+    n_groups = int(groups.max()) + 1
+    extreme = np.maximum if last else np.minimum
+    candidates = np.arange(len(groups))
+    for label in labels:
+        values = label[candidates]
+        cand_groups = groups[candidates]
+        if values.dtype.kind == "f":
+            start = -np.inf if last else np.inf
+        else:
+            start = np.iinfo(values.dtype).min if last else np.iinfo(values.dtype).max
+        best = np.full(n_groups, start, dtype=values.dtype)
+        extreme.at(best, cand_groups, values)
+        candidates = candidates[values == best[cand_groups]]
+    pick = np.full(n_groups, -1 if last else len(groups), dtype=np.int64)
+    extreme.at(pick, groups[candidates], candidates)
+    return np.sort(pick)
 
 
-def _build_order_by(df: pd.DataFrame, order_by: List[Mapping[str, Any]], stable: bool) -> Tuple[pd.DataFrame, List[str], List[bool], List[str]]:
-    work = df.copy()
+def _build_order_by(df: pd.DataFrame, order_by: List[Mapping[str, Any]]) -> Tuple[pd.DataFrame, List[str], List[bool]]:
+    keys = pd.DataFrame(index=df.index)
     sort_cols: List[str] = []
     ascending: List[bool] = []
-    temp_cols: List[str] = []
 
     for idx, item in enumerate(order_by):
         expr = item.get("expr")
@@ -73,28 +132,22 @@ def _build_order_by(df: pd.DataFrame, order_by: List[Mapping[str, Any]], stable:
             raise ValueError("order_by item invalid asc/nulls")
 
         try:
-            value = eval_expr(expr, work)
+            value = eval_expr(expr, df)
         except Exception as exc:
             raise ValueError(f"order_by expr failed: {expr!r} ({exc})") from exc
 
         if isinstance(value, pd.Series):
             series = value
         else:
-            series = pd.Series([value] * len(work), index=work.index)
+            series = pd.Series([value] * len(df), index=df.index)
 
         key_col = f"__py2flow_order_key_{idx}__"
         null_col = f"__py2flow_order_null_{idx}__"
-        work[key_col] = series
-        work[null_col] = series.isna()
-        temp_cols.extend([key_col, null_col])
+        keys[key_col] = series
+        keys[null_col] = series.isna()
 
         # nulls ordering: sort by null-flag first, then actual key
-        if nulls == "last":
-            sort_cols.extend([null_col, key_col])
-            ascending.extend([True, asc])
-        else:
-            sort_cols.extend([null_col, key_col])
-            ascending.extend([False, asc])
-
-    return work, sort_cols, ascending, temp_cols
+        sort_cols.extend([null_col, key_col])
+        ascending.extend([nulls == "last", asc])
 
+    return keys, sort_cols, ascending
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import ast
 import keyword
 import re
-from typing import Any, Dict, Mapping, MutableMapping, Optional, Set
+import time
+import types
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Collection, Dict, FrozenSet, Iterator, List, Mapping, MutableMapping, Optional, Set, Tuple
 
 import numpy as np
 import pandas as pd
@@ -145,11 +151,76 @@ def expr_env(df: pd.DataFrame, extra: Optional[Mapping[str, Any]] = None) -> Dic
     return env
 
 
-def eval_expr(expr: str, df: pd.DataFrame, extra: Optional[Mapping[str, Any]] = None) -> Any:
-    env = expr_env(df, extra=extra)
+def _referenced_names(code: types.CodeType) -> Set[str]:
+    # co_names of the expression and of nested lambdas/comprehensions: every global name the code
+    # can look up (plus attribute names, which only makes the set a harmless superset).
+    names: Set[str] = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _referenced_names(const)
+    return names
+
+
+@lru_cache(maxsize=4096)
+def compile_expr(expr: str) -> Tuple[types.CodeType, FrozenSet[str]]:
+    """Rewrite backtick columns and compile once per expression string; returns (code, referenced names)."""
     rewritten = _rewrite_backtick_columns(expr)
+    code = compile(rewritten, "<string>", "eval")
+    return code, frozenset(_referenced_names(code))
+
+
+# Shared by every evaluation, across threads; read-only so an expression cannot rebind a builtin for the others.
+_EXPR_BUILTINS: Mapping[str, Any] = types.MappingProxyType(safe_builtins())
+_EXPR_RESERVED: FrozenSet[str] = frozenset({"df", "pd", "np", "re", "__builtins__", "__row_pos"}) | frozenset(_EXPR_BUILTINS)
+
+
+def _compiled_env(df: pd.DataFrame, names: FrozenSet[str], extra: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    # Same bindings as expr_env(), restricted to the names the compiled expression references.
+    env: Dict[str, Any] = {"df": df, "pd": pd, "np": np, "re": re, "__builtins__": _EXPR_BUILTINS}
+    if "__row_pos" in names:
+        env["__row_pos"] = pd.Series(range(len(df)), index=df.index)
+    wanted = names - _EXPR_RESERVED
+    if wanted:
+        for col in df.columns:
+            name = str(col)
+            if name in wanted and _is_safe_identifier(name):
+                env[name] = df[name]
+    if extra:
+        env.update(dict(extra))
+    return env
+
+
+# perf_counter (start, end) spans of eval_expr calls, collected while record_expr_spans() is active.
+_expr_spans: ContextVar[Optional[List[Tuple[float, float]]]] = ContextVar("py2flow_expr_spans", default=None)
+
+
+@contextmanager
+def record_expr_spans() -> Iterator[List[Tuple[float, float]]]:
+    """Collect the (start, end) time.perf_counter() span of every eval_expr call made in this context."""
+    spans: List[Tuple[float, float]] = []
+    token = _expr_spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _expr_spans.reset(token)
+
+
+def eval_expr(expr: str, df: pd.DataFrame, extra: Optional[Mapping[str, Any]] = None) -> Any:
+    spans = _expr_spans.get()
+    if spans is None:
+        return _eval_expr(expr, df, extra)
+    start = time.perf_counter()
     try:
-        return eval(rewritten, env, env)
+        return _eval_expr(expr, df, extra)
+    finally:
+        spans.append((start, time.perf_counter()))
+
+
+def _eval_expr(expr: str, df: pd.DataFrame, extra: Optional[Mapping[str, Any]]) -> Any:
+    code, names = compile_expr(expr)
+    env = _compiled_env(df, names, extra)
+    try:
+        return eval(code, env, env)
     except NameError as exc:
         m = re.search(r"name '([^']+)' is not defined", str(exc))
         if m:
@@ -160,6 +231,166 @@ def eval_expr(expr: str, df: pd.DataFrame, extra: Optional[Mapping[str, Any]] =
         raise
 
 
+_FRAME_ATTRS: FrozenSet[str] = frozenset(dir(pd.DataFrame))
+
+
+def _const_strs(node: ast.AST) -> Optional[List[str]]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple)):
+        out: List[str] = []
+        for elt in node.elts:
+            if not (isinstance(elt, ast.Constant) and isinstance(elt.value, str)):
+                return None
+            out.append(elt.value)
+        return out
+    return None
+
+
+def _is_df(node: ast.AST) -> bool:
+    return isinstance(node, ast.Name) and node.id == "df"
+
+
+@lru_cache(maxsize=4096)
+def referenced_columns(expr: str) -> Optional[FrozenSet[str]]:
+    """
+    Column names an expression can read, or None when it uses the frame as a whole
+    (df.apply(..., axis=1), df.columns, df[some_var], df.iloc[...], ...).
+
+    Bare identifiers are included as-is (they resolve to columns when one exists), so the result
+    is a superset; names that are not columns are harmless to callers.
+    """
+    try:
+        tree = ast.parse(_rewrite_backtick_columns(expr), mode="eval")
+    except SyntaxError:
+        return None
+    cols: Set[str] = set()
+
+    def visit(node: ast.AST) -> bool:
+        if isinstance(node, ast.Subscript) and _is_df(node.value):
+            names = _const_strs(node.slice)
+            if names is None:
+                return False
+            cols.update(names)
+            return True
+        if (
+            isinstance(node, ast.Subscript)
+            and isinstance(node.value, ast.Attribute)
+            and _is_df(node.value.value)
+            and node.value.attr == "loc"
+        ):
+            sl = node.slice
+            if not (isinstance(sl, ast.Tuple) and len(sl.elts) == 2):
+                return False
+            names = _const_strs(sl.elts[1])
+            if names is None:
+                return False
+            cols.update(names)
+            return visit(sl.elts[0])
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and _is_df(node.func.value):
+            key = node.args[0] if node.func.attr == "get" and node.args else None
+            if not (isinstance(key, ast.Constant) and isinstance(key.value, str)):
+                return False
+            cols.add(key.value)
+            return all(visit(a) for a in node.args[1:]) and all(visit(k.value) for k in node.keywords)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "len":
+            if len(node.args) == 1 and _is_df(node.args[0]):
+                return True
+        if isinstance(node, ast.Attribute) and _is_df(node.value):
+            if node.attr == "index":
+                return True
+            if node.attr in _FRAME_ATTRS:
+                return False
+            cols.add(node.attr)
+            return True
+        if isinstance(node, ast.Name):
+            if node.id == "df":
+                return False
+            cols.add(node.id)
+            return True
+        return all(visit(child) for child in ast.iter_child_nodes(node))
+
+    if not visit(tree):
+        return None
+    return frozenset(cols)
+
+
+# Series methods whose per-row result depends only on that row's values.
+_ROWWISE_METHODS: FrozenSet[str] = frozenset(
+    {"isna", "notna", "isnull", "notnull", "isin", "between", "abs", "round", "fillna", "astype", "clip", "eq", "ne", "lt", "le", "gt", "ge"}
+)
+# The subset that cannot raise whatever the values are.
+_TOTAL_METHODS: FrozenSet[str] = frozenset({"isna", "notna", "isnull", "notnull", "isin", "eq", "ne"})
+_ROWWISE_FUNCS: FrozenSet[Tuple[str, str]] = frozenset(
+    {("pd", "isna"), ("pd", "notna"), ("pd", "to_datetime"), ("pd", "to_numeric")}
+)
+
+
+@lru_cache(maxsize=4096)
+def is_rowwise_expr(expr: str, total: bool = False) -> bool:
+    """
+    True when each row's value depends only on that row (no len(df), aggregates, shifts, __row_pos
+    or index labels), so the expression gives the same answer before rows are split, merged or dropped.
+    pd.to_datetime counts only with an explicit format. With total=True it must also be unable to raise: only ==, !=, &, |, ~, isin and null checks.
+    """
+    try:
+        tree = ast.parse(_rewrite_backtick_columns(expr), mode="eval")
+    except SyntaxError:
+        return False
+
+    def args_ok(call: ast.Call) -> bool:
+        if any(k.arg in {None, "method"} for k in call.keywords):
+            return False
+        return all(value(a) for a in call.args) and all(value(k.value) for k in call.keywords)
+
+    def value(node: ast.AST) -> bool:
+        if isinstance(node, ast.Constant):
+            return True
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return all(isinstance(e, ast.Constant) for e in node.elts)
+        if isinstance(node, ast.Name):
+            return node.id not in _EXPR_RESERVED
+        if isinstance(node, ast.Subscript) and _is_df(node.value):
+            return isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str)
+        if isinstance(node, ast.Attribute) and _is_df(node.value):
+            return node.attr not in _FRAME_ATTRS
+        if isinstance(node, ast.UnaryOp):
+            return (not total or isinstance(node.op, (ast.Not, ast.Invert))) and value(node.operand)
+        if isinstance(node, ast.BinOp):
+            return (not total or isinstance(node.op, (ast.BitAnd, ast.BitOr, ast.BitXor))) and value(node.left) and value(node.right)
+        if isinstance(node, ast.Compare):
+            allowed = (ast.Eq, ast.NotEq) if total else (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+            return all(isinstance(op, allowed) for op in node.ops) and value(node.left) and all(value(c) for c in node.comparators)
+        if total:
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in _TOTAL_METHODS:
+                return value(node.func.value) and args_ok(node)
+            return False
+        if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Attribute) and node.value.attr == "dt":
+            return value(node.value.value)
+        if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Attribute) and node.value.attr == "str":
+            sl = node.slice
+            parts = [sl.lower, sl.upper, sl.step] if isinstance(sl, ast.Slice) else [sl]
+            return value(node.value.value) and all(p is None or isinstance(p, ast.Constant) for p in parts)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            func = node.func
+            if isinstance(func.value, ast.Attribute) and func.value.attr in {"str", "dt"}:
+                # str.cat without others reduces the column to one string.
+                return func.attr != "cat" and value(func.value.value) and args_ok(node)
+            if isinstance(func.value, ast.Name) and (func.value.id, func.attr) in _ROWWISE_FUNCS:
+                # Without a format, to_datetime infers one from the first value it sees.
+                if func.attr == "to_datetime" and not any(
+                    k.arg == "format" and isinstance(k.value, ast.Constant) and isinstance(k.value.value, str)
+                    for k in node.keywords
+                ):
+                    return False
+                return args_ok(node)
+            if func.attr in _ROWWISE_METHODS:
+                return value(func.value) and args_ok(node)
+        return False
+
+    return value(tree.body)
+
+
 def exec_code(code: str, env: MutableMapping[str, Any], *, filename: str = "<py2flow:exec>", allow_imports: Optional[Set[str]] = None) -> None:
     env.setdefault("pd", pd)
     env.setdefault("np", np)
@@ -167,3 +398,25 @@ def exec_code(code: str, env: MutableMapping[str, Any], *, filename: str = "<py2
     env.setdefault("__builtins__", safe_builtins(allow_imports=allow_imports))
     compiled = compile(code, filename, "exec")
     exec(compiled, env, env)
+
+
+@lru_cache(maxsize=4096)
+def parse_expr(expr: str) -> Optional[ast.AST]:
+    """Body of an expression's AST after backtick columns are rewritten, or None on a syntax error."""
+    try:
+        return ast.parse(_rewrite_backtick_columns(expr), mode="eval").body
+    except SyntaxError:
+        return None
+
+
+def column_ref(node: ast.AST, names: Collection[str]) -> Optional[str]:
+    """Column among names that node reads as a whole: a bare name, df['x'] or df.x; else None."""
+    if isinstance(node, ast.Name):
+        ok = node.id not in _EXPR_RESERVED and _is_safe_identifier(node.id)
+        return node.id if ok and node.id in names else None
+    if isinstance(node, ast.Subscript) and _is_df(node.value):
+        sl = node.slice
+        return sl.value if isinstance(sl, ast.Constant) and isinstance(sl.value, str) and sl.value in names else None
+    if isinstance(node, ast.Attribute) and _is_df(node.value):
+        return node.attr if node.attr not in _FRAME_ATTRS and node.attr in names else None
+    return None
@@ -6,7 +6,7 @@ import pandas as pd
 
 from py2flow.errors import FlowExecutionError
 from py2flow.ir import StepKind
-from .base import Operator, ExecutionContext
+from .base import Operator, ExecutionContext, defensive_copy
 from .expr import eval_expr
 
 
@@ -64,4 +64,4 @@ class Filter(Operator):
 
         if null_as_false:
             mask = mask.fillna(False)
-        return df[mask.astype(bool)].copy()
+        return defensive_copy(df[mask.astype(bool)])
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from typing import Any, Mapping, List
 
+import numpy as np
 import pandas as pd
 
-from .base import Operator, ExecutionContext
+from .base import Operator, ExecutionContext, columnar_io
 
 
 class Input(Operator):
@@ -33,8 +34,14 @@ class Input(Operator):
             raise ValueError("input requires params.path")
         resolved = ctx.resolve_path(path)
         mode = params.get("mode", "csv")
-        if mode not in {"csv", "line"}:
-            raise ValueError("input params.mode must be csv|line")
+        if mode not in {"csv", "line", "parquet", "feather"}:
+            raise ValueError("input params.mode must be csv|line|parquet|feather")
+        if mode in {"parquet", "feather"}:
+            usecols = params.get("usecols")
+            if usecols is not None and (not isinstance(usecols, list) or not all(isinstance(x, str) and x for x in usecols)):
+                raise ValueError("input params.usecols must be list[string]")
+            # Columnar files carry their own types; the default FileIO hands them to ArrowIO (pyarrow).
+            return columnar_io(ctx.io).read_df(resolved, mode, {"columns": usecols} if usecols is not None else {})
 
         encoding = params.get("encoding", "utf-8")
         encodings: list[str]
@@ -71,33 +78,14 @@ class Input(Operator):
                 lines = lines[skiprows:]
             return pd.DataFrame({"raw": pd.Series(lines, dtype="string")})
 
-        options_base: dict[str, Any] = {}
-        options_base["sep"] = params.get("delimiter", ",")
-        if "na_values" in params:
-            options_base["na_values"] = params.get("na_values")
-        if "keep_default_na" in params:
-            options_base["keep_default_na"] = params.get("keep_default_na")
-        if "parse_dates" in params:
-            options_base["parse_dates"] = params.get("parse_dates")
-        if "dtype" in params:
-            options_base["dtype"] = params.get("dtype")
-        if "skiprows" in params:
-            options_base["skiprows"] = skiprows
-        if "header" in params:
-            options_base["header"] = params.get("header")
-        if "on_bad_lines" in params:
-            options_base["on_bad_lines"] = params.get("on_bad_lines")
-        if "quotechar" in params:
-            options_base["quotechar"] = params.get("quotechar")
-        if "escapechar" in params:
-            options_base["escapechar"] = params.get("escapechar")
+        usecols = params.get("usecols")
+        if usecols is not None and (not isinstance(usecols, list) or not all(isinstance(x, str) and x for x in usecols)):
+            raise ValueError("input params.usecols must be list[string]")
 
         last_exc: BaseException | None = None
         for enc in encodings:
-            options = dict(options_base)
-            options["encoding"] = enc
             try:
-                return ctx.io.read_df(resolved, "csv", options)
+                return ctx.io.read_df(resolved, "csv", csv_read_options(params, resolved, enc, ctx))
             except Exception as exc:
                 last_exc = exc
                 ctx.logger.warning(
@@ -108,3 +96,109 @@ class Input(Operator):
                     exc,
                 )
         raise ValueError(f"input csv read failed for encodings={encodings}: {last_exc}")
+
+
+def csv_read_options(params: Mapping[str, Any], resolved: Any, encoding: str, ctx: ExecutionContext) -> dict[str, Any]:
+    """read_csv keyword arguments for one encoding attempt of a csv input node."""
+    options: dict[str, Any] = {}
+    options["sep"] = params.get("delimiter", ",")
+    if "na_values" in params:
+        options["na_values"] = params.get("na_values")
+    if "keep_default_na" in params:
+        options["keep_default_na"] = params.get("keep_default_na")
+    if "parse_dates" in params:
+        options["parse_dates"] = params.get("parse_dates")
+    if "dtype" in params:
+        options["dtype"] = params.get("dtype")
+    if "skiprows" in params:
+        options["skiprows"] = params.get("skiprows", 0)
+    if "header" in params:
+        options["header"] = params.get("header")
+    if "on_bad_lines" in params:
+        options["on_bad_lines"] = params.get("on_bad_lines")
+    if "quotechar" in params:
+        options["quotechar"] = params.get("quotechar")
+    if "escapechar" in params:
+        options["escapechar"] = params.get("escapechar")
+    options["encoding"] = encoding
+    usecols = params.get("usecols")
+    if usecols is not None:
+        positions = _usecols_positions(resolved, options, usecols, params, ctx)
+        if positions is not None:
+            options["usecols"] = positions
+    return options
+
+
+def _usecols_positions(
+    resolved: Any,
+    options: Mapping[str, Any],
+    usecols: List[str],
+    params: Mapping[str, Any],
+    ctx: ExecutionContext,
+) -> List[int] | None:
+    """
+    Map usecols names to header positions so duplicate headers keep their mangled names
+    ("a", "a.1") and names missing from the file are ignored. None means read every column.
+    """
+    probe_options = {k: v for k, v in options.items() if k not in {"dtype", "parse_dates"}}
+    probe_options["nrows"] = 1
+    header = ctx.io.read_df(resolved, "csv", probe_options)
+    if not isinstance(header.index, pd.RangeIndex):
+        # Rows wider than the header become an implicit index; positions would shift.
+        return None
+    if options.get("on_bad_lines", "error") == "error" and not _no_wide_rows(resolved, options, len(header.columns)):
+        # With usecols pandas stops checking row width: a row the full read rejects would be read.
+        return None
+    wanted = set(usecols)
+    parse_dates = params.get("parse_dates")
+    if isinstance(parse_dates, list):
+        wanted.update(x for x in parse_dates if isinstance(x, str))
+    positions = [i for i, c in enumerate(header.columns) if c in wanted]
+    if len(positions) == len(header.columns):
+        return None
+    return positions or [0]
+
+
+_SCAN_BYTES = 1 << 24
+
+
+def _no_wide_rows(resolved: Any, options: Mapping[str, Any], width: int) -> bool:
+    """
+    Whether no line of the file has more than width fields, proven by counting delimiters per line.
+    Only files without quote or escape characters, with a one-character delimiter and an
+    ASCII-compatible encoding can be proven; anything else counts as possibly wide.
+    """
+    sep = options.get("sep", ",")
+    quote = options.get("quotechar") or '"'
+    escape = options.get("escapechar")
+    if not isinstance(sep, str) or len(sep) != 1:
+        return False
+    special = sep + "\n" + quote + (escape or "")
+    try:
+        if special.encode(options.get("encoding") or "utf-8") != special.encode("ascii"):
+            return False
+    except (LookupError, UnicodeError):
+        return False
+    sep_b = ord(sep)
+    forbidden = [quote.encode("ascii")] + ([escape.encode("ascii")] if escape else [])
+    carry = 0  # delimiters on the line that continues into the next block
+    with open(resolved, "rb") as fh:
+        while True:
+            block = fh.read(_SCAN_BYTES)
+            if not block:
+                return carry < width
+            if any(ch in block for ch in forbidden):
+                return False
+            arr = np.frombuffer(block, dtype=np.uint8)
+            seps = np.flatnonzero(arr == sep_b)
+            ends = np.flatnonzero(arr == 10)
+            if ends.size == 0:
+                carry += len(seps)
+            else:
+                per_line = np.diff(np.searchsorted(seps, ends), prepend=0)
+                per_line[0] += carry
+                if int(per_line.max()) >= width:
+                    return False
+                carry = len(seps) - int(np.searchsorted(seps, ends[-1]))
+            if carry >= width:
+                return False
@@ -3,11 +3,14 @@ from __future__ import annotations
 from typing import Any, Mapping, List, Dict, Optional, Tuple, Set
 from uuid import uuid4
 
+import numpy as np
 import pandas as pd
+from pandas.api.extensions import ExtensionDtype
+from pandas.core.dtypes.cast import find_common_type, maybe_box_native
 
 from py2flow.errors import FlowExecutionError, FlowValidationError
 from py2flow.ir import StepKind
-from .base import Operator, ExecutionContext
+from .base import Operator, ExecutionContext, defensive_copy
 
 
 class Join(Operator):
@@ -51,41 +54,7 @@ class Join(Operator):
                 raise ValueError("join fuzzy_match requires single key on each side")
             if how not in {"left", "inner"}:
                 raise ValueError("join fuzzy_match only supports left or inner join")
-            # Perform fuzzy substring matching
-            left_key = left_keys[0]
-            right_key = right_keys[0]
-            left2 = left_df.copy()
-            right2 = right_df.copy()
-            # For each left row, find the best match in right
-            matched = []
-            for idx, left_row in left2.iterrows():
-                left_val = str(left_row[left_key]).strip().lower() if pd.notna(left_row[left_key]) else ""
-                if not left_val:
-                    matched.append(None)
-                    continue
-                best_match = None
-                best_len = 0
-                for right_idx, right_row in right2.iterrows():
-                    right_val = str(right_row[right_key]).strip().lower() if pd.notna(right_row[right_key]) else ""
-                    if left_val in right_val and len(left_val) > best_len:
-                        best_match = right_idx
-                        best_len = len(left_val)
-                matched.append(best_match)
-            # Create result by joining matched rows
-            result_rows = []
-            for left_idx, right_idx in enumerate(matched):
-                left_row = left2.iloc[left_idx].to_dict()
-                if right_idx is not None:
-                    right_row = right2.iloc[right_idx].to_dict()
-                    # Merge: right values override left values for same keys
-                    merged_row = {**left_row, **right_row}
-                else:
-                    merged_row = left_row.copy()
-                    for col in right2.columns:
-                        if col not in merged_row:
-                            merged_row[col] = pd.NA
-                result_rows.append(merged_row)
-            result_df = pd.DataFrame(result_rows)
+            result_df = _fuzzy_join(left_df, right_df, left_keys[0], right_keys[0])
             if select_left is not None or select_right is not None:
                 left_sel = _expand_select(select_left, left_df.columns)
                 right_sel = _expand_select(select_right, right_df.columns)
@@ -130,7 +99,7 @@ class Join(Operator):
                 how=how,
             )
 
-        left2, right2, sentinels = _apply_null_inequality(left_df, right_df, left_keys, right_keys, null_equal, node_id)
+        left2, right2, sentinels = _apply_null_inequality(left_df, right_df, left_keys, right_keys, null_equal, how, node_id)
 
         merge_kwargs: Dict[str, Any] = {"how": "outer" if how == "full" else how, "suffixes": suffixes_t}
         if on is not None:
@@ -138,8 +107,23 @@ class Join(Operator):
         else:
             merge_kwargs["left_on"] = left_keys
             merge_kwargs["right_on"] = right_keys
+        # An inner merge that no longer sees the null-key rows may order its rows differently; keep
+        # them in left order (then right order), as when every row took part.
+        positions: Optional[Tuple[str, str]] = None
+        if how == "inner" and (left2 is not left_df or right2 is not right_df):
+            token = uuid4().hex
+            positions = (f"__py2flow_left_pos_{token}", f"__py2flow_right_pos_{token}")
+            left2 = left2.copy(deep=False)
+            left2[positions[0]] = np.arange(len(left2))
+            right2 = right2.copy(deep=False)
+            right2[positions[1]] = np.arange(len(right2))
         merged = left2.merge(right2, **merge_kwargs)
         merged = _restore_nulls(merged, left_keys, right_keys, sentinels)
+        if positions is not None:
+            order = np.lexsort((merged[positions[1]].to_numpy(), merged[positions[0]].to_numpy()))
+            if (order[1:] < order[:-1]).any():
+                merged = merged.take(order).reset_index(drop=True)
+            merged = merged.drop(columns=list(positions))
         if validate_tag is not None:
             error_col, marker, left_viol, right_viol = validate_tag
             merged[error_col] = pd.NA
@@ -165,7 +149,113 @@ class Join(Operator):
             error_col = validate_tag[0]
             if error_col not in out_cols:
                 out_cols.append(error_col)
-        return merged[out_cols].copy()
+        return defensive_copy(merged[out_cols])
+
+
+def _fuzzy_key(value: Any) -> str:
+    return str(value).strip().lower() if pd.notna(value) else ""
+
+
+def _first_containing(patterns: List[str], texts: List[str]) -> Dict[str, int]:
+    """
+    Position of the first text containing each non-empty pattern (patterns never found are absent).
+    One Aho-Corasick pass over the texts instead of testing every pattern against every text.
+    """
+    goto: List[Dict[str, int]] = [{}]
+    terminal: List[Optional[str]] = [None]
+    for pattern in patterns:
+        state = 0
+        for ch in pattern:
+            nxt = goto[state].get(ch)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][ch] = nxt
+                goto.append({})
+                terminal.append(None)
+            state = nxt
+        terminal[state] = pattern
+    fail = [0] * len(goto)
+    # Nearest proper suffix state that ends a pattern, so matches are enumerated without walking every fail link.
+    out_link = [0] * len(goto)
+    queue = list(goto[0].values())
+    for state in queue:
+        for ch, nxt in goto[state].items():
+            f = fail[state]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            fail[nxt] = goto[f].get(ch, 0) if goto[f].get(ch) != nxt else 0
+            out_link[nxt] = fail[nxt] if terminal[fail[nxt]] is not None else out_link[fail[nxt]]
+            queue.append(nxt)
+
+    first: Dict[str, int] = {}
+    remaining = sum(1 for t in terminal if t is not None)
+    for pos, text in enumerate(texts):
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = state if terminal[state] is not None else out_link[state]
+            while hit:
+                pattern = terminal[hit]
+                if pattern not in first:
+                    first[pattern] = pos
+                    remaining -= 1
+                hit = out_link[hit]
+        if not remaining:
+            break
+    return first
+
+
+def _fuzzy_join(left: pd.DataFrame, right: pd.DataFrame, left_key: str, right_key: str) -> pd.DataFrame:
+    """
+    Each left row takes the first right row whose normalised key contains its own normalised key
+    (str, stripped, lower-cased); right values override shared columns, unmatched rows get pd.NA.
+    """
+    left_vals = [_fuzzy_key(v) for v in left[left_key].tolist()]
+    right_vals = [_fuzzy_key(v) for v in right[right_key].tolist()]
+    first = _first_containing(sorted({v for v in left_vals if v}), right_vals)
+    pos = np.array([first.get(v, -1) if v else -1 for v in left_vals], dtype=np.int64)
+    matched = pos >= 0
+
+    left_cols = [str(c) for c in left.columns]
+    right_cols = [str(c) for c in right.columns]
+    columns = left_cols + [c for c in right_cols if c not in set(left_cols)]
+    # Row-wise values as the old record-by-record build saw them, so the per-column dtype inference
+    # below gives the same result.
+    left_arr = _row_values(left)
+    right_arr = _row_values(right)[pos[matched]]
+    out = np.empty((len(left), len(columns)), dtype=object)
+    for j, col in enumerate(columns):
+        if col in left_cols:
+            out[:, j] = left_arr[:, left_cols.index(col)]
+        else:
+            out[:, j] = pd.NA
+        if col in right_cols:
+            out[matched, j] = right_arr[:, right_cols.index(col)]
+    return pd.DataFrame(out.tolist(), columns=columns)
+
+
+def _row_values(df: pd.DataFrame) -> np.ndarray:
+    """
+    Cells as df.iloc[row].to_dict() returns them: each row cast to the frame's common dtype, and
+    values of object or extension rows boxed to Python scalars (pd.NA becomes None).
+    """
+    out = np.empty(df.shape, dtype=object)
+    if not df.shape[1]:
+        return out
+    common = find_common_type(list(df.dtypes))
+    boxed = common == object or isinstance(common, ExtensionDtype)
+    for j in range(df.shape[1]):
+        col = df.iloc[:, j]
+        if isinstance(common, ExtensionDtype):
+            values = list(col.astype(common))
+        elif boxed:
+            values = list(col.array) if isinstance(col.dtype, ExtensionDtype) else col.to_numpy(dtype=object)
+        else:
+            values = col.to_numpy(dtype=common)
+        out[:, j] = [maybe_box_native(v) for v in values] if boxed else values
+    return out
 
 
 def _normalize_keys(value: Any) -> Optional[List[str]]:
@@ -184,12 +274,43 @@ def _apply_null_inequality(
     left_keys: List[str],
     right_keys: List[str],
     null_equal: bool,
+    how: str,
     node_id: str,
 ) -> tuple[pd.DataFrame, pd.DataFrame, List[Tuple[str, str]]]:
+    """
+    Frames to merge so that, without null_equal, a row with a null key matches nothing.
+
+    pandas merge pairs nulls with nulls, and a null can only meet a null, so it is enough that one
+    side keeps no null-key rows: the side whose unmatched rows are dropped anyway loses them, and key
+    dtypes stay as they are. Full joins with null keys (whose output pandas sorts by key) and key pairs
+    of different dtypes that are not both numeric (whose merge compatibility depends on the sentinels)
+    still swap nulls for per-side string sentinels; _restore_nulls undoes them.
+    """
     if null_equal:
-        return left.copy(), right.copy(), []
-    left2 = left.copy()
-    right2 = right.copy()
+        return left, right, []
+    left_nulls = [left[k].isna().to_numpy() for k in left_keys]
+    right_nulls = [right[k].isna().to_numpy() for k in right_keys]
+    left_null = np.logical_or.reduce(left_nulls) if left_keys else np.zeros(len(left), dtype=bool)
+    right_null = np.logical_or.reduce(right_nulls) if right_keys else np.zeros(len(right), dtype=bool)
+    if not left_null.any() and not right_null.any():
+        return left, right, []
+    # With sentinels, a key column holding nulls becomes object; keep them wherever that decides
+    # whether pandas can merge the pair at all.
+    merges_alike = all(
+        not (ln.any() or rn.any()) or _same_key_kind(left[lk].dtype, right[rk].dtype)
+        for lk, rk, ln, rn in zip(left_keys, right_keys, left_nulls, right_nulls)
+    )
+    if how != "full" and merges_alike:
+        if how == "inner":
+            # Null keys reach neither side of the result, so both sides drop them.
+            return (left.loc[~left_null] if left_null.any() else left), (right.loc[~right_null] if right_null.any() else right), []
+        if not left_null.any() or not right_null.any():
+            return left, right, []
+        if how == "right":
+            return left.loc[~left_null], right, []
+        return left, right.loc[~right_null], []
+    left2 = defensive_copy(left)
+    right2 = defensive_copy(right)
     sentinels: List[Tuple[str, str]] = []
     token = uuid4().hex
     for idx, (lk, rk) in enumerate(zip(left_keys, right_keys)):
@@ -201,6 +322,12 @@ def _apply_null_inequality(
     return left2, right2, sentinels
 
 
+def _same_key_kind(left: Any, right: Any) -> bool:
+    numeric = pd.api.types.is_numeric_dtype
+    is_bool = pd.api.types.is_bool_dtype
+    return left == right or (numeric(left) and numeric(right) and not is_bool(left) and not is_bool(right))
+
+
 def _make_null_sentinel(side: str, token: str, node_id: str, idx: int) -> str:
     if side not in {"L", "R"}:
         raise ValueError("side must be L or R")
@@ -294,16 +421,16 @@ def _semi_anti(
     null_equal: bool,
     how: str,
 ) -> pd.DataFrame:
-    left2, right2, _ = _apply_null_inequality(left, right, left_keys, right_keys, null_equal, node_id="semi_anti")
+    left2, right2, _ = _apply_null_inequality(left, right, left_keys, right_keys, null_equal, "left", node_id="semi_anti")
     right_keys_df = right2[right_keys].drop_duplicates()
     if left_keys != right_keys:
         right_keys_df = right_keys_df.rename(columns={rk: lk for lk, rk in zip(left_keys, right_keys)})
-    marker = left2.merge(right_keys_df, how="left", on=left_keys, indicator=True)["_merge"]
+    marker = left2[left_keys].merge(right_keys_df, how="left", on=left_keys, indicator=True)["_merge"]
     if how == "semi":
         mask = marker == "both"
     else:
         mask = marker == "left_only"
-    return left.loc[mask.values].copy()
+    return defensive_copy(left.loc[mask.values])
 
 
 
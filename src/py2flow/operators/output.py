@@ -4,7 +4,7 @@ from typing import Any, Mapping, List
 
 import pandas as pd
 
-from .base import Operator, ExecutionContext
+from .base import Operator, ExecutionContext, columnar_io, defensive_copy
 
 
 def _format_datetime_series(series: pd.Series, fmt: str) -> pd.Series:
@@ -50,7 +50,7 @@ class Output(Operator):
 
         datetime_format = params.get("datetime_format")
         if isinstance(datetime_format, Mapping) and datetime_format:
-            out = out.copy()
+            out = defensive_copy(out)
             for col, fmt in datetime_format.items():
                 if not isinstance(col, str) or not isinstance(fmt, str) or not col or not fmt:
                     raise ValueError("output.datetime_format must be a mapping of non-empty string->string")
@@ -59,6 +59,12 @@ class Output(Operator):
                 out[col] = _format_datetime_series(out[col], fmt)
 
         resolved = ctx.resolve_path(path)
+        fmt = params.get("format", "csv") or "csv"
+        if fmt not in {"csv", "parquet", "feather"}:
+            raise ValueError("output.format must be csv|parquet|feather")
+        if fmt != "csv":
+            columnar_io(ctx.io).write_df(out, resolved, fmt, {})
+            return out
         options: dict[str, Any] = {"index": False}
         encoding = params.get("encoding")
         if encoding is not None:
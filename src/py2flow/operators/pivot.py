@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Mapping, List, Callable
+from typing import Any, Mapping, List, Callable, Optional
 
 import pandas as pd
 import numpy as np
@@ -89,55 +89,9 @@ class Pivot(Operator):
 
             table = df.fillna("").astype(str).apply(
                 lambda col: col.str.strip())
-            key_set = set(row_key_pattern)
-            marker_rows = table.index[table.apply(
-                lambda r: r.isin(key_set).any(), axis=1)]
-            if marker_rows.empty:
+            result = _longer_from_rows(table, row_key_pattern, column_pattern, names_to, data_offset, drop_contains)
+            if result is None:
                 return pd.DataFrame(columns=[names_to, *column_pattern])
-
-            blocks: list[pd.DataFrame] = []
-            for idx, start in enumerate(marker_rows):
-                end = marker_rows[idx + 1] if idx + \
-                    1 < len(marker_rows) else len(table)
-                marker_row = table.iloc[start]
-                data = table.iloc[start + data_offset: end]
-                if data.empty:
-                    continue
-                if drop_contains:
-                    data = data[~data.apply(lambda r: any(
-                        tok in " ".join(r) for tok in drop_contains), axis=1)]
-                data = data[(data != "").any(axis=1)]
-                if data.empty:
-                    continue
-
-                key_positions = np.where(marker_row.isin(key_set))[0]
-                if key_positions.size == 0:
-                    continue
-
-                col_indices: list[int] = []
-                col_keys: list[str] = []
-                col_fields: list[str] = []
-                for pos in key_positions:
-                    key_val = marker_row.iloc[pos]
-                    for offset, field in enumerate(column_pattern):
-                        col_idx = pos + offset
-                        if col_idx < table.shape[1]:
-                            col_indices.append(col_idx)
-                            col_keys.append(key_val)
-                            col_fields.append(field)
-                if not col_indices:
-                    continue
-
-                block = data.iloc[:, col_indices].copy()
-                block.columns = pd.MultiIndex.from_arrays(
-                    [col_keys, col_fields])
-                stacked = block.stack(level=0, future_stack=True).reset_index()
-                stacked = stacked.rename(
-                    columns={"level_0": "row_id", "level_1": names_to})
-                blocks.append(stacked[[names_to, *column_pattern]])
-
-            result = pd.concat(blocks, ignore_index=True) if blocks else pd.DataFrame(
-                columns=[names_to, *column_pattern])
             for col in numeric_fields:
                 if col in result.columns:
                     result = result[result[col].str.isdigit()]
@@ -198,19 +152,15 @@ class Pivot(Operator):
             # Calculate number of pairs, accounting for skipped columns
             available_cols = num_cols - skip_cols
             num_pairs = (available_cols + pair_size - 1) // pair_size if available_cols > 0 else 0
+            data_length = len(df) - key_row - 1
 
-            # Extract id columns if specified
-            id_data = None
-            if id_cols:
-                id_data = df.iloc[key_row + 1:, [df.columns.get_loc(col) for col in id_cols]].reset_index(drop=True)
-
-            records = []
+            key_positions: list[int] = []
+            keys: list[str] = []
             for pair_idx in range(num_pairs):
                 # Calculate column index accounting for skipped columns
                 key_col_idx = skip_cols + pair_idx * pair_size + key_col_offset
                 if key_col_idx >= num_cols:
                     continue
-
                 key_val = key_row_data.iloc[key_col_idx]
                 if skip_empty_keys:
                     if pd.isna(key_val) or (isinstance(key_val, str) and not key_val.strip()):
@@ -218,55 +168,135 @@ class Pivot(Operator):
                     key_val = str(key_val).strip()
                 else:
                     key_val = str(key_val) if not pd.isna(key_val) else ""
+                key_positions.append(key_col_idx)
+                keys.append(key_val)
 
-                # Extract value columns for this pair
-                # For case_167: value is in the same column as key (col 0), selection is in col+1
-                pair_data = {}
-                data_length = len(df) - key_row - 1
-                for val_idx, val_col_name in enumerate(value_cols):
-                    if val_idx == 0:
-                        # First value column is in the same column as key
-                        val_col_idx = skip_cols + pair_idx * pair_size + key_col_offset
-                    else:
-                        # Subsequent value columns are offset from key column
-                        val_col_idx = skip_cols + pair_idx * pair_size + key_col_offset + val_idx
-                    if val_col_idx >= num_cols:
-                        pair_data[val_col_name] = pd.Series(
-                            [pd.NA] * data_length, dtype=object)
-                    else:
-                        pair_data[val_col_name] = df.iloc[key_row +
-                                                          1:, val_col_idx].reset_index(drop=True).values
-
-                # Create DataFrame for this pair with consistent length
-                if data_length <= 0:
-                    continue
-                pair_df = pd.DataFrame(pair_data)
-                pair_df[key_col] = key_val
-                
-                # Add id columns if specified
-                if id_cols and id_data is not None:
-                    # Ensure id_data length matches pair_df length
-                    if len(id_data) != len(pair_df):
-                        raise ValueError(
-                            f"pivot_longer_paired: id_data length ({len(id_data)}) does not match pair data length ({len(pair_df)})")
-                    for col in id_cols:
-                        pair_df[col] = id_data[col].values
-                
-                records.append(pair_df)
-
-            if not records:
-                result_cols = [key_col, *value_cols]
-                if id_cols:
-                    result_cols = [*id_cols, *result_cols]
-                return pd.DataFrame(columns=result_cols)
-
-            result = pd.concat(records, ignore_index=True)
-            # Reorder columns: id_cols first (if any), then key_col, then value_cols
             result_cols = [key_col, *value_cols]
             if id_cols:
                 result_cols = [*id_cols, *result_cols]
-            result = result[result_cols]
-            return result
+            if not keys or data_length <= 0:
+                return pd.DataFrame(columns=result_cols)
+
+            # Pairs stack one below the other: value i of a pair sits i columns right of its key.
+            data = df.iloc[key_row + 1:].reset_index(drop=True)
+            sources = {
+                val_col_name: [pos + val_idx if pos + val_idx < num_cols else -1 for pos in key_positions]
+                for val_idx, val_col_name in enumerate(value_cols)
+            }
+            if all(_plain_concat(data, cols) for cols in sources.values()):
+                columns: dict[str, Any] = {name: _stack_columns(data, cols) for name, cols in sources.items()}
+            else:
+                # Frame concatenation refills all-NA blocks and leaves them out of the result dtype,
+                # so concatenate the same per-pair frames as the values came in.
+                frames = []
+                for i, key_val in enumerate(keys):
+                    frame = pd.DataFrame({
+                        name: data.iloc[:, cols[i]].values if cols[i] >= 0 else pd.Series([pd.NA] * data_length, dtype=object)
+                        for name, cols in sources.items()
+                    })
+                    # Value columns named like the key or id columns were overwritten in each frame.
+                    if key_col in frame.columns:
+                        frame[key_col] = key_val
+                    for col in id_cols or []:
+                        if col in frame.columns:
+                            frame[col] = data[col].values
+                    frames.append(frame)
+                stacked = pd.concat(frames, ignore_index=True)
+                columns = {name: stacked[name] for name in sources}
+            columns[key_col] = np.repeat(np.array(keys, dtype=object), data_length)
+            if id_cols:
+                id_data = data.iloc[:, [df.columns.get_loc(col) for col in id_cols]]
+                repeat_rows = np.tile(np.arange(data_length), len(keys))
+                for col in id_cols:
+                    columns[col] = id_data[col].take(repeat_rows).values
+            result = pd.DataFrame(columns)
+            # Reorder columns: id_cols first (if any), then key_col, then value_cols
+            return result[result_cols]
 
         raise ValueError(
             "pivot requires mode pivot_wider|pivot_longer|pivot_longer_from_rows|pivot_longer_paired")
+
+
+def _longer_from_rows(table: pd.DataFrame, row_key_pattern: List[str], column_pattern: List[str], names_to: str,
+                      data_offset: int, drop_contains: List[str]) -> Optional[pd.DataFrame]:
+    """
+    One row per (data row, key) of every block: a block starts at a row holding a key, its data
+    starts data_offset rows later, and each key's fields are the cells right of (and at) the key.
+    None when no row holds a key.
+    """
+    empty = pd.DataFrame(columns=[names_to, *column_pattern])
+    values = table.to_numpy(dtype=object)
+    n_rows, width = values.shape
+    is_key = table.isin(list(set(row_key_pattern))).to_numpy()
+    markers = np.flatnonzero(is_key.any(axis=1))
+    if not len(markers):
+        return None
+
+    keep = (values != "").any(axis=1)
+    if drop_contains and n_rows:
+        # Tokens match the row's cells joined by spaces, so they may span cells.
+        text = values[:, 0]
+        for col in range(1, width):
+            text = text + " " + values[:, col]
+        text = pd.Series(text)
+        for tok in drop_contains:
+            keep &= ~text.str.contains(tok, regex=False).to_numpy(dtype=bool)
+    block_of = np.searchsorted(markers, np.arange(n_rows), side="right") - 1
+    starts = markers[np.maximum(block_of, 0)] + data_offset
+    data_rows = np.flatnonzero((block_of >= 0) & (np.arange(n_rows) >= starts) & keep)
+    if not len(data_rows):
+        return empty
+
+    # Key slots of each block, in column order; a key repeated within a block has duplicate columns.
+    slot_block, slot_pos = np.nonzero(is_key[markers])
+    slot_key = values[markers[slot_block], slot_pos]
+    n_slots = np.bincount(slot_block, minlength=len(markers))
+    slot_start = np.cumsum(n_slots) - n_slots
+    for block in np.unique(block_of[data_rows]):
+        block_slots = range(slot_start[block], slot_start[block] + n_slots[block])
+        present = [(slot_key[i], field) for i in block_slots for offset, field in enumerate(column_pattern) if slot_pos[i] + offset < width]
+        if len(set(present)) != len(present):
+            raise ValueError("Columns with duplicate values are not supported in stack")
+        missing = [field for field in column_pattern if field not in {f for _, f in present}]
+        if missing:
+            raise KeyError(f"{missing} not in index")
+
+    row_block = block_of[data_rows]
+    reps = n_slots[row_block]
+    total = int(reps.sum())
+    out_rows = np.repeat(data_rows, reps)
+    out_slots = np.repeat(slot_start[row_block], reps) + np.arange(total) - np.repeat(np.cumsum(reps) - reps, reps)
+    # A field listed twice reads from whichever of its offsets lies inside the table (at most one does).
+    fields: dict[str, np.ndarray] = {}
+    for offset, field in enumerate(column_pattern):
+        cols = slot_pos[out_slots] + offset
+        inside = cols < width
+        field_values = fields.setdefault(field, np.full(total, np.nan, dtype=object))
+        field_values[inside] = values[out_rows[inside], cols[inside]]
+    result = pd.DataFrame([slot_key[out_slots], *(fields[field] for field in column_pattern)]).T
+    result.columns = [names_to, *column_pattern]
+    return result
+
+
+def _plain_concat(data: pd.DataFrame, cols: List[int]) -> bool:
+    """
+    Whether stacking these columns (-1: all-NA filler) as Series gives what concatenating them
+    inside frames would: one dtype, and no all-NA object column.
+    """
+    if min(cols) < 0:
+        return False
+    dtypes = data.dtypes.iloc[cols]
+    if not (dtypes == dtypes.iloc[0]).all():
+        return False
+    if dtypes.iloc[0] != object:
+        return True
+    # Only columns starting with a null can be all-NA.
+    maybe_empty = [col for col in cols if pd.isna(data.iat[0, col])]
+    return not maybe_empty or not data.iloc[:, maybe_empty].isna().all().any()
+
+
+def _stack_columns(data: pd.DataFrame, cols: List[int]) -> pd.Series:
+    """The given same-dtype columns one below the other."""
+    if isinstance(data.dtypes.iloc[cols[0]], np.dtype):
+        return pd.Series(data.iloc[:, cols].to_numpy().T.ravel())
+    return pd.concat([data.iloc[:, col] for col in cols], ignore_index=True)
@@ -2,14 +2,16 @@ from __future__ import annotations
 
 import re
 from datetime import datetime
-from typing import Any, Mapping, List, Optional, Tuple
+from itertools import compress
+from typing import Any, Dict, Mapping, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from py2flow.errors import FlowExecutionError
 from py2flow.ir import StepKind
-from .base import Operator, ExecutionContext
-from .expr import eval_expr
+from .base import Operator, ExecutionContext, defensive_copy
+from .expr import eval_expr, referenced_columns
 
 
 class Project(Operator):
@@ -18,7 +20,7 @@ class Project(Operator):
             raise ValueError("project expects 1 input")
 
         original_input_df = inputs[0]
-        df = original_input_df.copy()
+        df = defensive_copy(original_input_df)
         on_error = params.get("on_error", "error")
         if on_error not in {"keep", "null", "error", "tag"}:
             raise ValueError(
@@ -29,6 +31,11 @@ class Project(Operator):
                 raise ValueError(
                     "project on_error=tag requires params.error_cols list[str]")
 
+        # Tags are collected as row masks and written to the error column once, when a step is
+        # about to read or replace it, change the rows, or the node finishes.
+        pending_masks: List[np.ndarray] = []
+        pending_messages: List[str] = []
+
         def append_error(mask: pd.Series, message: str) -> None:
             if on_error != "tag":
                 return
@@ -36,12 +43,21 @@ class Project(Operator):
             if col not in df.columns:
                 df[col] = pd.Series(
                     [""] * len(df), index=df.index, dtype="string")
-            existing = df[col].astype("string")
-            add = pd.Series([""] * len(df), index=df.index, dtype="string")
-            add.loc[mask] = message
-            combined = existing.where(existing != "", add)
-            combined = combined.where(add == "", combined + ";" + add)
-            df[col] = combined
+            pending_masks.append(mask.to_numpy(dtype=bool))
+            pending_messages.append(message)
+
+        def flush_errors(names: Any = None, exprs: Any = ()) -> None:
+            """Render pending tags; with names/exprs, only if they mention the error column."""
+            if not pending_masks:
+                return
+            col = error_cols[0]
+            if names is not None and col not in names:
+                refs = [referenced_columns(e) for e in exprs if isinstance(e, str)]
+                if not any(r is None or col in r for r in refs):
+                    return
+            df[col] = _render_error_tags(df[col], pending_masks, pending_messages)
+            pending_masks.clear()
+            pending_messages.clear()
 
         def handle_exception(exc: BaseException, message: str, target_col: Optional[str] = None) -> None:
             if on_error == "error":
@@ -60,6 +76,7 @@ class Project(Operator):
             if on_error == "keep":
                 return
             if target_col is not None:
+                flush_errors([target_col])
                 df[target_col] = pd.NA
             if on_error == "tag":
                 append_error(
@@ -119,7 +136,7 @@ class Project(Operator):
                     message=f"project select missing columns: {missing}",
                     error_code="project_missing_columns",
                 )
-            df = df[cols].copy()
+            df = defensive_copy(df[cols])
 
         # rename
         rename = params.get("rename")
@@ -151,6 +168,7 @@ class Project(Operator):
                 expr = item.get("expr")
                 if not isinstance(as_col, str) or not as_col or not isinstance(expr, str) or not expr:
                     raise ValueError("project compute requires {as, expr}")
+                flush_errors([as_col], [expr])
                 try:
                     val = eval_expr(expr, df)
                     if isinstance(val, pd.Series):
@@ -186,6 +204,7 @@ class Project(Operator):
                         message=f"project cast missing column: {col}",
                         error_code="project_missing_columns",
                     )
+                flush_errors([col])
                 try:
                     converted, invalid_mask = _cast_series(
                         df[col], dtype, errors=str(errors))
@@ -221,6 +240,10 @@ class Project(Operator):
                         error_code="project_missing_columns",
                     )
                 when_expr = args.get("when")
+                if op_name in {"explode", "complete_calendar"}:
+                    flush_errors()
+                else:
+                    flush_errors(_mentioned_strings(op), [when_expr])
                 if when_expr is not None:
                     if not isinstance(when_expr, str) or not when_expr:
                         raise ValueError("map args.when must be a non-empty string")
@@ -308,6 +331,7 @@ class Project(Operator):
         if expand_cfg is not None:
             if not isinstance(expand_cfg, Mapping):
                 raise ValueError("project params.expand must be an object")
+            flush_errors()
             try:
                 # Pass original input df for to_value_expr evaluation (to access columns from upstream)
                 df = _apply_expand(
@@ -316,9 +340,46 @@ class Project(Operator):
                 handle_exception(
                     exc, f"project expand failed: {exc}", target_col=None)
 
+        flush_errors()
         return df
 
 
+def _mentioned_strings(value: Any) -> set:
+    """Every string inside a (nested) params value."""
+    if isinstance(value, str):
+        return {value}
+    if isinstance(value, Mapping):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        return set().union(*(_mentioned_strings(v) for v in value))
+    return set()
+
+
+def _render_error_tags(existing: pd.Series, masks: List[np.ndarray], messages: List[str]) -> pd.Series:
+    """
+    The error column after tagging each mask's rows with its message in turn: a tag is appended
+    as ";message", and the first tag on an empty (or null) cell is written as "message;message".
+    """
+    current = existing.astype("string").fillna("")
+    hit = np.logical_or.reduce(masks)
+    if not hit.any():
+        return current
+    # Rows hit by the same messages share a pattern number.
+    pattern = np.zeros(len(current), dtype=np.int64)
+    for mask in masks:
+        pattern = pd.factorize(pattern * 2 + mask)[0]
+    first_rows = pd.Series(np.arange(len(pattern))).groupby(pattern, sort=True).first().to_numpy()
+    tagged = np.stack([mask[first_rows] for mask in masks], axis=1).tolist()
+    joined = np.array([";".join(compress(messages, row)) for row in tagged], dtype=object)
+    leading = np.array([next(compress(messages, row), "") for row in tagged], dtype=object)
+    values = current.to_numpy(dtype=object)
+    rows = np.flatnonzero(hit)
+    prefix = np.where(values[rows] == "", leading[pattern[rows]], values[rows])
+    out = values.copy()
+    out[rows] = prefix + ";" + joined[pattern[rows]]
+    return pd.Series(out, index=existing.index, dtype="string")
+
+
 def _cast_series(series: pd.Series, dtype: str, errors: str) -> tuple[pd.Series, Optional[pd.Series]]:
     if errors not in {"raise", "null"}:
         raise ValueError("cast errors must be raise|null")
@@ -385,6 +446,50 @@ def _to_bool(series: pd.Series, errors: str) -> tuple[pd.Series, Optional[pd.Ser
     return out.astype("boolean"), invalid
 
 
+def _map_unique(series: pd.Series, fn: Any) -> pd.Series:
+    """series.apply(fn), calling fn once per distinct value and scattering the results through the codes."""
+    codes = _distinct_codes(series)
+    if codes is None:
+        return series.apply(fn)
+    # Codes are numbered in order of first occurrence, so fn sees values in row order and raises on the same one.
+    seen = np.maximum.accumulate(codes)
+    first = np.flatnonzero(codes > np.concatenate(([-1], seen[:-1])))
+    out = series.iloc[first].apply(fn).take(codes)
+    out.index = series.index
+    return out
+
+
+def _distinct_codes(series: pd.Series) -> Optional[np.ndarray]:
+    """
+    Codes (0.. in order of first occurrence) that are equal only for values fn cannot tell apart,
+    or None when the column is not one whose values can be compared that way.
+    """
+    if not len(series):
+        return None
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in "iubfmM":
+        values = series.to_numpy()
+        # Floats compare by bits, so -0.0 and 0.0 stay apart.
+        if dtype.kind in "fmM":
+            values = values.view(f"i{dtype.itemsize}")
+        return pd.factorize(values)[0].astype(np.int64)
+    if dtype != object and not isinstance(dtype, pd.StringDtype):
+        return None
+    values = series.to_numpy(dtype=object)
+    # Equal strings are interchangeable; mixed objects (1, 1.0, True) are not.
+    if pd.api.types.infer_dtype(values, skipna=True) not in {"string", "empty"}:
+        return None
+    codes, uniques = pd.factorize(values)
+    codes = codes.astype(np.int64)
+    nulls = np.flatnonzero(codes == -1)
+    if len(nulls):
+        # None, NaN, pd.NA and NaT share a code only with nulls of their own type.
+        kinds = pd.factorize(np.array([type(v).__name__ for v in values[nulls]], dtype=object))[0]
+        codes[nulls] = len(uniques) + kinds
+    # Null kinds get codes after the values; renumber everything by first occurrence.
+    return pd.factorize(codes)[0].astype(np.int64)
+
+
 def _apply_map(df: pd.DataFrame, series: pd.Series, op_name: str, args: Mapping[str, Any]) -> tuple[pd.Series, Optional[pd.Series]]:
     if op_name == "trim":
         return series.astype("string").str.strip(), None
@@ -471,7 +576,9 @@ def _apply_map(df: pd.DataFrame, series: pd.Series, op_name: str, args: Mapping[
                     out.append(tok)
             return out
 
-        return series.apply(tokenize_one), None
+        out = _map_unique(series, tokenize_one)
+        # Rows with the same value get their own token list, not a shared one.
+        return (out.map(list) if out.dtype == object and len(out) else out), None
     if op_name == "date_range_to_start":
         range_re = re.compile(
             r"^(?P<d1>\d{1,2})\s*-\s*(?P<d2>\d{1,2})\s+(?P<mon>[A-Za-z]+)\s*,\s*(?P<y>\d{4})$"
@@ -488,7 +595,7 @@ def _apply_map(df: pd.DataFrame, series: pd.Series, op_name: str, args: Mapping[
                 return text
             return f"{int(m.group('d1'))} {m.group('mon')}, {int(m.group('y')):04d}"
 
-        return series.apply(normalize_one), None
+        return _map_unique(series, normalize_one), None
     if op_name == "date_year_only":
         year_re = re.compile(r"^(?P<y>\d{4})$")
         year_ad_re = re.compile(r"^(?P<y>\d{1,4})\s*AD$", flags=re.IGNORECASE)
@@ -507,7 +614,7 @@ def _apply_map(df: pd.DataFrame, series: pd.Series, op_name: str, args: Mapping[
                 return f"01/01/{int(m.group('y')):04d}"
             return text
 
-        return series.apply(normalize_one), None
+        return _map_unique(series, normalize_one), None
     if op_name == "group_cumcount":
         by = args.get("by")
         start = args.get("start", 1)
@@ -580,7 +687,7 @@ def _apply_map(df: pd.DataFrame, series: pd.Series, op_name: str, args: Mapping[
                 return pd.NA
             return pd.Timestamp(dt).strftime(out_fmt)
 
-        out = series.apply(parse_one)
+        out = _map_unique(series, parse_one)
         invalid = (out.isna() & series.notna())
         if errors == "raise" and invalid.any():
             bad = series[invalid].head(5).tolist()
@@ -644,7 +751,7 @@ def _apply_map(df: pd.DataFrame, series: pd.Series, op_name: str, args: Mapping[
                     continue
             return f"{f:.6f}".rstrip("0").rstrip(".")
 
-        return series.apply(format_one), None
+        return _map_unique(series, format_one), None
     raise ValueError(f"unsupported map op: {op_name}")
 
 
@@ -775,7 +882,7 @@ def _apply_explode(df: pd.DataFrame, col: str, args: Mapping[str, Any]) -> pd.Da
         raise ValueError(
             "explode args.pos_col must be a non-empty string when provided")
 
-    work = df.copy()
+    work = defensive_copy(df)
 
     if pos_col is not None:
         def to_positions(v: Any) -> Any:
@@ -883,36 +990,69 @@ def _apply_expand(df: pd.DataFrame, expand_cfg: Mapping[str, Any], original_df:
             raise ValueError(f"expand to_value_expr evaluation failed: {exc}")
 
     # Get unique key combinations with their from/to values
-    key_df = df[keys + [from_col] +
-                ([to_col] if to_col else [])].drop_duplicates()
-
-    # Generate scaffold rows
-    scaffold_list = []
-    for _, row in key_df.iterrows():
-        key_values = {k: row[k] for k in keys}
-        from_val = row[from_col]
-        to_val = row[to_col] if to_col else to_value
-
-        # Convert to appropriate numeric type
-        try:
-            from_int = int(from_val) if pd.notna(from_val) else None
-            to_int = int(to_val) if pd.notna(to_val) else None
-        except (ValueError, TypeError):
-            raise ValueError(
-                f"expand from_col and to_col/to_value must be numeric")
-
-        if from_int is None or to_int is None:
-            continue
-
-        # Generate rows from from_val to to_val (inclusive)
-        for val in range(from_int, to_int + 1):
-            new_row = key_values.copy()
-            new_row[expand_col] = val
-            if keep_from_col:
-                new_row[from_col] = from_int
-            scaffold_list.append(new_row)
-
-    return pd.DataFrame(scaffold_list)
+    selected = keys + [from_col] + ([to_col] if to_col else [])
+    key_df = df[selected].drop_duplicates()
+    if key_df.empty:
+        return pd.DataFrame()
+    if len(set(selected)) != len(selected):
+        raise ValueError("expand keys, from_col and to_col must be distinct columns")
+
+    # Rows hold the key frame's common dtype, as iterating over its rows would.
+    values = key_df.to_numpy()
+    from_ints, from_ok = _expand_ints(values[:, len(keys)])
+    if to_col:
+        to_ints, to_ok = _expand_ints(values[:, len(keys) + 1])
+    else:
+        to_int = _expand_int(to_value)
+        to_ints = np.full(len(key_df), 0 if to_int is None else to_int, dtype=np.int64)
+        to_ok = np.full(len(key_df), to_int is not None)
+
+    # Each key row yields from..to inclusive; rows with a null bound or from > to yield nothing.
+    counts = np.where(from_ok & to_ok, np.maximum(to_ints - from_ints + 1, 0), 0)
+    kept = np.flatnonzero(counts)
+    if not len(kept):
+        return pd.DataFrame()
+    counts = counts[kept]
+    total = int(counts.sum())
+    owner = np.repeat(np.arange(len(kept)), counts)
+    starts = np.repeat(from_ints[kept], counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    columns: Dict[str, Any] = {}
+    for pos, k in enumerate(keys):
+        key_values = values[kept, pos]
+        series = pd.Series(key_values.tolist() if key_values.dtype == object else key_values)
+        columns[k] = series.take(owner).reset_index(drop=True)
+    columns[expand_col] = starts + offsets
+    if keep_from_col:
+        columns[from_col] = starts
+    return pd.DataFrame(columns)
+
+
+def _expand_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if pd.notna(value) else None
+    except (ValueError, TypeError):
+        raise ValueError("expand from_col and to_col/to_value must be numeric")
+
+
+def _expand_ints(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """int() of each expand bound (floats truncate) as int64, and which ones are not null."""
+    kind = values.dtype.kind
+    if kind in "iub":
+        return values.astype(np.int64), np.ones(len(values), dtype=bool)
+    if kind == "f":
+        ok = ~np.isnan(values)
+        if np.isinf(values).any():
+            raise OverflowError("cannot convert float infinity to integer")
+        if (np.abs(values[ok]) < 2.0 ** 63).all():
+            return np.where(ok, values, 0).astype(np.int64), ok
+    if kind != "O":
+        # Box datetimes and timedeltas as row iteration does.
+        values = pd.Series(values).astype(object).to_numpy()
+    ints = [_expand_int(v) for v in values]
+    ok = np.array([v is not None for v in ints], dtype=bool)
+    return np.array([0 if v is None else v for v in ints], dtype=np.int64), ok
 
 
 def _apply_complete_calendar(df: pd.DataFrame, col: str, args: Mapping[str, Any]) -> pd.DataFrame:
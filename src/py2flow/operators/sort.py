@@ -2,14 +2,21 @@ from __future__ import annotations
 
 from typing import Any, Mapping, List, Tuple, Optional
 
+import numpy as np
 import pandas as pd
 
 from py2flow.errors import FlowExecutionError
 from py2flow.ir import StepKind
-from .base import Operator, ExecutionContext
+from .base import Operator, ExecutionContext, defensive_copy
 from .expr import eval_expr
 
 
+# Folded sort keys stay below this so int64 arithmetic cannot overflow.
+_MAX_SPAN = 1 << 62
+# limit_per_group up to this selects candidates by repeated per-group minimums instead of sorting.
+_PER_GROUP_ROUNDS = 32
+
+
 class Sort(Operator):
     def execute(self, node_id: str, inputs: List[pd.DataFrame], params: Mapping[str, Any], ctx: ExecutionContext) -> pd.DataFrame:
         if len(inputs) != 1:
@@ -20,6 +27,7 @@ class Sort(Operator):
         if not isinstance(order_by, list) or not order_by:
             raise ValueError("sort requires params.order_by list")
 
+        # Always sorted stably (ties keep input order); stable: false is accepted but changes nothing.
         stable = params.get("stable", True)
         if not isinstance(stable, bool):
             raise ValueError("sort stable must be boolean")
@@ -35,9 +43,11 @@ class Sort(Operator):
         if limit_per_group is not None and (not isinstance(limit_per_group, int) or limit_per_group < 0):
             raise ValueError("sort limit_per_group must be a non-negative int")
 
-        work, sort_cols, ascending, temp_cols = _build_order_by(df, order_by)
+        keys, sort_cols, ascending = _build_order_by(df, order_by)
         try:
-            work = work.sort_values(by=sort_cols, ascending=ascending, kind="mergesort" if stable else "quicksort")
+            coded = [_sort_key(keys[col], asc) for col, asc in zip(sort_cols, ascending)]
+            labels = _fold_labels(coded)
+            select = _selection_key(coded, labels, keys[sort_cols[0]], nulls_last=ascending[0])
         except Exception as exc:
             raise FlowExecutionError(
                 node_id,
@@ -47,21 +57,25 @@ class Sort(Operator):
                 message=f"sort failed: {exc}",
                 error_code="sort_error",
             ) from exc
-        if temp_cols:
-            work = work.drop(columns=temp_cols)
+        # Small limits select their rows before ordering them; the result is the stable full sort's prefix.
         if partition_by is not None and limit_per_group is not None:
-            rank = work.groupby(partition_by, sort=False).cumcount()
-            work = work.loc[rank < limit_per_group]
+            groups = df.groupby(partition_by, sort=False).ngroup().fillna(-1).to_numpy(dtype=np.int64)
+            indexer = _top_k_per_group(labels, select, groups, limit_per_group)
+        elif limit is not None and limit < len(df):
+            indexer = _top_k(labels, select, limit)
+        else:
+            indexer = np.lexsort(labels[::-1])
+        work = df.take(indexer)
         if limit is not None:
             work = work.head(limit)
-        return work.copy()
+        return defensive_copy(work)
 
 
-def _build_order_by(df: pd.DataFrame, order_by: List[Mapping[str, Any]]) -> Tuple[pd.DataFrame, List[str], List[bool], List[str]]:
-    work = df.copy()
+def _build_order_by(df: pd.DataFrame, order_by: List[Mapping[str, Any]]) -> Tuple[pd.DataFrame, List[str], List[bool]]:
+    """Sort key columns (per item: is-null flag, then value) indexed like df, with their directions."""
+    keys = pd.DataFrame(index=df.index)
     sort_cols: List[str] = []
     ascending: List[bool] = []
-    temp_cols: List[str] = []
 
     for idx, item in enumerate(order_by):
         if not isinstance(item, Mapping):
@@ -74,23 +88,130 @@ def _build_order_by(df: pd.DataFrame, order_by: List[Mapping[str, Any]]) -> Tupl
         if not isinstance(asc, bool) or nulls not in {"first", "last"}:
             raise ValueError("order_by item invalid asc/nulls")
 
-        value = eval_expr(expr, work)
+        value = eval_expr(expr, df)
         if isinstance(value, pd.Series):
             series = value
         else:
-            series = pd.Series([value] * len(work), index=work.index)
+            series = pd.Series([value] * len(df), index=df.index)
 
         key_col = f"__py2flow_sort_key_{idx}__"
         null_col = f"__py2flow_sort_null_{idx}__"
-        work[key_col] = series
-        work[null_col] = series.isna()
-        temp_cols.extend([key_col, null_col])
-
-        if nulls == "last":
-            sort_cols.extend([null_col, key_col])
-            ascending.extend([True, asc])
+        keys[key_col] = series
+        keys[null_col] = series.isna()
+
+        sort_cols.extend([null_col, key_col])
+        ascending.extend([nulls == "last", asc])
+
+    return keys, sort_cols, ascending
+
+
+def _sort_key(values: pd.Series, asc: bool) -> Tuple[np.ndarray, Optional[int]]:
+    """
+    An array ordering rows like DataFrame.sort_values(by=[...]) orders this key (nulls last), and
+    its radix when it holds codes 0..radix-1. Numeric keys keep their values: the item's null flag
+    already sorts their nulls apart, so those only need a common placeholder.
+    """
+    dtype = values.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind == "b":
+        flags = values.to_numpy().astype(np.int64)
+        return (flags if asc else 1 - flags), 2
+    if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+        raw = values.to_numpy()
+        return (raw if asc else ~raw), None
+    if isinstance(dtype, np.dtype) and dtype.kind == "f":
+        raw = values.to_numpy()
+        raw = np.where(np.isnan(raw), 0.0, raw)
+        return (raw if asc else -raw), None
+    cat = pd.Categorical(values, ordered=True)
+    codes = cat.codes.astype(np.int64)
+    n = len(cat.categories)
+    mask = codes == -1
+    if mask.any():
+        codes = np.where(mask, n, codes)
+    if not asc:
+        codes = np.where(mask, codes, n - codes - 1)
+    return codes, n + 1
+
+
+def _fold_labels(keys: List[Tuple[np.ndarray, Optional[int]]]) -> List[np.ndarray]:
+    """Combine consecutive coded sort keys into as few int64 keys as fit, most significant first."""
+    folded: List[np.ndarray] = []
+    current: Optional[np.ndarray] = None
+    span = 1
+    for values, radix in keys:
+        if radix is None:
+            if current is not None:
+                folded.append(current)
+            folded.append(values)
+            current, span = None, 1
+        elif current is not None and span * radix < _MAX_SPAN:
+            current = current * radix + values
+            span *= radix
         else:
-            sort_cols.extend([null_col, key_col])
-            ascending.extend([False, asc])
-
-    return work, sort_cols, ascending, temp_cols
+            if current is not None:
+                folded.append(current)
+            current, span = values, radix
+    if current is not None:
+        folded.append(current)
+    return folded
+
+
+def sort_labels(keys: pd.DataFrame, sort_cols: List[str], ascending: List[bool]) -> List[np.ndarray]:
+    """Arrays whose np.lexsort(labels[::-1]) is the stable order of keys.sort_values(by=sort_cols, ascending=ascending)."""
+    return _fold_labels([_sort_key(keys[col], asc) for col, asc in zip(sort_cols, ascending)])
+
+
+def _selection_key(coded: List[Tuple[np.ndarray, Optional[int]]], labels: List[np.ndarray], is_null: pd.Series, nulls_last: bool) -> np.ndarray:
+    """
+    A key on the first order_by item (null flag, then value) that never orders two rows against the
+    full sort order; rows it ties may still differ. Candidates are chosen on it, then fully sorted.
+    """
+    (flag, flag_radix), (value, radix) = coded[0], coded[1]
+    if radix is not None and flag_radix is not None:
+        return flag * radix + value
+    if radix is None and is_null.dtype == bool:
+        placeholder = np.inf if nulls_last else -np.inf
+        return np.where(is_null.to_numpy(), placeholder, value.astype(np.float64))
+    return labels[0]
+
+
+def _top_k(labels: List[np.ndarray], select: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the first k rows in stable sort order, selecting candidates before sorting them."""
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    kth = np.partition(select, k - 1)[k - 1]
+    candidates = np.flatnonzero(select <= kth)
+    order = np.lexsort([label[candidates] for label in labels][::-1])
+    return candidates[order[:k]]
+
+
+def _top_k_per_group(labels: List[np.ndarray], select: np.ndarray, groups: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the first k rows of every group (-1: no group, dropped) in stable sort order.
+    For small k, each round takes every group's smallest remaining selection key, so only those rows
+    are sorted; larger k sorts all keys.
+    """
+    if k == 0 or not len(groups):
+        return np.empty(0, dtype=np.intp)
+    if k <= _PER_GROUP_ROUNDS:
+        n_groups = int(groups.max()) + 1
+        remaining = groups >= 0
+        chosen = np.zeros(len(groups), dtype=bool)
+        taken = np.zeros(n_groups, dtype=np.int64)
+        safe = np.where(remaining, groups, 0)
+        top = np.inf if select.dtype.kind == "f" else np.iinfo(select.dtype).max
+        for _ in range(k):
+            if not remaining.any():
+                break
+            level = np.full(n_groups, top, dtype=select.dtype)
+            np.minimum.at(level, groups[remaining], select[remaining])
+            hit = remaining & (select == level[safe])
+            chosen |= hit
+            taken += np.bincount(groups[hit], minlength=n_groups)
+            remaining &= ~hit & (taken[safe] < k)
+        candidates = np.flatnonzero(chosen)
+    else:
+        candidates = np.flatnonzero(groups >= 0)
+    ordered = candidates[np.lexsort([label[candidates] for label in labels][::-1])]
+    rank = pd.Series(groups[ordered]).groupby(groups[ordered], sort=False).cumcount().to_numpy()
+    return ordered[rank < k]
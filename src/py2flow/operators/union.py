@@ -4,7 +4,7 @@ from typing import Any, Mapping, List
 
 import pandas as pd
 
-from .base import Operator, ExecutionContext
+from .base import Operator, ExecutionContext, defensive_copy
 
 
 class Union(Operator):
@@ -28,7 +28,7 @@ class Union(Operator):
         if type_coerce != "error":
             raise ValueError("union type_coerce=safe_cast is not supported")
 
-        frames = [df.copy() for df in inputs]
+        frames = [defensive_copy(df) for df in inputs]
         all_cols: List[str] = []
         for df in frames:
             for c in df.columns:
@@ -0,0 +1,550 @@
+from __future__ import annotations
+
+import copy
+import re
+from dataclasses import dataclass, field
+from graphlib import TopologicalSorter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set
+
+from .cache import canonical_params, is_cacheable
+from .ir import DAG, Node, StepKind
+from .operators.expr import is_rowwise_expr, referenced_columns
+
+# A set of column names, or None when every column is (or may be) needed.
+Live = Optional[Set[str]]
+
+
+@dataclass(frozen=True)
+class OptimizerConfig:
+    """Logical rewrites applied to a DAG before execution. Each pass can be turned off per run."""
+
+    common_subexpressions: bool = True
+    predicate_pushdown: bool = True
+    projection_pushdown: bool = True
+
+
+@dataclass
+class OptimizerReport:
+    # duplicate node id -> id of the identical node that now serves its consumers
+    merged: Dict[str, str] = field(default_factory=dict)
+    # (filter id, node it moved below, filter ids now feeding that node)
+    predicates: List[tuple[str, str, List[str]]] = field(default_factory=list)
+    # input node id -> columns pushed into params.usecols
+    projections: Dict[str, List[str]] = field(default_factory=dict)
+
+    def lines(self) -> List[str]:
+        out: List[str] = []
+        for nid, into in self.merged.items():
+            out.append(f"cse node={nid} merged_into={into}")
+        for nid, below, placed in self.predicates:
+            out.append(f"predicate node={nid} moved_below={below} as={placed}")
+        for nid, cols in self.projections.items():
+            out.append(f"projection node={nid} usecols={cols}")
+        return out
+
+
+def optimize_dag(
+    dag: DAG,
+    config: OptimizerConfig | None = None,
+    *,
+    targets: Iterable[str] | None = None,
+    input_tables: Mapping[str, Any] | None = None,
+) -> tuple[DAG, OptimizerReport]:
+    """
+    Return a rewritten copy of a validated DAG plus a report of what changed.
+
+    targets are nodes whose full result is observed by the caller (defaults to output nodes);
+    results of other intermediate nodes may carry fewer columns, fewer rows or different index
+    labels than without optimization.
+    """
+    config = config or OptimizerConfig()
+    out = copy.deepcopy(dag)
+    report = OptimizerReport()
+    if config.common_subexpressions:
+        _eliminate_common_subexpressions(out, report, targets=targets, input_tables=input_tables)
+    if config.predicate_pushdown:
+        _predicate_pushdown(out, report, targets=targets)
+    if config.projection_pushdown:
+        _projection_pushdown(out, report, targets=targets, input_tables=input_tables)
+    return out, report
+
+
+def _topological_order(nodes: Mapping[str, Node]) -> List[str]:
+    return list(TopologicalSorter({nid: n.inputs for nid, n in nodes.items()}).static_order())
+
+
+def _merge(a: Live, b: Live) -> Live:
+    if a is None or b is None:
+        return None
+    return a | b
+
+
+def _refs(expr: Any) -> Live:
+    if not isinstance(expr, str) or not expr:
+        return set()
+    cols = referenced_columns(expr)
+    return None if cols is None else set(cols)
+
+
+def _add_refs(need: Live, *exprs: Any) -> Live:
+    for expr in exprs:
+        if need is None:
+            return None
+        need = _merge(need, _refs(expr))
+    return need
+
+
+def _str_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list):
+        return [x for x in value if isinstance(x, str)]
+    return []
+
+
+def _with_mangle_bases(cols: Set[str]) -> Set[str]:
+    # read_csv names duplicate headers "a", "a.1", ...; keep the first occurrence as well.
+    out = set(cols)
+    for c in cols:
+        base, dot, suffix = c.rpartition(".")
+        if dot and base and suffix.isdigit():
+            out.add(base)
+    return out
+
+
+def _project_requirements(params: Mapping[str, Any], live: Live) -> Live:
+    if params.get("promote_row_to_header") is not None:
+        return None
+    on_error = params.get("on_error", "error")
+    extra: Set[str] = set()
+    expand = params.get("expand")
+    if isinstance(expand, Mapping):
+        if on_error != "error":
+            # A failed expand falls back to the unexpanded frame.
+            return None
+        # expand output is keys + expand_col (+ from_col): only these reach downstream.
+        live = set(_str_list(expand.get("keys"))) | set(_str_list(expand.get("from_col"))) | set(_str_list(expand.get("to_col")))
+        # to_value_expr is evaluated on the node's original input frame.
+        refs = _refs(expand.get("to_value_expr"))
+        if refs is None:
+            return None
+        extra = refs
+    # select runs first, so an explicit list bounds the input whatever happens downstream.
+    select = params.get("select")
+    if isinstance(select, list) and "*" not in select:
+        return {str(c) for c in select} | extra
+    if live is None:
+        return None
+    # Columns are only ever added while walking back: a dead column overwritten by a step may
+    # still decide existence checks (rename collisions, map targets), so keeping it is the safe choice.
+    need: Live = set(live)
+    if on_error == "tag":
+        need |= set(_str_list(params.get("error_cols"))[:1])
+    for op in reversed(params.get("map") or []):
+        if not isinstance(op, Mapping):
+            return None
+        args = op.get("args") or {}
+        if not isinstance(args, Mapping):
+            return None
+        need = _merge(need, set(_str_list(op.get("col"))))
+        need = _merge(need, set(_str_list(args.get("as"))))
+        if op.get("op") == "group_cumcount":
+            need = _merge(need, set(_str_list(args.get("by"))))
+        if op.get("op") == "date_range":
+            need = _merge(need, set(_str_list(args.get("end_col"))))
+        need = _add_refs(need, args.get("when"))
+    for item in reversed(params.get("cast") or []):
+        if isinstance(item, Mapping):
+            need = _merge(need, set(_str_list(item.get("col"))))
+    for item in reversed(params.get("compute") or []):
+        if not isinstance(item, Mapping):
+            return None
+        need = _add_refs(need, item.get("expr"))
+    if need is None:
+        return None
+    rename = params.get("rename")
+    if isinstance(rename, Mapping):
+        for src, dst in rename.items():
+            if dst in need or src in need:
+                need |= {str(src), str(dst)}
+    if isinstance(select, list):
+        need |= {str(c) for c in select if c != "*"}
+    return need | extra
+
+
+def _join_requirements(node: Node, live: Live) -> List[Live]:
+    params = node.params or {}
+    on = _str_list(params.get("on")) if params.get("on") is not None else None
+    left_keys = set(on if on is not None else _str_list(params.get("left_on")))
+    right_keys = set(on if on is not None else _str_list(params.get("right_on")))
+    how = params.get("how", "inner")
+    if params.get("fuzzy_match"):
+        # Row-wise matching (iterrows) upcasts across all columns; never prune.
+        return [None, None]
+    if how in {"semi", "anti"}:
+        return [None if live is None else live | left_keys, set(right_keys)]
+
+    # Output names depend on which names exist on the other side (suffixing), so every name kept
+    # on one side is also requested from the other.
+    candidates: Live = None
+    if live is not None:
+        candidates = set(live)
+        for name in live:
+            for suffix in _str_list(params.get("suffixes", ["_x", "_y"])):
+                if suffix and name.endswith(suffix):
+                    candidates.add(name[: -len(suffix)])
+
+    def side(select: Any, keys: Set[str]) -> Live:
+        if isinstance(select, list):
+            explicit = {str(c) for c in select if c != "*"}
+            if "*" in select:
+                return None if candidates is None else candidates | explicit | keys
+            return explicit | keys
+        return None if candidates is None else candidates | keys
+
+    left = side(params.get("select_left"), left_keys)
+    right = side(params.get("select_right"), right_keys)
+    if left is None or right is None:
+        return [None, None]
+    shared = left | right
+    return [shared, set(shared)]
+
+
+def _requirements(node: Node, live: Live) -> List[Live]:
+    """Columns each input must provide so that `live` output columns are unchanged."""
+    params = node.params or {}
+    kind = node.kind
+    n_inputs = len(node.inputs)
+    if kind is StepKind.PROJECT:
+        return [_project_requirements(params, live)]
+    if kind is StepKind.FILTER:
+        return [_add_refs(live, params.get("predicate"))]
+    if kind is StepKind.JOIN:
+        return _join_requirements(node, live)
+    if kind is StepKind.UNION:
+        if params.get("distinct") or params.get("fill_missing", "null") == "error":
+            return [None] * n_inputs
+        return [None if live is None else set(live) for _ in range(n_inputs)]
+    if kind is StepKind.AGGREGATE:
+        need: Live = set(_str_list(params.get("group_keys")))
+        for agg in params.get("aggs") or []:
+            need = _add_refs(need, agg.get("expr") if isinstance(agg, Mapping) else None)
+        return [need]
+    if kind is StepKind.DEDUP:
+        keys = params.get("keys")
+        if keys is None:
+            return [None]
+        if params.get("output", "all_cols") == "keys_only":
+            return [set(_str_list(keys))]
+        need = None if live is None else live | set(_str_list(keys))
+        for item in params.get("order_by") or []:
+            need = _add_refs(need, item.get("expr") if isinstance(item, Mapping) else None)
+        return [need]
+    if kind is StepKind.SORT:
+        need = None if live is None else live | set(_str_list(params.get("partition_by")))
+        for item in params.get("order_by") or []:
+            need = _add_refs(need, item.get("expr") if isinstance(item, Mapping) else None)
+        return [need]
+    if kind is StepKind.PIVOT:
+        mode = params.get("mode")
+        if mode == "pivot_longer":
+            return [set(_str_list(params.get("id_cols"))) | set(_str_list(params.get("value_vars")))]
+        if mode == "pivot_wider":
+            return [set(_str_list(params.get("index"))) | set(_str_list(params.get("columns"))) | set(_str_list(params.get("values")))]
+        return [None]
+    if kind is StepKind.OUTPUT:
+        schema = params.get("schema")
+        if params.get("schema_enforce") and isinstance(schema, Mapping) and not isinstance(schema.get("columns"), list):
+            order = schema.get("order")
+            if isinstance(order, list):
+                return [{str(c) for c in order}]
+        return [None]
+    return [None] * n_inputs
+
+
+def _pushable_input(node: Node, input_tables: Mapping[str, Any] | None) -> bool:
+    params = node.params or {}
+    if input_tables is not None and input_tables.get(node.id) is not None:
+        return False
+    if params.get("data") is not None or params.get("source_type") == "inline":
+        return False
+    if params.get("mode", "csv") not in (None, "csv", "parquet", "feather"):
+        return False
+    if "header" in params or "usecols" in params:
+        return False
+    # With usecols pandas stops checking row width, which would change skip/warn results.
+    if params.get("on_bad_lines") in {"skip", "warn"}:
+        return False
+    return True
+
+
+def column_liveness(dag: DAG, targets: Iterable[str] | None = None) -> Dict[str, Live]:
+    """Columns of each node's result that can affect targets (default: output nodes)."""
+    order = _topological_order(dag.nodes)
+    live: Dict[str, Live] = {nid: set() for nid in order}
+    sinks = set(targets) if targets is not None else {nid for nid, n in dag.nodes.items() if n.kind is StepKind.OUTPUT}
+    for nid in sinks:
+        if nid in live:
+            live[nid] = None
+    for nid in reversed(order):
+        node = dag.nodes[nid]
+        reqs = _requirements(node, live[nid])
+        for up, req in zip(node.inputs, reqs):
+            live[up] = _merge(live[up], req)
+    return live
+
+
+def _projection_pushdown(
+    dag: DAG,
+    report: OptimizerReport,
+    *,
+    targets: Iterable[str] | None,
+    input_tables: Mapping[str, Any] | None,
+) -> None:
+    live = column_liveness(dag, targets)
+    for nid, node in dag.nodes.items():
+        if node.kind is not StepKind.INPUT or not _pushable_input(node, input_tables):
+            continue
+        cols = live.get(nid)
+        if cols is None:
+            continue
+        params = node.params
+        cols = _with_mangle_bases(cols) | set(_str_list(params.get("parse_dates")))
+        params["usecols"] = sorted(cols)
+        report.projections[nid] = params["usecols"]
+
+
+# Map ops whose output row count and per-row values depend only on that row.
+_ROWWISE_MAP_OPS = frozenset(
+    {
+        "trim",
+        "lower",
+        "upper",
+        "regex_replace",
+        "regex_extract",
+        "html_strip",
+        "squeeze_whitespace",
+        "split",
+        "tokenize",
+        "fillna",
+        "map_values",
+        "parse_date_multi",
+        "date_range",
+        "date_range_to_start",
+        "date_year_only",
+        "format_number",
+    }
+)
+_LABEL_USE = re.compile(r"\bindex\b|\.loc\b")
+
+
+def _consumers(dag: DAG) -> Dict[str, List[str]]:
+    out: Dict[str, List[str]] = {nid: [] for nid in dag.nodes}
+    for nid, node in dag.nodes.items():
+        for i in node.inputs:
+            out[i].append(nid)
+    return out
+
+
+def _project_passes(params: Mapping[str, Any], refs: Set[str]) -> bool:
+    """A filter on refs commutes with this project: same rows in, refs passed through unchanged."""
+    if params.get("promote_row_to_header") is not None or params.get("expand") is not None:
+        return False
+    # With keep/null/tag a failure on rows the filter drops would change the surviving values.
+    if params.get("on_error", "error") != "error":
+        return False
+    select = params.get("select")
+    if isinstance(select, list) and "*" not in select and not refs <= set(select):
+        return False
+    rename = params.get("rename")
+    if isinstance(rename, Mapping) and refs & ({str(k) for k in rename} | {str(v) for v in rename.values()}):
+        return False
+    touched: Set[str] = set()
+    for item in params.get("compute") or []:
+        if not isinstance(item, Mapping) or not is_rowwise_expr(str(item.get("expr") or "")):
+            return False
+        touched.update(_str_list(item.get("as")))
+    for item in params.get("cast") or []:
+        # A datetime cast infers its format from the first value, which depends on the rows it sees.
+        if not isinstance(item, Mapping) or item.get("dtype") == "datetime64[ns]":
+            return False
+        touched.update(_str_list(item.get("col")))
+    for op in params.get("map") or []:
+        if not isinstance(op, Mapping) or op.get("op") not in _ROWWISE_MAP_OPS:
+            return False
+        args = op.get("args") or {}
+        if not isinstance(args, Mapping):
+            return False
+        when = args.get("when")
+        if when is not None and not is_rowwise_expr(str(when)):
+            return False
+        touched.update(_str_list(op.get("col")))
+        touched.update(_str_list(args.get("as")))
+    return not (refs & touched)
+
+
+def _shared_join_keys(params: Mapping[str, Any]) -> Set[str]:
+    if params.get("on") is not None:
+        return set(_str_list(params.get("on")))
+    return {lk for lk, rk in zip(_str_list(params.get("left_on")), _str_list(params.get("right_on"))) if lk == rk}
+
+
+def _join_slots(params: Mapping[str, Any], predicate: str, refs: Set[str]) -> List[int]:
+    """Input slots of a join a filter can move into, or [] when it must stay above the join."""
+    if params.get("fuzzy_match") or params.get("validate") is not None:
+        return []
+    how = params.get("how", "inner")
+    # Below the join the predicate also sees rows the join would have dropped, so it must not raise.
+    if not is_rowwise_expr(predicate, total=True):
+        return []
+    if how in {"semi", "anti"}:
+        return [0]
+    if how != "inner":
+        return []
+    keys = _shared_join_keys(params)
+    if not refs or not refs <= keys:
+        return []
+    for key in refs:
+        visible = False
+        for select in (params.get("select_left"), params.get("select_right")):
+            if not isinstance(select, list) or "*" in select or key in select:
+                visible = True
+        if not visible:
+            return []
+    # Matched rows carry equal key values on both sides, so the filter applies to each side.
+    return [0, 1]
+
+
+def _labels_observed(dag: DAG, start: str, consumers: Mapping[str, List[str]]) -> bool:
+    """Whether anything downstream of start can see row labels before an operator resets them."""
+    stack = list(consumers.get(start, []))
+    seen: Set[str] = set()
+    while stack:
+        nid = stack.pop()
+        if nid in seen:
+            continue
+        seen.add(nid)
+        node = dag.nodes[nid]
+        params = node.params or {}
+        if node.kind is StepKind.SCRIPT:
+            return True
+        if node.kind is StepKind.JOIN and params.get("fuzzy_match"):
+            return True
+        if node.kind is StepKind.PIVOT and params.get("mode") not in {"pivot_longer", "pivot_wider"}:
+            return True
+        if node.kind in {StepKind.OUTPUT, StepKind.JOIN, StepKind.UNION, StepKind.PIVOT}:
+            continue
+        # Expressions are plain strings inside params; a textual check is conservative enough.
+        if _LABEL_USE.search(repr(params)):
+            return True
+        if node.kind is StepKind.AGGREGATE:
+            continue
+        stack.extend(consumers.get(nid, []))
+    return False
+
+
+def _pushdown_slots(dag: DAG, flt: Node, below: Node, consumers: Mapping[str, List[str]]) -> List[int]:
+    params = flt.params or {}
+    predicate = params.get("predicate")
+    if not isinstance(predicate, str) or not predicate or not is_rowwise_expr(predicate):
+        return []
+    refs = _refs(predicate)
+    if refs is None:
+        return []
+    bparams = below.params or {}
+    if below.kind is StepKind.PROJECT:
+        return [0] if _project_passes(bparams, refs) else []
+    if below.kind is StepKind.UNION:
+        # With fill_missing=null a branch may lack a referenced column (read as null after the union).
+        if bparams.get("fill_missing", "null") != "error" or _labels_observed(dag, flt.id, consumers):
+            return []
+        return list(range(len(below.inputs)))
+    if below.kind is StepKind.JOIN:
+        slots = _join_slots(bparams, predicate, refs)
+        if slots and bparams.get("how", "inner") == "inner" and _labels_observed(dag, flt.id, consumers):
+            return []
+        return slots
+    return []
+
+
+def _fresh_id(dag: DAG, base: str) -> str:
+    n = 1
+    while f"{base}__{n}" in dag.nodes:
+        n += 1
+    return f"{base}__{n}"
+
+
+def _predicate_pushdown(dag: DAG, report: OptimizerReport, *, targets: Iterable[str] | None) -> None:
+    pinned = set(targets) if targets is not None else set()
+    moved = True
+    while moved:
+        moved = False
+        consumers = _consumers(dag)
+        for fid in _topological_order(dag.nodes):
+            flt = dag.nodes[fid]
+            if flt.kind is not StepKind.FILTER or fid in pinned:
+                continue
+            below = dag.nodes[flt.inputs[0]]
+            if below.id in pinned or consumers[below.id] != [fid]:
+                continue
+            slots = _pushdown_slots(dag, flt, below, consumers)
+            if not slots:
+                continue
+            # The filter keeps its id in the first slot; further copies get fresh ids.
+            placed: List[str] = []
+            for n, slot in enumerate(slots):
+                nid = fid if n == 0 else _fresh_id(dag, fid)
+                node = flt if n == 0 else Node(id=nid, kind=StepKind.FILTER, params=copy.deepcopy(flt.params))
+                node.inputs = [below.inputs[slot]]
+                dag.nodes[nid] = node
+                below.inputs[slot] = nid
+                placed.append(nid)
+            for cid in consumers[fid]:
+                dag.nodes[cid].inputs = [below.id if i == fid else i for i in dag.nodes[cid].inputs]
+            report.predicates.append((fid, below.id, placed))
+            moved = True
+            break
+
+
+def _eliminate_common_subexpressions(
+    dag: DAG,
+    report: OptimizerReport,
+    *,
+    targets: Iterable[str] | None,
+    input_tables: Mapping[str, Any] | None,
+) -> None:
+    """
+    Merge nodes with the same kind, params (ignoring "_" metadata) and identical inputs, and rewire
+    their consumers to one survivor. Outputs, impure scripts and injected inputs are never merged.
+    """
+    pinned = set(targets) if targets is not None else set()
+    order = _topological_order(dag.nodes)
+    # Structural class of each node: nodes in one class compute identical results.
+    klass: Dict[str, int] = {}
+    members: Dict[int, List[str]] = {}
+    keys: Dict[tuple, int] = {}
+    for nid in order:
+        node = dag.nodes[nid]
+        if not is_cacheable(node) or (input_tables is not None and input_tables.get(nid) is not None):
+            klass[nid] = len(klass)
+        else:
+            key = (node.kind.value, canonical_params(node.params), tuple(klass[i] for i in node.inputs))
+            klass[nid] = keys.setdefault(key, len(klass))
+        members.setdefault(klass[nid], []).append(nid)
+
+    # A target keeps its id; a class holding several targets only absorbs its non-target members.
+    survivor: Dict[str, str] = {}
+    for ids in members.values():
+        if len(ids) < 2:
+            continue
+        keep = next((nid for nid in ids if nid in pinned), ids[0])
+        for nid in ids:
+            if nid != keep and nid not in pinned:
+                survivor[nid] = keep
+    if not survivor:
+        return
+    for nid in survivor:
+        del dag.nodes[nid]
+    for node in dag.nodes.values():
+        node.inputs = [survivor.get(i, i) for i in node.inputs]
+    report.merged.update((nid, survivor[nid]) for nid in order if nid in survivor)
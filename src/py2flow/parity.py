@@ -0,0 +1,126 @@
+"""
+Run every flow.json under the given roots on pandas and on the polars backend (or the duckdb engine) and diff the outputs.
+
+Each flow runs in its own temporary copy of the case directory, once per side:
+
+    python -m py2flow.parity data/ runs/
+    python -m py2flow.parity --against duckdb data/
+
+A case is "same" when every output file is byte-identical, "close" when the only differences are
+floating point noise (e.g. compensated vs plain summation in group means), and "diff" otherwise.
+Flows that fail must fail on both sides with the same error type.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from py2flow.exec_flow import exec_flow
+
+# exec_flow keyword arguments for each side of the comparison.
+RUNS: Dict[str, Dict[str, str]] = {"pandas": {}, "polars": {"backend": "polars"}, "duckdb": {"engine": "duckdb"}}
+
+
+def output_paths(flow_file: Path) -> List[str]:
+    with flow_file.open("r", encoding="utf-8") as f:
+        flow = json.load(f)
+    nodes = flow.get("nodes") or {}
+    return sorted(
+        str(n["params"]["path"])
+        for n in nodes.values()
+        if isinstance(n, dict) and n.get("kind") == "output" and isinstance((n.get("params") or {}).get("path"), str)
+    )
+
+
+def run_backend(case_dir: Path, backend: str, workdir: Path, outputs: List[str]) -> Tuple[Path, Optional[str], float]:
+    """Copy case_dir into workdir/backend and run it with RUNS[backend]; returns (copy, error or None, seconds)."""
+    dest = workdir / backend
+    shutil.copytree(case_dir, dest, symlinks=True)
+    # Outputs left over from earlier runs would hide a backend that never wrote them.
+    for rel in outputs:
+        (dest / rel).unlink(missing_ok=True)
+    t0 = time.perf_counter()
+    try:
+        exec_flow(dest, **RUNS[backend])
+        error = None
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    return dest, error, time.perf_counter() - t0
+
+
+def compare_files(a: Path, b: Path) -> str:
+    if not a.exists() or not b.exists():
+        return "same" if a.exists() == b.exists() else "diff"
+    if a.read_bytes() == b.read_bytes():
+        return "same"
+    try:
+        left, right = pd.read_csv(a), pd.read_csv(b)
+    except Exception:
+        return "diff"
+    if left.shape != right.shape or list(left.columns) != list(right.columns):
+        return "diff"
+    for col in left.columns:
+        x, y = left[col], right[col]
+        if pd.api.types.is_numeric_dtype(x) and pd.api.types.is_numeric_dtype(y):
+            if not np.allclose(x.to_numpy(dtype=float), y.to_numpy(dtype=float), rtol=1e-9, atol=0.0, equal_nan=True):
+                return "diff"
+        elif not x.equals(y):
+            return "diff"
+    return "close"
+
+
+def compare_case(flow_file: Path, against: str = "polars") -> Dict[str, Any]:
+    case_dir = flow_file.parent
+    row: Dict[str, Any] = {"case": str(case_dir), "status": "same", "detail": ""}
+    outputs = output_paths(flow_file)
+    with tempfile.TemporaryDirectory(prefix="py2flow-parity-") as tmp:
+        runs = {b: run_backend(case_dir, b, Path(tmp), outputs) for b in ("pandas", against)}
+        for b, (_, _, seconds) in runs.items():
+            row[f"{b}_s"] = seconds
+        (pd_dir, pd_err, _), (alt_dir, alt_err, _) = runs["pandas"], runs[against]
+        if pd_err is not None or alt_err is not None:
+            same_type = pd_err is not None and alt_err is not None and pd_err.split(":", 1)[0] == alt_err.split(":", 1)[0]
+            row["status"] = "error" if same_type else "diff"
+            row["detail"] = f"pandas={pd_err} {against}={alt_err}"
+            return row
+        worst = "same"
+        for rel in outputs:
+            status = compare_files(pd_dir / rel, alt_dir / rel)
+            if status != "same":
+                row["detail"] += f"{rel}={status} "
+            if status == "diff" or (status == "close" and worst == "same"):
+                worst = status
+        row["status"] = worst
+    return row
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("roots", nargs="+", help="Directories searched recursively for flow.json")
+    parser.add_argument("--against", choices=("polars", "duckdb"), default="polars", help="Side compared with pandas (default: polars)")
+    args = parser.parse_args(argv)
+
+    flows = sorted({p for root in args.roots for p in Path(root).rglob("flow.json")})
+    if not flows:
+        parser.error(f"no flow.json under {args.roots}")
+    counts: Dict[str, int] = {}
+    alt = args.against
+    print(f"{'case':<48} {'status':<6} {'pandas_s':>9} {alt + '_s':>9}  detail")
+    for flow_file in flows:
+        row = compare_case(flow_file, alt)
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+        print(f"{row['case']:<48} {row['status']:<6} {row['pandas_s']:>9.3f} {row[alt + '_s']:>9.3f}  {row['detail'].strip()}")
+    print(" ".join(f"{k}={v}" for k, v in sorted(counts.items())))
+    return 1 if counts.get("diff") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,504 @@
+"""
+Polars execution backend: an OperatorRegistry whose operators build per-node Polars lazy plans.
+
+Each operator translates its params (and expressions, via backend_expr.polars_expr) into a LazyFrame plan
+and collects it, so joins, group-bys, sorts and dedups run multi-threaded. A node whose params or
+expressions fall outside the translated subset, or whose plan fails, runs the pandas operator
+instead; frames are converted only at those boundaries. CSV parsing, pivot, script and output
+always use the pandas operators so file contents match the pandas backend.
+
+Requires the optional ``polars`` and ``pyarrow`` dependencies (``pip install prepbench[polars]``).
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import pandas as pd
+
+from .arrow_io import ArrowIO, restore_object_nan
+from .backend_expr import polars_expr
+from .ir import StepKind
+from .operators import OperatorRegistry
+from .operators.aggregate import Aggregate
+from .operators.base import ExecutionContext, FileIO, Operator
+from .operators.dedup import Dedup
+from .operators.expr import referenced_columns
+from .operators.filter import Filter
+from .operators.input import Input
+from .operators.join import Join
+from .operators.output import Output
+from .operators.pivot import Pivot
+from .operators.project import Project
+from .operators.script import Script
+from .operators.sort import Sort
+from .operators.union import Union
+
+
+def _polars() -> Any:
+    try:
+        import polars
+    except ImportError as exc:
+        raise ImportError("the polars backend requires polars (pip install prepbench[polars])") from exc
+    return polars
+
+
+def to_polars(df: Any) -> Any:
+    """
+    A polars DataFrame for df, or None when it has no faithful polars form (mixed-type objects,
+    non-string labels, or pandas extension dtypes such as Int64 or string, which would come back as
+    float64 or object).
+    """
+    pl = _polars()
+    if isinstance(df, pl.DataFrame):
+        return df
+    if not isinstance(df, pd.DataFrame):
+        return None
+    if not all(isinstance(c, str) for c in df.columns) or not df.columns.is_unique:
+        return None
+    if any(isinstance(dtype, pd.api.extensions.ExtensionDtype) for dtype in df.dtypes):
+        return None
+    try:
+        return pl.from_pandas(df)
+    except Exception:
+        return None
+
+
+def to_pandas(df: Any) -> Any:
+    pl = _polars()
+    if isinstance(df, pl.DataFrame):
+        return restore_object_nan(df.to_pandas())
+    return df
+
+
+def _nan_as_null(lf: Any, expr: Any) -> Any:
+    """pandas treats NaN as missing; polars keeps NaN as a value, so float results map NaN to null."""
+    dtype = lf.select(expr).collect_schema().dtypes()[0]
+    return expr.fill_nan(None) if dtype.is_float() else expr
+
+
+def _translate_all(exprs: Sequence[Any], columns: Sequence[str]) -> Optional[List[Any]]:
+    out = []
+    for text in exprs:
+        if not isinstance(text, str) or not text:
+            return None
+        e = polars_expr(text, columns)
+        if e is None:
+            return None
+        out.append(e)
+    return out
+
+
+def _only_keys(params: Mapping[str, Any], allowed: set) -> bool:
+    return all(k in allowed or str(k).startswith("_") for k in params)
+
+
+class PolarsOperator(Operator):
+    """Runs plan() on polars; when it returns None or fails, runs the pandas operator on pandas frames."""
+
+    def __init__(self, fallback: Operator) -> None:
+        self.fallback = fallback
+
+    def plan(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        return None
+
+    def execute(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        frames = [to_polars(df) for df in inputs]
+        if all(f is not None for f in frames):
+            try:
+                lf = self.plan(node_id, [f.lazy() for f in frames], params, ctx)
+                if lf is not None:
+                    return lf.collect()
+            except Exception as exc:
+                ctx.logger.debug("polars fallback node=%s error=%s", node_id, exc)
+        ctx.logger.debug("polars fallback node=%s kind=%s", node_id, type(self.fallback).__name__)
+        return self.fallback.execute(node_id, [to_pandas(df) for df in inputs], params, ctx)
+
+
+class PandasOnly(Operator):
+    """Wraps a pandas operator so it accepts polars inputs (pivot, script, output)."""
+
+    def __init__(self, operator: Operator) -> None:
+        self.operator = operator
+
+    def execute(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        return self.operator.execute(node_id, [to_pandas(df) for df in inputs], params, ctx)
+
+
+class PolarsInput(Operator):
+    """Parquet/Feather files are scanned by polars; everything else is read by the pandas operator."""
+
+    def __init__(self, fallback: Operator) -> None:
+        self.fallback = fallback
+
+    def execute(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        pl = _polars()
+        mode = params.get("mode", "csv")
+        path = params.get("path")
+        injected = ctx.input_tables is not None and ctx.input_tables.get(node_id) is not None
+        usecols = params.get("usecols")
+        native = (
+            mode in {"parquet", "feather"}
+            and not inputs
+            and not injected
+            and params.get("data") is None
+            and isinstance(path, str)
+            and path
+            and (usecols is None or isinstance(usecols, list))
+            # Custom adapters may redirect reads; only bypass the stock file adapters.
+            and type(ctx.io) in (FileIO, ArrowIO)
+        )
+        if not native:
+            return self.fallback.execute(node_id, inputs, params, ctx)
+        resolved = ctx.resolve_path(path)
+        lf = pl.scan_parquet(resolved) if mode == "parquet" else pl.scan_ipc(resolved)
+        if usecols is not None:
+            names = set(lf.collect_schema().names())
+            lf = lf.select([c for c in usecols if c in names])
+        return lf.collect()
+
+
+class PolarsProject(PolarsOperator):
+    def plan(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        if not _only_keys(params, {"select", "rename", "compute", "cast", "map", "on_error"}):
+            return None
+        if params.get("cast") or params.get("map") or params.get("on_error", "error") != "error":
+            return None
+        lf = inputs[0]
+        columns = lf.collect_schema().names()
+        select = params.get("select")
+        if select is not None:
+            if not isinstance(select, list):
+                return None
+            cols: List[str] = []
+            for item in select:
+                cols.extend(columns if item == "*" else [str(item)])
+            if len(set(cols)) != len(cols) or any(c not in columns for c in cols):
+                return None
+            lf = lf.select(cols)
+        rename = params.get("rename")
+        if rename is not None:
+            if not isinstance(rename, Mapping) or not all(isinstance(v, str) for v in rename.values()):
+                return None
+            lf = lf.rename(dict(rename), strict=False)
+        compute = params.get("compute") or []
+        if not isinstance(compute, list):
+            return None
+        for item in compute:
+            if not isinstance(item, Mapping):
+                return None
+            as_col = item.get("as")
+            if not isinstance(as_col, str) or not as_col:
+                return None
+            exprs = _translate_all([item.get("expr")], lf.collect_schema().names())
+            if exprs is None:
+                return None
+            lf = lf.with_columns(_nan_as_null(lf, exprs[0]).alias(as_col))
+        return lf
+
+
+class PolarsFilter(PolarsOperator):
+    def plan(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        # null_as_false=false keeps null rows via astype(bool); leave that to pandas.
+        if not _only_keys(params, {"predicate", "null_as_false"}) or params.get("null_as_false", True) is not True:
+            return None
+        lf = inputs[0]
+        exprs = _translate_all([params.get("predicate")], lf.collect_schema().names())
+        return lf.filter(exprs[0]) if exprs is not None else None
+
+
+def _order_keys(lf: Any, order_by: Any) -> Optional[tuple]:
+    if not isinstance(order_by, list) or not order_by:
+        return None
+    keys, descending, nulls_last = [], [], []
+    columns = lf.collect_schema().names()
+    for item in order_by:
+        if not isinstance(item, Mapping):
+            return None
+        asc = item.get("asc", True)
+        nulls = item.get("nulls", "last")
+        exprs = _translate_all([item.get("expr")], columns)
+        if exprs is None or not isinstance(asc, bool) or nulls not in {"first", "last"}:
+            return None
+        keys.append(_nan_as_null(lf, exprs[0]))
+        descending.append(not asc)
+        nulls_last.append(nulls == "last")
+    return keys, descending, nulls_last
+
+
+class PolarsSort(PolarsOperator):
+    def plan(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        pl = _polars()
+        if not _only_keys(params, {"order_by", "stable", "limit", "partition_by", "limit_per_group"}):
+            return None
+        lf = inputs[0]
+        order = _order_keys(lf, params.get("order_by"))
+        limit = params.get("limit")
+        partition_by = params.get("partition_by")
+        limit_per_group = params.get("limit_per_group")
+        if order is None or not isinstance(params.get("stable", True), bool):
+            return None
+        if limit is not None and (not isinstance(limit, int) or limit < 0):
+            return None
+        if partition_by is not None and (not isinstance(partition_by, list) or not partition_by or not all(isinstance(x, str) and x for x in partition_by)):
+            return None
+        if limit_per_group is not None and (not isinstance(limit_per_group, int) or limit_per_group < 0):
+            return None
+        keys, descending, nulls_last = order
+        lf = lf.sort(keys, descending=descending, nulls_last=nulls_last, maintain_order=True)
+        if partition_by is not None and limit_per_group is not None:
+            # groupby(...).cumcount() leaves rows with a null partition key unranked, so they drop out.
+            rank = pl.int_range(pl.len()).over(partition_by)
+            present = pl.all_horizontal([pl.col(c).is_not_null() for c in partition_by])
+            lf = lf.filter((rank < limit_per_group) & present)
+        if limit is not None:
+            lf = lf.head(limit)
+        return lf
+
+
+class PolarsDedup(PolarsOperator):
+    def plan(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        pl = _polars()
+        if not _only_keys(params, {"keys", "output", "keep", "order_by", "output_order"}):
+            return None
+        lf = inputs[0]
+        keys = params.get("keys")
+        output = params.get("output", "all_cols")
+        keep = params.get("keep", "first")
+        if keys is None:
+            return lf.unique(maintain_order=True, keep="first")
+        columns = lf.collect_schema().names()
+        if not isinstance(keys, list) or not keys or not all(isinstance(k, str) and k in columns for k in keys):
+            return None
+        if output == "keys_only":
+            return lf.select(keys).unique(maintain_order=True, keep="first")
+        if output != "all_cols":
+            return None
+        row_key = pl.struct(keys)
+        if keep == "none":
+            return lf.filter(row_key.is_unique())
+        if keep not in {"first", "last"}:
+            return None
+        order = _order_keys(lf, params.get("order_by"))
+        if order is None:
+            return None
+        output_order = params.get("output_order", "sorted")
+        if output_order not in {"sorted", "input"}:
+            return None
+        by, descending, nulls_last = order
+        marker = "__py2flow_polars_row__"
+        if output_order == "input":
+            lf = lf.with_row_index(marker)
+        lf = lf.sort(by, descending=descending, nulls_last=nulls_last, maintain_order=True)
+        lf = lf.filter(row_key.is_first_distinct() if keep == "first" else row_key.is_last_distinct())
+        if output_order == "input":
+            lf = lf.sort(marker).drop(marker)
+        return lf
+
+
+def _agg(func: str, e: Any, distinct: bool) -> Any:
+    if func == "count_distinct":
+        return e.drop_nulls().n_unique()
+    if distinct:
+        e = e.unique()
+    return {"sum": e.sum, "count": e.count, "min": e.min, "max": e.max, "avg": e.mean, "prod": e.product}[func]()
+
+
+class PolarsAggregate(PolarsOperator):
+    def plan(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        pl = _polars()
+        if not _only_keys(params, {"group_keys", "aggs", "having", "null_group"}):
+            return None
+        lf = inputs[0]
+        columns = lf.collect_schema().names()
+        group_keys = params.get("group_keys", [])
+        aggs = params.get("aggs")
+        having = params.get("having")
+        if not isinstance(group_keys, list) or not all(isinstance(k, str) and k in columns for k in group_keys):
+            return None
+        if not isinstance(aggs, list) or not aggs:
+            return None
+        if group_keys and bool(params.get("null_group", True)):
+            if lf.select(pl.any_horizontal([pl.col(k).is_null().any() for k in group_keys])).collect().item():
+                # pandas restores null keys as object <NA>; polars would keep (and to_pandas widen) the key dtype.
+                return None
+        exprs: List[Any] = []
+        for agg in aggs:
+            if not isinstance(agg, Mapping):
+                return None
+            out_name, func, text = agg.get("as"), agg.get("func"), agg.get("expr")
+            if not isinstance(out_name, str) or not out_name:
+                return None
+            if func not in {"sum", "count", "min", "max", "avg", "count_distinct", "prod"}:
+                return None
+            if text is None and func == "count":
+                exprs.append(pl.len().alias(out_name))
+                continue
+            refs = referenced_columns(text) if isinstance(text, str) else None
+            if not refs:
+                # pandas repeats a scalar to the frame's length; polars would reduce the lone value.
+                return None
+            if group_keys and bool(params.get("null_group", True)) and refs & set(group_keys):
+                # Aggregate swaps null keys for a sentinel string before evaluating expressions.
+                return None
+            translated = _translate_all([text], columns)
+            if translated is None:
+                return None
+            value = _nan_as_null(lf, translated[0])
+            if func not in {"count", "count_distinct"} and not lf.select(value).collect_schema().dtypes()[0].is_numeric():
+                # pandas raises on min/max/avg over str with nulls, and sums or multiplies other
+                # dtypes its own way; leave every non-numeric reduction to the pandas operator.
+                return None
+            exprs.append(_agg(func, value, bool(agg.get("distinct", False))).alias(out_name))
+        if group_keys:
+            if not bool(params.get("null_group", True)):
+                lf = lf.drop_nulls(group_keys)
+            # sort=False in pandas: groups in order of first appearance.
+            out = lf.group_by(group_keys, maintain_order=True).agg(exprs)
+        else:
+            out = lf.select(exprs)
+        if having is not None:
+            pred = _translate_all([having], out.collect_schema().names())
+            if pred is None:
+                return None
+            out = out.filter(pred[0])
+        return out
+
+
+class PolarsUnion(PolarsOperator):
+    def plan(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        pl = _polars()
+        if not _only_keys(params, {"distinct", "align", "fill_missing", "type_coerce"}):
+            return None
+        distinct = params.get("distinct")
+        fill_missing = params.get("fill_missing", "null")
+        if len(inputs) < 2 or not isinstance(distinct, bool) or fill_missing not in {"null", "error"}:
+            return None
+        if params.get("align", "by_name") != "by_name" or params.get("type_coerce", "error") != "error":
+            return None
+        if any(lf.select(pl.len()).collect().item() == 0 for lf in inputs):
+            # pandas concat upcasts around empty frames (int with an empty frame becomes float).
+            return None
+        schemas = [lf.collect_schema() for lf in inputs]
+        all_cols: List[str] = []
+        dtypes: Dict[str, Any] = {}
+        for schema in schemas:
+            for name, dtype in schema.items():
+                if name not in dtypes:
+                    all_cols.append(name)
+                    dtypes[name] = dtype
+                elif dtypes[name] == pl.Null:
+                    dtypes[name] = dtype
+                elif dtype != dtypes[name] and dtype != pl.Null and not (dtype.is_numeric() and dtypes[name].is_numeric()):
+                    # pandas would upcast to object (e.g. bool with int); polars would pick a supertype.
+                    return None
+        partial = {c for c in all_cols if any(c not in s for s in schemas)}
+        if fill_missing == "error" and partial:
+            return None
+        # pandas fills missing columns with float NaN before concat; only int/float/str come out the same.
+        if any(not (dtypes[c] == pl.String or dtypes[c].is_numeric()) for c in partial):
+            return None
+        out = pl.concat(inputs, how="diagonal_relaxed").select(all_cols)
+        return out.unique(maintain_order=True, keep="first") if distinct else out
+
+
+class PolarsJoin(PolarsOperator):
+    def plan(self, node_id: str, inputs: List[Any], params: Mapping[str, Any], ctx: ExecutionContext) -> Any:
+        if not _only_keys(params, {"how", "on", "left_on", "right_on", "null_equal", "suffixes", "select_left", "select_right", "fuzzy_match"}):
+            return None
+        if params.get("fuzzy_match", False) is not False:
+            return None
+        how = params.get("how", "inner")
+        if how not in {"inner", "left", "semi", "anti"}:
+            return None
+        left, right = inputs
+        lcols = left.collect_schema().names()
+        rcols = right.collect_schema().names()
+        on, left_on, right_on = (_key_list(params.get(k)) for k in ("on", "left_on", "right_on"))
+        if on is not None:
+            if left_on is not None or right_on is not None:
+                return None
+            left_keys = right_keys = on
+        elif left_on is not None and right_on is not None and len(left_on) == len(right_on) and left_on:
+            left_keys, right_keys = left_on, right_on
+        else:
+            return None
+        if not all(k in lcols for k in left_keys) or not all(k in rcols for k in right_keys):
+            return None
+        null_equal = bool(params.get("null_equal", False))
+        if how in {"semi", "anti"}:
+            keys = right.select(right_keys).unique()
+            return left.join(keys, left_on=left_keys, right_on=right_keys, how=how, nulls_equal=null_equal, maintain_order="left")
+
+        suffixes = params.get("suffixes", ["_x", "_y"])
+        if not isinstance(suffixes, list) or len(suffixes) != 2:
+            return None
+        sx, sy = str(suffixes[0]), str(suffixes[1])
+        shared = set(on) if on is not None else {lk for lk, rk in zip(left_keys, right_keys) if lk == rk}
+        overlap = (set(lcols) & set(rcols)) - shared
+        lren = {c: c + sx for c in overlap}
+        rren = {c: c + sy for c in overlap}
+        out_names = [lren.get(c, c) for c in lcols] + [rren.get(c, c) for c in rcols if c not in shared]
+        if len(set(out_names)) != len(out_names):
+            return None
+        marker = "__py2flow_polars_right__"
+        joined = left.rename(lren).join(
+            right.rename(rren),
+            left_on=[lren.get(k, k) for k in left_keys],
+            right_on=[rren.get(k, k) for k in right_keys],
+            how=how,
+            nulls_equal=null_equal,
+            maintain_order="left_right",
+            coalesce=False,
+            suffix=marker,
+        )
+        joined = joined.drop([k + marker for k in shared])
+
+        cols: List[str] = []
+        for side, select, names, suffix in (("left", params.get("select_left"), lcols, sx), ("right", params.get("select_right"), rcols, sy)):
+            wanted = _expand(select, names)
+            if wanted is None or any(c not in names for c in wanted):
+                return None
+            for c in wanted:
+                name = c if c in shared or c not in overlap else c + suffix
+                if name not in cols:
+                    cols.append(name)
+        return joined.select(cols)
+
+
+def _key_list(value: Any) -> Optional[List[str]]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and value and all(isinstance(x, str) and x for x in value):
+        return list(value)
+    return None
+
+
+def _expand(select: Any, names: List[str]) -> Optional[List[str]]:
+    if select is None:
+        return list(names)
+    if not isinstance(select, list) or not all(isinstance(x, str) and x for x in select):
+        return None
+    out: List[str] = []
+    for item in select:
+        out.extend(names if item == "*" else [item])
+    return out
+
+
+def polars_operator_registry() -> OperatorRegistry:
+    """Operator registry for DAGExecutor(operator_registry=...) that runs nodes on polars."""
+    _polars()
+    return OperatorRegistry(
+        {
+            StepKind.INPUT: PolarsInput(Input()),
+            StepKind.OUTPUT: PandasOnly(Output()),
+            StepKind.PROJECT: PolarsProject(Project()),
+            StepKind.FILTER: PolarsFilter(Filter()),
+            StepKind.DEDUP: PolarsDedup(Dedup()),
+            StepKind.JOIN: PolarsJoin(Join()),
+            StepKind.UNION: PolarsUnion(Union()),
+            StepKind.AGGREGATE: PolarsAggregate(Aggregate()),
+            StepKind.PIVOT: PandasOnly(Pivot()),
+            StepKind.SCRIPT: PandasOnly(Script()),
+            StepKind.SORT: PolarsSort(Sort()),
+        }
+    )
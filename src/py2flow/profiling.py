@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .cache import frame_nbytes
+from .ir import Node
+from .operators.expr import record_expr_spans
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+
+@dataclass
+class NodeProfile:
+    """
+    Measurements of one node execution. Rows, columns and bytes are None for results that are not
+    pandas DataFrames (lazy DuckDB or polars frames are not materialised for profiling). Bytes are
+    deep memory usage, or shallow (object columns counted as pointers) when deep_sizes is false.
+    """
+
+    node_id: str
+    kind: str
+    start_sec: float = 0.0
+    wall_sec: float = 0.0
+    cpu_sec: float = 0.0
+    expr_sec: float = 0.0
+    rows_in: Optional[int] = None
+    cols_in: Optional[int] = None
+    bytes_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    cols_out: Optional[int] = None
+    bytes_out: Optional[int] = None
+    peak_rss_delta: Optional[int] = None
+    thread: str = ""
+    ok: bool = True
+    expr_spans: List[Tuple[float, float]] = field(default_factory=list, repr=False)
+    deep_sizes: bool = field(default=True, repr=False)
+
+    @property
+    def kernel_sec(self) -> float:
+        """Wall time outside expression evaluation: the operator's own pandas work and overhead."""
+        return max(self.wall_sec - self.expr_sec, 0.0)
+
+    def record_output(self, result: Any) -> None:
+        if isinstance(result, pd.DataFrame):
+            self.rows_out, self.cols_out = result.shape
+            self.bytes_out = _nbytes(result, self.deep_sizes)
+
+    def as_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        del out["expr_spans"], out["deep_sizes"]
+        out["kernel_sec"] = self.kernel_sec
+        return out
+
+
+class RunProfile:
+    """
+    Per-node profile of one DAGExecutor run.
+
+    Wall and expression times come from time.perf_counter(), CPU time from time.thread_time() of
+    the thread running the node. Peak RSS delta is how much the process high-water mark rose while
+    the node ran; under --workers it is shared by every node running at the time.
+    Nodes served from the result cache or an incremental state are profiled like any other node;
+    streamed chains are not. deep_sizes=False sizes frames with shallow memory_usage, which skips
+    the per-value walk over object columns that makes deep sizing cost about as much as a scan.
+    """
+
+    def __init__(self, deep_sizes: bool = True) -> None:
+        self.deep_sizes = deep_sizes
+        self.nodes: List[NodeProfile] = []
+        self._origin = time.perf_counter()
+        self.total_sec = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, node: Node, upstream: Sequence[Any]) -> Iterator[NodeProfile]:
+        """Profile the body as the execution of node; pass its result to record_output() afterwards."""
+        prof = NodeProfile(node.id, node.kind.value, thread=threading.current_thread().name, deep_sizes=self.deep_sizes)
+        frames = [up for up in upstream if isinstance(up, pd.DataFrame)]
+        if len(frames) == len(upstream):
+            prof.rows_in = sum(len(up) for up in frames)
+            prof.cols_in = sum(up.shape[1] for up in frames)
+            prof.bytes_in = sum(_nbytes(up, self.deep_sizes) for up in frames)
+        rss_before = _max_rss()
+        cpu0 = time.thread_time()
+        t0 = time.perf_counter()
+        try:
+            with record_expr_spans() as spans:
+                yield prof
+        except BaseException:
+            prof.ok = False
+            raise
+        finally:
+            end = time.perf_counter()
+            prof.start_sec = t0 - self._origin
+            prof.wall_sec = end - t0
+            prof.cpu_sec = time.thread_time() - cpu0
+            prof.expr_spans = [(s - self._origin, e - self._origin) for s, e in _merge_spans(spans)]
+            prof.expr_sec = sum(e - s for s, e in prof.expr_spans)
+            rss_after = _max_rss()
+            if rss_before is not None and rss_after is not None:
+                prof.peak_rss_delta = rss_after - rss_before
+            with self._lock:
+                self.nodes.append(prof)
+
+    def finish(self) -> None:
+        self.total_sec = time.perf_counter() - self._origin
+
+    def summary(self, top: int = 5) -> Dict[str, Any]:
+        """Totals, per-kind times and the slowest nodes; small enough for execution.json."""
+        by_kind: Dict[str, Dict[str, Any]] = {}
+        for prof in self.nodes:
+            agg = by_kind.setdefault(prof.kind, {"nodes": 0, "wall_sec": 0.0, "cpu_sec": 0.0, "expr_sec": 0.0})
+            agg["nodes"] += 1
+            agg["wall_sec"] += prof.wall_sec
+            agg["cpu_sec"] += prof.cpu_sec
+            agg["expr_sec"] += prof.expr_sec
+        slowest = sorted(self.nodes, key=lambda p: p.wall_sec, reverse=True)[:top]
+        rss = [p.peak_rss_delta for p in self.nodes if p.peak_rss_delta is not None]
+        return {
+            "total_sec": self.total_sec,
+            "deep_sizes": self.deep_sizes,
+            "node_sec": sum(p.wall_sec for p in self.nodes),
+            "expr_sec": sum(p.expr_sec for p in self.nodes),
+            "peak_rss_delta": sum(rss) if rss else None,
+            "by_kind": by_kind,
+            "slowest": [
+                {"node_id": p.node_id, "kind": p.kind, "wall_sec": p.wall_sec, "expr_sec": p.expr_sec, "rows_out": p.rows_out}
+                for p in slowest
+            ],
+        }
+
+    def report(self) -> Dict[str, Any]:
+        return {"summary": self.summary(), "nodes": [p.as_dict() for p in self.nodes]}
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace Event Format (chrome://tracing, ui.perfetto.dev): one slice per node, expression evals nested in it."""
+        pid = os.getpid()
+        threads: Dict[str, int] = {}
+        events: List[Dict[str, Any]] = []
+        for prof in self.nodes:
+            tid = threads.setdefault(prof.thread, len(threads) + 1)
+            args = {k: v for k, v in prof.as_dict().items() if k not in {"node_id", "kind", "start_sec", "thread"}}
+            events.append(
+                {"name": prof.node_id, "cat": prof.kind, "ph": "X", "ts": _us(prof.start_sec), "dur": _us(prof.wall_sec), "pid": pid, "tid": tid, "args": args}
+            )
+            for start, end in prof.expr_spans:
+                events.append({"name": "expr", "cat": "expr", "ph": "X", "ts": _us(start), "dur": _us(end - start), "pid": pid, "tid": tid})
+        for name, tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, directory: str | Path) -> Tuple[Path, Path]:
+        """Write profile.json (report) and trace.json (Chrome trace) under directory."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        report_path = directory / "profile.json"
+        trace_path = directory / "trace.json"
+        report_path.write_text(json.dumps(self.report(), ensure_ascii=False, indent=2), encoding="utf-8")
+        trace_path.write_text(json.dumps(self.chrome_trace(), ensure_ascii=False), encoding="utf-8")
+        return report_path, trace_path
+
+
+def _nbytes(df: pd.DataFrame, deep: bool) -> int:
+    return frame_nbytes(df) if deep else int(df.memory_usage(index=True, deep=False).sum())
+
+
+def _merge_spans(spans: Sequence[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """Union of possibly nested spans."""
+    merged: List[Tuple[float, float]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _max_rss() -> Optional[int]:
+    """Process peak resident set size in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def _us(seconds: float) -> int:
+    return int(round(seconds * 1_000_000))
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import math
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, MutableMapping, Optional, Set
+
+import pandas as pd
+
+from .cache import frame_nbytes
+
+# Stands in for a spilled result in the executor's result map until it is reloaded.
+SPILLED = object()
+
+
+class SpillStore:
+    """
+    Memory budget for the materialised results of one executor run.
+
+    Every DataFrame result is tracked by its deep memory usage. When the tracked total exceeds
+    budget_bytes, results not pinned by a running node are written to local files, the ones whose
+    next consumer comes latest in the run order first (results only kept to be returned go before
+    any that still have pending consumers), and are loaded back when a consumer needs them.
+    Files are pickles of the whole frame, so reloaded results are identical (dtypes, index, attrs).
+    Results are treated as immutable: a reloaded result keeps its file, and spilling it again does
+    not rewrite it.
+
+    Other result types (polars or lazy DuckDB frames) are neither counted nor spilled.
+    The executor calls into the store from its scheduling thread only.
+    """
+
+    def __init__(self, budget_bytes: int, directory: str | Path | None = None) -> None:
+        self.budget_bytes = int(budget_bytes)
+        self.directory = Path(directory) if directory is not None else None
+        self._dir: Optional[Path] = None
+        self._sizes: Dict[str, int] = {}
+        self._files: Dict[str, Path] = {}
+        self._consumers: Dict[str, List[int]] = {}
+        self._rank: Dict[str, int] = {}
+        self._bytes = 0
+        self._counters: Dict[str, int] = {}
+
+    def begin(self, order: List[str], needed: Set[str], deps: Mapping[str, Iterable[str]]) -> None:
+        """Start a run: forget earlier results and record where each node is consumed."""
+        self.close()
+        self._rank = {nid: pos for pos, nid in enumerate(order)}
+        self._consumers = {}
+        for nid in order:
+            if nid in needed:
+                for i in deps.get(nid, []):
+                    self._consumers.setdefault(i, []).append(self._rank[nid])
+        self._counters = {"spills": 0, "spill_bytes": 0, "reloads": 0, "reload_bytes": 0, "peak_bytes": 0}
+
+    def add(self, node_id: str, inputs: Iterable[str], result: Any) -> None:
+        """Track a new result; the node no longer waits on its inputs."""
+        rank = self._rank.get(node_id)
+        for i in inputs:
+            pending = self._consumers.get(i)
+            if pending and rank in pending:
+                pending.remove(rank)
+        if isinstance(result, pd.DataFrame):
+            nbytes = frame_nbytes(result)
+            self._sizes[node_id] = nbytes
+            self._bytes += nbytes
+            self._counters["peak_bytes"] = max(self._counters["peak_bytes"], self._bytes)
+
+    def discard(self, node_id: str) -> None:
+        """Forget a released result and remove its file."""
+        self._bytes -= self._sizes.pop(node_id, 0)
+        path = self._files.pop(node_id, None)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def reload(self, node_id: str) -> pd.DataFrame:
+        """Load a spilled result back; it is tracked again until spilled or discarded."""
+        path = self._files[node_id]
+        with path.open("rb") as f:
+            df = pickle.load(f)
+        self._counters["reloads"] += 1
+        self._counters["reload_bytes"] += path.stat().st_size
+        self.add(node_id, (), df)
+        return df
+
+    def enforce(self, results: MutableMapping[str, Any], pinned: Set[str]) -> None:
+        """Spill results (replaced by SPILLED) until the tracked bytes fit the budget or only pinned ones remain."""
+        if self._bytes <= self.budget_bytes:
+            return
+        candidates = sorted(
+            (nid for nid in self._sizes if nid not in pinned and results.get(nid) is not SPILLED),
+            key=lambda nid: (-self._next_use(nid), -self._sizes[nid]),
+        )
+        for nid in candidates:
+            if self._bytes <= self.budget_bytes:
+                break
+            self._spill(nid, results[nid])
+            results[nid] = SPILLED
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._counters)
+
+    def close(self) -> None:
+        """Remove the run's spill files."""
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+        self._files.clear()
+        self._sizes.clear()
+        self._bytes = 0
+
+    def _next_use(self, node_id: str) -> float:
+        pending = self._consumers.get(node_id)
+        return min(pending) if pending else math.inf
+
+    def _spill(self, node_id: str, df: pd.DataFrame) -> None:
+        path = self._files.get(node_id)
+        if path is None:
+            if self._dir is None:
+                if self.directory is not None:
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                self._dir = Path(tempfile.mkdtemp(prefix="py2flow-spill-", dir=self.directory))
+            fd, tmp = tempfile.mkstemp(dir=self._dir, suffix=".pkl")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+            path = Path(tmp)
+            self._files[node_id] = path
+            self._counters["spills"] += 1
+            self._counters["spill_bytes"] += path.stat().st_size
+        self._bytes -= self._sizes.pop(node_id)
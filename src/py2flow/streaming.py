@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import copy
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Set
+
+import pandas as pd
+
+from .arrow_io import ArrowIO
+from .ir import DAG, Node, StepKind
+from .operators.base import ExecutionContext, FileIO, Operator
+from .operators.expr import is_rowwise_expr
+from .operators.input import csv_read_options
+
+# Map ops that neither change the row count nor look at other rows.
+_STREAMABLE_MAP_OPS = frozenset(
+    {
+        "trim",
+        "lower",
+        "upper",
+        "regex_replace",
+        "regex_extract",
+        "html_strip",
+        "squeeze_whitespace",
+        "split",
+        "tokenize",
+        "fillna",
+        "map_values",
+        "parse_date_multi",
+        "date_range",
+        "date_range_to_start",
+        "date_year_only",
+        "format_number",
+    }
+)
+
+
+@dataclass
+class StreamStats:
+    chunks: int = 0
+    rows: int = 0
+
+
+def _streamable_input(node: Node, input_tables: Mapping[str, Any] | None) -> bool:
+    params = node.params or {}
+    if input_tables is not None and input_tables.get(node.id) is not None:
+        return False
+    if params.get("data") is not None or params.get("source_type") == "inline":
+        return False
+    # Date inference runs per chunk and may settle on a different format than a full read.
+    return params.get("mode", "csv") in (None, "csv") and not params.get("parse_dates")
+
+
+def _streamable_project(params: Mapping[str, Any]) -> bool:
+    if params.get("promote_row_to_header") is not None or params.get("expand") is not None:
+        return False
+    # keep/null/tag turn a failure into a whole-frame fallback, which would then apply per chunk.
+    if params.get("on_error", "error") != "error":
+        return False
+    for item in params.get("compute") or []:
+        if not isinstance(item, Mapping) or not is_rowwise_expr(str(item.get("expr") or "")):
+            return False
+    for op in params.get("map") or []:
+        if not isinstance(op, Mapping) or op.get("op") not in _STREAMABLE_MAP_OPS:
+            return False
+        args = op.get("args") or {}
+        if not isinstance(args, Mapping):
+            return False
+        when = args.get("when")
+        if when is not None and not is_rowwise_expr(str(when)):
+            return False
+    return True
+
+
+def _streamable_step(node: Node) -> bool:
+    params = node.params or {}
+    if node.kind is StepKind.PROJECT:
+        return _streamable_project(params)
+    if node.kind is StepKind.FILTER:
+        predicate = params.get("predicate")
+        return isinstance(predicate, str) and is_rowwise_expr(predicate)
+    if node.kind is StepKind.OUTPUT:
+        # datetime_format parses non-datetime columns with per-chunk format inference.
+        return not params.get("datetime_format") and params.get("format", "csv") in (None, "csv")
+    return False
+
+
+def find_segments(
+    dag: DAG,
+    needed: Set[str],
+    targets: Set[str],
+    input_tables: Mapping[str, Any] | None = None,
+) -> List[List[str]]:
+    """
+    Isolated chains input -> (row-local project/filter)* -> output.
+
+    Every node but the output has exactly one consumer and none of them is a target, so no other
+    node ever needs their materialised result.
+    """
+    consumers: Dict[str, List[str]] = {nid: [] for nid in dag.nodes}
+    for nid, node in dag.nodes.items():
+        for i in node.inputs:
+            consumers[i].append(nid)
+    segments: List[List[str]] = []
+    for nid, node in dag.nodes.items():
+        if nid not in needed or node.kind is not StepKind.INPUT or not _streamable_input(node, input_tables):
+            continue
+        chain = [nid]
+        cur = nid
+        while True:
+            nxt = consumers[cur]
+            if len(nxt) != 1 or cur in targets:
+                break
+            step = dag.nodes[nxt[0]]
+            if step.id not in needed or not _streamable_step(step):
+                break
+            chain.append(step.id)
+            if step.kind is StepKind.OUTPUT:
+                if not consumers[step.id]:
+                    segments.append(chain)
+                break
+            cur = step.id
+    return segments
+
+
+class _ChunkWriter(FileIO):
+    """Routes an output node's writes to a temporary file, appending after the first chunk."""
+
+    def __init__(self, tmp_path: Path) -> None:
+        self.tmp_path = tmp_path
+        self.target: Path | None = None
+        self.started = False
+
+    def write_df(self, df: pd.DataFrame, path: Path, fmt: str, options: Mapping[str, Any]) -> None:
+        self.target = path
+        opts = dict(options)
+        if self.started:
+            opts.update({"mode": "a", "header": False})
+        super().write_df(df, self.tmp_path, fmt, opts)
+        self.started = True
+
+
+def _signature(df: pd.DataFrame) -> tuple:
+    return tuple((str(c), str(t)) for c, t in df.dtypes.items())
+
+
+def run_segment(
+    dag: DAG,
+    chain: List[str],
+    ops: Mapping[StepKind, Operator],
+    ctx: ExecutionContext,
+    chunksize: int,
+) -> Optional[StreamStats]:
+    """
+    Run one segment chunk by chunk, writing the output file as chunks complete.
+
+    The output is written to a temporary file and only moved into place when every chunk produced
+    the same column dtypes at the input and before the output (so the file is byte-identical to a
+    full read). Otherwise, and on any error, the temporary file is discarded and None is returned
+    so the caller can execute the segment normally and surface its usual error.
+    """
+    nodes = [dag.nodes[nid] for nid in chain]
+    source, steps, sink = nodes[0], nodes[1:-1], nodes[-1]
+    params = source.params or {}
+    path = params.get("path")
+    encoding = params.get("encoding", "utf-8")
+    # Custom adapters may not support read_csv(chunksize=...); ArrowIO passes chunked reads through.
+    if not isinstance(path, str) or not path or type(ctx.io) not in (FileIO, ArrowIO):
+        return None
+    encoding = encoding[0] if isinstance(encoding, list) and encoding else encoding
+    if not isinstance(encoding, str):
+        return None
+    sink_path = (sink.params or {}).get("path")
+    if not isinstance(sink_path, str) or not sink_path:
+        return None
+
+    stats = StreamStats()
+    try:
+        resolved = ctx.resolve_path(path)
+        final = ctx.resolve_path(sink_path)
+        final.parent.mkdir(parents=True, exist_ok=True)
+    except Exception:
+        return None
+    tmp = final.with_name(f".{final.name}.py2flow-stream.tmp")
+    writer = _ChunkWriter(tmp)
+    sink_ctx = copy.copy(ctx)
+    sink_ctx.io = writer
+    sink_op = ops[StepKind.OUTPUT]
+    in_sig: tuple | None = None
+    out_sig: tuple | None = None
+    ok = True
+    try:
+        options = csv_read_options(params, resolved, encoding, ctx)
+        options["chunksize"] = int(chunksize)
+        # One writer thread so formatting/writing a chunk overlaps with parsing the next one.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="py2flow-stream") as pool:
+            pending: Future[Any] | None = None
+            with ctx.io.read_df(resolved, "csv", options) as reader:
+                for chunk in reader:
+                    sig = _signature(chunk)
+                    if in_sig is None:
+                        in_sig = sig
+                    elif sig != in_sig:
+                        ok = False
+                        break
+                    frame = chunk
+                    for step in steps:
+                        frame = ops[step.kind].execute(step.id, [frame], step.params or {}, ctx)
+                    sig = _signature(frame)
+                    if out_sig is None:
+                        out_sig = sig
+                    elif sig != out_sig:
+                        ok = False
+                        break
+                    if pending is not None:
+                        pending.result()
+                    pending = pool.submit(sink_op.execute, sink.id, [frame], sink.params or {}, sink_ctx)
+                    stats.chunks += 1
+                    stats.rows += len(frame)
+            if pending is not None:
+                pending.result()
+    except Exception as exc:
+        ctx.logger.info("streaming fell back node=%s error=%s", sink.id, exc)
+        ok = False
+    if not ok or stats.chunks == 0 or writer.target is None:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        return None
+    os.replace(tmp, writer.target)
+    return stats